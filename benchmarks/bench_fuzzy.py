@@ -0,0 +1,69 @@
+"""Benchmark ranked fuzzy matching over a large set of branch names.
+
+Builds an index of synthetic branch names, a few hundred of them recently
+used, and times ``FuzzyIndex.rank`` with the picker's limit for queries
+that hit each matching tier. Reports median and p99 latencies in
+milliseconds.
+
+Usage:
+    python benchmarks/bench_fuzzy.py [--names 10000] [--runs 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from branchspace.fuzzy import PICKER_LIMIT
+from branchspace.fuzzy import FuzzyIndex
+
+
+P99_LIMIT_MS = 5.0
+WORDS = ["auth", "cache", "fix", "login", "docker", "shell", "index", "config", "api", "db"]
+
+
+def _names(count: int) -> list[str]:
+    rng = random.Random(0)
+    return [
+        f"{rng.choice(['feature', 'bugfix', 'chore'])}/{rng.choice(WORDS)}-{rng.choice(WORDS)}-{i}"
+        for i in range(count)
+    ]
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return statistics.median(ordered), p99
+
+
+def _time_rank(index: FuzzyIndex, query: str, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        index.rank(query, PICKER_LIMIT)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    names = _names(args.names)
+    now = time.time()
+    index = FuzzyIndex(names, {name: now - i * 60 for i, name in enumerate(names[:500])})
+
+    worst = 0.0
+    for query in ("e", "fe", "auth", "fxdb", "zzz", names[42]):
+        median, p99 = _percentiles(_time_rank(index, query, args.runs))
+        worst = max(worst, p99)
+        print(f"{query!r:>24}: median {median:6.2f} ms, p99 {p99:6.2f} ms")
+    return 0 if worst < P99_LIMIT_MS else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+"""Benchmark the prompt segment hook against calling ``branchspace prompt``.
+
+Creates a throwaway repository, warms its cached segment, then times the bash
+``_branchspace_prompt_update`` hook inside a single shell (what a prompt pays
+per render) and, for comparison, a full ``branchspace prompt`` process.
+Reports median and p99 latencies in milliseconds.
+
+Usage:
+    python benchmarks/bench_prompt.py [--runs 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from branchspace.prompt import refresh_prompt
+from branchspace.shell_integration import POSIX_CD_FAST_PATH
+from branchspace.shell_integration import POSIX_PROMPT
+
+
+P99_LIMIT_MS = 10.0
+
+
+def _init_repo(path: Path) -> Path:
+    path.mkdir()
+    for args in (
+        ["init", "-b", "main"],
+        ["config", "user.email", "bench@example.com"],
+        ["config", "user.name", "Bench"],
+        ["commit", "--allow-empty", "-m", "init"],
+    ):
+        subprocess.run(["git", *args], cwd=path, capture_output=True, check=True)
+    return path
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return statistics.median(ordered), p99
+
+
+def _time_shell_hook(repo: Path, runs: int) -> list[float]:
+    # EPOCHREALTIME is a bash 5 builtin, so timing adds no forks
+    script = "\n".join(
+        [
+            POSIX_CD_FAST_PATH,
+            POSIX_PROMPT,
+            f"for ((i = 0; i < {runs}; i++)); do",
+            "  start=$EPOCHREALTIME",
+            "  _branchspace_prompt_update",
+            '  echo "$start $EPOCHREALTIME"',
+            "done",
+        ]
+    )
+    result = subprocess.run(
+        ["bash", "-c", script],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    samples = []
+    for line in result.stdout.splitlines():
+        start, end = (float(value.replace(",", ".")) for value in line.split())
+        samples.append((end - start) * 1000)
+    return samples
+
+
+def _time_cli(repo: Path, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "branchspace", "prompt"],
+            cwd=repo,
+            capture_output=True,
+            check=False,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=1000)
+    args = parser.parse_args()
+
+    if shutil.which("bash") is None:
+        print("bash is not installed", file=sys.stderr)
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = _init_repo(Path(tmp) / "repo")
+        refresh_prompt(repo)
+        os.environ.setdefault("BRANCHSPACE_PROMPT_TTL", "3600")
+
+        hook_median, hook_p99 = _percentiles(_time_shell_hook(repo, args.runs))
+        cli_median, cli_p99 = _percentiles(_time_cli(repo, max(args.runs // 50, 10)))
+
+    print(f"{'shell hook':>20}: median {hook_median:6.2f} ms, p99 {hook_p99:6.2f} ms")
+    print(f"{'branchspace prompt':>20}: median {cli_median:6.2f} ms, p99 {cli_p99:6.2f} ms")
+    return 0 if hook_p99 < P99_LIMIT_MS else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+"""Benchmark interactive shell startup with and without static completion scripts.
+
+Starts an interactive shell whose rc file contains the branchspace integration
+and reports the median startup time for three rc files: an empty baseline,
+the historical ``eval "$(_BRANCHSPACE_COMPLETE=... branchspace)"`` line, and
+the current snippet that sources a pre-generated script.
+
+Usage:
+    python benchmarks/bench_shell_startup.py [--shell bash|zsh] [--runs 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from branchspace.completion import write_completion_script
+from branchspace.shell_integration import build_shell_function
+
+
+ZSH_PREAMBLE = "autoload -Uz compinit && compinit -u"
+
+
+def _rc_variants(shell: str) -> dict[str, str]:
+    preamble = f"{ZSH_PREAMBLE}\n" if shell == "zsh" else ""
+    return {
+        "baseline": preamble,
+        "eval": f'{preamble}eval "$(_BRANCHSPACE_COMPLETE={shell}_source branchspace)"\n',
+        "static": f"{preamble}{build_shell_function(shell)}\n",
+    }
+
+
+def _command(shell: str, home: Path) -> list[str]:
+    if shell == "zsh":
+        return ["zsh", "-i", "-c", "exit"]
+    return ["bash", "--noprofile", "--rcfile", str(home / ".bashrc"), "-i", "-c", "exit"]
+
+
+def _time_startup(shell: str, home: Path, runs: int) -> float:
+    env = {**os.environ, "HOME": str(home), "XDG_CONFIG_HOME": str(home / ".config")}
+    env["ZDOTDIR"] = str(home)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(_command(shell, home), env=env, capture_output=True, check=False)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shell", choices=["bash", "zsh"], default="bash")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if shutil.which(args.shell) is None:
+        print(f"{args.shell} is not installed", file=sys.stderr)
+        return 1
+    if shutil.which("branchspace") is None:
+        print("branchspace must be on PATH for the eval variant", file=sys.stderr)
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        write_completion_script(args.shell, config_home=home / ".config")
+        rc_name = ".zshrc" if args.shell == "zsh" else ".bashrc"
+        for name, rc in _rc_variants(args.shell).items():
+            (home / rc_name).write_text(rc, encoding="utf-8")
+            median_ms = _time_startup(args.shell, home, args.runs)
+            print(f"{args.shell:5} {name:9} {median_ms:8.1f} ms (median of {args.runs})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
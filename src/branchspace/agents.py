@@ -5,8 +5,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 
-from branchspace.config import find_config_file
-from branchspace.config import get_git_root
+from branchspace.config_snapshot import find_config_file
+from branchspace.git_utils import get_git_root
 
 
 @dataclass(frozen=True)
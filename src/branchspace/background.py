@@ -0,0 +1,46 @@
+"""Detached background processes for branchspace maintenance work."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+
+
+def _low_priority_prefix() -> list[str]:
+    prefix: list[str] = []
+    if os.name != "posix":
+        return prefix
+    if shutil.which("ionice"):
+        prefix += ["ionice", "-c", "3"]
+    if shutil.which("nice"):
+        prefix += ["nice", "-n", "19"]
+    return prefix
+
+
+def spawn_module(module: str, *args: str, low_priority: bool = False) -> subprocess.Popen[bytes]:
+    """Run ``python -m module`` detached from the current terminal.
+
+    The child gets its own session so it survives the parent exiting and does
+    not receive the terminal's Ctrl-C. With ``low_priority`` it runs with idle
+    I/O priority and the lowest CPU priority where the platform allows it.
+    """
+    command = [sys.executable, "-m", module, *args]
+    if low_priority:
+        command = _low_priority_prefix() + command
+
+    creationflags = 0
+    if os.name != "posix":
+        creationflags = getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(
+            subprocess, "CREATE_NEW_PROCESS_GROUP", 0
+        )
+    return subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        start_new_session=os.name == "posix",
+        creationflags=creationflags,
+    )
@@ -2,11 +2,21 @@
 
 from __future__ import annotations
 
+import os
+import subprocess
+
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from click.shell_completion import CompletionItem
 
-from branchspace.git_utils import list_worktrees
+from branchspace import __version__
+from branchspace.completion_cache import BRANCH_NAMES
+from branchspace.completion_cache import WORKTREE_BRANCHES
+from branchspace.completion_cache import cached_candidates
+from branchspace.daemon_client import query
+from branchspace.fuzzy import FuzzyIndex
+from branchspace.worktree_index import read_index
 
 
 if TYPE_CHECKING:
@@ -14,11 +24,49 @@ if TYPE_CHECKING:
     from click.core import Parameter
 
 
+COMPLETION_LIMIT = 50
+
+
+def _complete(names: list[str], incomplete: str) -> list[CompletionItem]:
+    return [CompletionItem(name) for name in names if name.startswith(incomplete)]
+
+
 class WorktreeBranchComplete:
-    """Complete with existing worktree branch names."""
+    """Complete with existing worktree branch names, fuzzy-matched."""
+
+    def __call__(self, ctx: Context, param: Parameter, incomplete: str) -> list[CompletionItem]:
+        """Return completion items for worktree branches, best match first.
+
+        Ranked by the daemon when it is running. Otherwise branch names come
+        from the worktree index when it exists, or from the completion cache
+        within its time budget, and are ranked here.
+
+        Args:
+            ctx: Click context
+            param: Parameter being completed
+            incomplete: Partial value typed by user
+
+        Returns:
+            List of CompletionItem objects for matching branches
+        """
+        served = query("match", query=incomplete, limit=COMPLETION_LIMIT)
+        if isinstance(served, list):
+            return [CompletionItem(name) for name in served]
+        try:
+            entries = read_index()
+            names = list(entries) if entries is not None else cached_candidates(WORKTREE_BRANCHES)
+        except (OSError, subprocess.SubprocessError):
+            return []
+        accessed = {branch: entry.accessed for branch, entry in (entries or {}).items()}
+        matches = FuzzyIndex(names, accessed).rank(incomplete, limit=COMPLETION_LIMIT)
+        return [CompletionItem(match.name) for match in matches]
+
+
+class BranchRefComplete:
+    """Complete with local branch names and remote branch names."""
 
     def __call__(self, ctx: Context, param: Parameter, incomplete: str) -> list[CompletionItem]:
-        """Return completion items for worktree branches.
+        """Return completion items for branch names from the daemon or the ref cache.
 
         Args:
             ctx: Click context
@@ -28,12 +76,93 @@ class WorktreeBranchComplete:
         Returns:
             List of CompletionItem objects for matching branches
         """
+        served = query("refs")
+        if isinstance(served, list):
+            return _complete([str(name) for name in served], incomplete)
         try:
-            worktrees = list_worktrees()
-            return [
-                CompletionItem(wt.branch)
-                for wt in worktrees
-                if wt.branch.startswith(incomplete) and not wt.detached
-            ]
-        except Exception:
+            names = cached_candidates(BRANCH_NAMES)
+        except (OSError, subprocess.SubprocessError):
             return []
+        return _complete(names, incomplete)
+
+
+COMPLETION_SHELLS = ("bash", "zsh", "fish")
+COMPLETE_VAR = "_BRANCHSPACE_COMPLETE"
+_STAMP_PREFIX = "# branchspace "
+# Empty file named after the version that last refreshed the scripts
+_MARKER_PREFIX = ".version-"
+
+
+def completion_dir(config_home: Path | None = None) -> Path:
+    """Return the directory holding pre-generated completion scripts."""
+    if config_home is None:
+        xdg = os.environ.get("XDG_CONFIG_HOME")
+        config_home = Path(xdg) if xdg else Path.home() / ".config"
+    return config_home / "branchspace" / "completions"
+
+
+def completion_script_path(shell: str, config_home: Path | None = None) -> Path:
+    """Return the static completion script path for ``shell``."""
+    return completion_dir(config_home) / f"branchspace.{shell}"
+
+
+def render_completion_script(shell: str) -> str:
+    """Generate the completion script click would emit for ``shell``, with a version stamp."""
+    from click.shell_completion import get_completion_class
+
+    from branchspace.main_cli import main
+
+    completion_class = get_completion_class(shell)
+    if completion_class is None:
+        raise ValueError(f"Unsupported shell: {shell}")
+    source = completion_class(main, {}, "branchspace", COMPLETE_VAR).source()
+    return f"{_STAMP_PREFIX}{__version__}\n{source.rstrip()}\n"
+
+
+def _is_current(path: Path) -> bool:
+    try:
+        with path.open(encoding="utf-8") as handle:
+            return handle.readline().rstrip("\n") == f"{_STAMP_PREFIX}{__version__}"
+    except OSError:
+        return False
+
+
+def write_completion_script(shell: str, config_home: Path | None = None) -> Path:
+    """Write the static completion script for ``shell`` unless it is already current."""
+    path = completion_script_path(shell, config_home)
+    if not _is_current(path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(render_completion_script(shell), encoding="utf-8")
+    return path
+
+
+def _version_marker(config_home: Path | None = None) -> Path:
+    return completion_dir(config_home) / f"{_MARKER_PREFIX}{__version__}"
+
+
+def refresh_completion_scripts(config_home: Path | None = None) -> None:
+    """Regenerate installed completion scripts written by another branchspace version.
+
+    Only scripts that already exist are touched. Afterwards the completion
+    directory is marked with the current version for ``refresh_after_upgrade``.
+    """
+    for shell in COMPLETION_SHELLS:
+        path = completion_script_path(shell, config_home)
+        if path.exists() and not _is_current(path):
+            write_completion_script(shell, config_home)
+    marker = _version_marker(config_home)
+    if marker.parent.is_dir():
+        for stale in marker.parent.glob(f"{_MARKER_PREFIX}*"):
+            stale.unlink(missing_ok=True)
+        marker.touch()
+
+
+def refresh_after_upgrade(config_home: Path | None = None) -> None:
+    """Refresh installed completion scripts once after the installed version changes.
+
+    While the version is unchanged this is a single stat of the version
+    marker, cheap enough to run before every command.
+    """
+    marker = _version_marker(config_home)
+    if not marker.exists() and marker.parent.is_dir():
+        refresh_completion_scripts(config_home)
@@ -0,0 +1,185 @@
+"""Time-budgeted, stale-while-revalidate cache for shell completion candidates.
+
+Completion must never block the shell. Candidates are served from a cache file
+in the branchspace state directory. When the cache is older than its TTL, or
+the git files it was derived from have changed, the stale candidates are still
+returned and a detached process refreshes the cache for the next TAB press.
+Without a cache, git is asked directly but killed once the time budget runs
+out, in which case nothing is completed and the refresh runs in the
+background.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from branchspace.background import spawn_module
+from branchspace.git_utils import find_repository
+from branchspace.git_utils import list_branch_names
+from branchspace.git_utils import list_worktrees
+from branchspace.state import STATE_DIRNAME
+from branchspace.state import file_lock
+from branchspace.state import read_state
+from branchspace.state import write_state
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+DEFAULT_BUDGET_MS = 30.0
+BUDGET_ENV = "BRANCHSPACE_COMPLETION_BUDGET_MS"
+
+
+def _worktree_branches(repo_root: Path, timeout: float | None) -> list[str]:
+    worktrees = list_worktrees(repo_root, timeout=timeout)
+    return [worktree.branch for worktree in worktrees if not worktree.detached]
+
+
+@dataclass(frozen=True)
+class CompletionSource:
+    """A kind of completion candidate and how to produce it."""
+
+    name: str
+    # Maximum age in seconds before a background refresh is started
+    ttl: float
+    produce: Callable[[Path, float | None], list[str]]
+    # Paths under the common git dir whose mtimes change with the data
+    watched: tuple[str, ...]
+    # Watched directories whose subdirectories are stamped too
+    recursive: bool = False
+
+
+WORKTREE_BRANCHES = CompletionSource(
+    name="worktrees",
+    ttl=30.0,
+    produce=_worktree_branches,
+    watched=("worktrees",),
+)
+BRANCH_NAMES = CompletionSource(
+    name="refs",
+    ttl=300.0,
+    produce=list_branch_names,
+    watched=("packed-refs", "refs/heads", "refs/remotes"),
+    # Branches such as feature/x live in subdirectories of refs/heads, whose
+    # own mtime does not change when one is added there
+    recursive=True,
+)
+SOURCES = {source.name: source for source in (WORKTREE_BRANCHES, BRANCH_NAMES)}
+
+
+def _budget_seconds() -> float:
+    try:
+        return float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MS)) / 1000
+    except ValueError:
+        return DEFAULT_BUDGET_MS / 1000
+
+
+def _cache_path(state_dir: Path, source: CompletionSource) -> Path:
+    return state_dir / f"completion-{source.name}.json"
+
+
+def _tree_stamp(directory: Path) -> list[int]:
+    """Return the newest mtime and the number of directories below ``directory``.
+
+    Adding or deleting a file changes its directory's mtime, and removing a
+    directory changes its parent's, so both changes move the newest mtime.
+    """
+    newest = 0
+    count = 0
+    for root, _dirs, _files in os.walk(directory):
+        with suppress(OSError):
+            newest = max(newest, os.stat(root).st_mtime_ns)
+            count += 1
+    return [newest, count]
+
+
+def _fingerprint(common_dir: Path, source: CompletionSource) -> list[int]:
+    stamps = []
+    for name in source.watched:
+        path = common_dir / name
+        if source.recursive and path.is_dir():
+            stamps.extend(_tree_stamp(path))
+            continue
+        try:
+            stamps.append(path.stat().st_mtime_ns)
+        except OSError:
+            stamps.append(0)
+    return stamps
+
+
+def _write_cache(
+    state_dir: Path, source: CompletionSource, items: list[str], fingerprint: list[int]
+) -> None:
+    data = {"generated": time.time(), "fingerprint": fingerprint, "items": items}
+    write_state(_cache_path(state_dir, source), data)
+
+
+def _refresh_in_background(source: CompletionSource, repo_root: Path) -> None:
+    try:
+        spawn_module("branchspace.completion_cache", source.name, str(repo_root))
+    except OSError:
+        return
+
+
+def refresh_cache(source: CompletionSource, repo_root: Path) -> None:
+    """Recompute a source's candidates without a time limit and store them.
+
+    Concurrent refreshes of the same source collapse into one.
+    """
+    repository = find_repository(repo_root)
+    if repository is None:
+        return
+    state_dir = repository.common_dir / STATE_DIRNAME
+    with file_lock(state_dir / f"completion-{source.name}.lock", blocking=False) as acquired:
+        if not acquired:
+            return
+        fingerprint = _fingerprint(repository.common_dir, source)
+        items = source.produce(repository.worktree, None)
+        _write_cache(state_dir, source, items, fingerprint)
+
+
+def cached_candidates(source: CompletionSource, repo_root: Path | None = None) -> list[str]:
+    """Return candidates for ``source`` within the completion time budget.
+
+    Raises:
+        CalledProcessError: If git fails while answering without a cache.
+    """
+    deadline = time.monotonic() + _budget_seconds()
+    repository = find_repository(repo_root)
+    if repository is None:
+        # No state directory to cache in; ask git directly, within budget
+        try:
+            return source.produce(repo_root or Path.cwd(), _budget_seconds())
+        except subprocess.TimeoutExpired:
+            return []
+
+    state_dir = repository.common_dir / STATE_DIRNAME
+    fingerprint = _fingerprint(repository.common_dir, source)
+    cache = read_state(_cache_path(state_dir, source))
+    if cache is not None and isinstance(cache.get("items"), list):
+        age = time.time() - float(cache.get("generated", 0))
+        if age > source.ttl or cache.get("fingerprint") != fingerprint:
+            _refresh_in_background(source, repository.worktree)
+        return [str(item) for item in cache["items"]]
+
+    try:
+        items = source.produce(repository.worktree, max(deadline - time.monotonic(), 0.001))
+    except subprocess.TimeoutExpired:
+        _refresh_in_background(source, repository.worktree)
+        return []
+    with suppress(OSError):
+        _write_cache(state_dir, source, items, fingerprint)
+    return items
+
+
+if __name__ == "__main__":
+    refresh_cache(SOURCES[sys.argv[1]], Path(sys.argv[2]))
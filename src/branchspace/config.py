@@ -2,20 +2,31 @@
 
 import json
 import os
-import subprocess
 
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Annotated
+from typing import Any
+from typing import Literal
 
 from pydantic import BaseModel
 from pydantic import ConfigDict
 from pydantic import Field
 from pydantic import ValidationError
-
-
-# Config filename
-CONFIG_FILENAME = "branchspace.json"
+from pydantic import field_validator
+
+from branchspace.config_snapshot import CONFIG_FILENAME  # noqa: F401 - re-exported
+from branchspace.config_snapshot import ConfigError
+from branchspace.config_snapshot import build_snapshot
+from branchspace.config_snapshot import find_config_file
+from branchspace.config_snapshot import read_snapshot
+from branchspace.config_snapshot import snapshot_key
+from branchspace.config_snapshot import write_snapshot
+from branchspace.config_validation import PULL_ALWAYS
+from branchspace.config_validation import parse_duration
+from branchspace.config_validation import validate_cache_mounts
+from branchspace.config_validation import validate_container_mounts
+from branchspace.config_validation import validate_pull_policy
 
 
 class ContainerImageConfig(BaseModel):
@@ -24,6 +35,16 @@ class ContainerImageConfig(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
     image: str = Field(description="Docker image to use")
+    pull_policy: str = Field(
+        default=PULL_ALWAYS,
+        alias="pullPolicy",
+        description="When to pull the image: always, missing, never or ttl:<duration>",
+    )
+
+    @field_validator("pull_policy")
+    @classmethod
+    def _check_pull_policy(cls, value: str) -> str:
+        return validate_pull_policy(value)
 
 
 class ContainerBuildConfig(BaseModel):
@@ -35,9 +56,50 @@ class ContainerBuildConfig(BaseModel):
     dockerfile: str = Field(default="Dockerfile", description="Dockerfile path")
 
 
-# Union type for container config - can be image-based or build-based
+class ContainerComposeConfig(BaseModel):
+    """Container configuration using a Docker Compose project per branch."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    compose: str = Field(description="Compose file path, relative to the worktree")
+    service: str = Field(description="Service that shell sessions run in")
+
+
+class ContainerSetupConfig(BaseModel):
+    """Setup steps run once inside the container and saved as a snapshot image."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    commands: list[str] = Field(min_length=1, description="Commands run in order in the container")
+    lockfiles: list[str] = Field(
+        default_factory=list,
+        description="Worktree files whose contents decide when setup runs again",
+    )
+    keep: int = Field(default=3, ge=1, description="Snapshot images kept per repository")
+
+
+class WorktreeRoot(BaseModel):
+    """A base directory that worktrees can be placed under."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    path: str = Field(description="Directory that holds worktrees")
+    ephemeral: bool = Field(
+        default=False,
+        description="Fast scratch storage (e.g. tmpfs) for ephemeral branches",
+    )
+
+
+ContainerMode = Literal["ephemeral", "persistent"]
+
+MountStrategy = Literal["volume", "tmpfs", "readonly"]
+
+PlacementPolicy = Literal["most-free-space", "round-robin", "tmpfs-for-ephemeral"]
+
+
+# Union type for container config - can be image-based, build-based or compose-based
 ContainerConfig = Annotated[
-    ContainerImageConfig | ContainerBuildConfig,
+    ContainerImageConfig | ContainerBuildConfig | ContainerComposeConfig,
     Field(discriminator=None),
 ]
 
@@ -76,6 +138,27 @@ class BranchspaceConfig(BaseModel):
         description="Template for worktree directory path",
     )
 
+    # Base directories that relative worktree paths are placed under
+    worktree_roots: list[WorktreeRoot] = Field(
+        default_factory=list,
+        alias="worktreeRoots",
+        description="Placement roots for worktrees; relative templates resolve under one",
+    )
+
+    # How a placement root is picked for each new worktree
+    placement_policy: PlacementPolicy = Field(
+        default="most-free-space",
+        alias="placementPolicy",
+        description="Policy for picking a worktree root",
+    )
+
+    # Branches that belong on ephemeral roots
+    ephemeral_branches: list[str] = Field(
+        default_factory=list,
+        alias="ephemeralBranches",
+        description="Glob patterns for branches placed on ephemeral roots",
+    )
+
     # Project name for template usage
     project_name: str = Field(
         default="",
@@ -104,101 +187,99 @@ class BranchspaceConfig(BaseModel):
         description="Delete branch and Docker resources when removing worktree",
     )
 
-    # Container configuration (image or build)
-    container_config: ContainerImageConfig | ContainerBuildConfig = Field(
+    # Whether rm renames worktrees into trash and deletes them in the background
+    fast_remove: bool = Field(
+        default=True,
+        alias="fastRemove",
+        description="Move removed worktrees to trash and delete them in the background",
+    )
+
+    # Container configuration (image, build or compose)
+    container_config: ContainerImageConfig | ContainerBuildConfig | ContainerComposeConfig = Field(
         default_factory=_default_container_config,
         alias="containerConfig",
         description="Docker container configuration",
     )
 
-    # Shell for interactive sessions
-    shell: str = Field(
-        default="bash",
-        description="Shell to use for interactive sessions",
+    # Container-side setup committed once per lockfile state
+    container_setup: ContainerSetupConfig | None = Field(
+        default=None,
+        alias="containerSetup",
+        description="Setup run once per lockfile hash and snapshotted for shell",
     )
 
+    # Whether shell runs a fresh container or execs into a long-lived one
+    container_mode: ContainerMode = Field(
+        default="ephemeral",
+        alias="containerMode",
+        description="ephemeral (docker run --rm per shell) or persistent (docker exec)",
+    )
 
-def get_git_root(start_path: Path | None = None) -> Path | None:
-    """Find the git repository root from start_path or cwd.
-
-    Args:
-        start_path: Starting directory for search. Defaults to cwd.
-
-    Returns:
-        Path to git root, or None if not in a git repository.
-    """
-    if start_path is None:
-        start_path = Path.cwd()
-
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            cwd=start_path,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        return Path(result.stdout.strip())
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return None
-
-
-def find_config_file(start_path: Path | None = None) -> Path | None:
-    """Search for branchspace.json from start_path up to git root.
-
-    Args:
-        start_path: Starting directory for search. Defaults to cwd.
-
-    Returns:
-        Path to config file if found, None otherwise.
-    """
-    if start_path is None:
-        start_path = Path.cwd()
-
-    start_path = start_path.resolve()
-
-    # Get git root to know where to stop searching
-    git_root = get_git_root(start_path)
-
-    # If not in a git repo, only check start_path
-    if git_root is None:
-        config_path = start_path / CONFIG_FILENAME
-        return config_path if config_path.is_file() else None
+    # Whether create starts persistent containers in the background
+    prewarm_container: bool = Field(
+        default=False,
+        alias="prewarmContainer",
+        description="Start the persistent container right after create",
+    )
 
-    git_root = git_root.resolve()
+    # How long an unused persistent container keeps running
+    container_idle_timeout: str = Field(
+        default="30m",
+        alias="containerIdleTimeout",
+        description="Stop persistent containers idle this long; 0 keeps them running",
+    )
 
-    # Search from start_path up to git root
-    current = start_path
-    while True:
-        config_path = current / CONFIG_FILENAME
-        if config_path.is_file():
-            return config_path
+    # Named volumes shared by every branch container, keyed by cache name
+    cache_mounts: dict[str, str] = Field(
+        default_factory=dict,
+        alias="cacheMounts",
+        description="Shared dependency caches: cache name -> path inside the container",
+    )
 
-        # Stop if we've reached git root
-        if current == git_root:
-            break
+    # Worktree paths mounted differently from the read-write worktree bind
+    container_mounts: dict[str, MountStrategy] = Field(
+        default_factory=dict,
+        alias="containerMounts",
+        description="Mount strategies: worktree path -> volume, tmpfs or readonly",
+    )
 
-        # Move up one directory
-        parent = current.parent
-        if parent == current:
-            # Reached filesystem root
-            break
-        current = parent
+    # Shell for interactive sessions
+    shell: str = Field(
+        default="bash",
+        description="Shell to use for interactive sessions",
+    )
 
-    return None
+    @field_validator("container_idle_timeout")
+    @classmethod
+    def _check_idle_timeout(cls, value: str) -> str:
+        parse_duration(value)
+        return value
 
+    @field_validator("cache_mounts")
+    @classmethod
+    def _check_cache_mounts(cls, value: dict[str, str]) -> dict[str, str]:
+        return validate_cache_mounts(value)
 
-class ConfigError(Exception):
-    """Error loading or parsing configuration."""
+    @field_validator("container_mounts", mode="before")
+    @classmethod
+    def _check_container_mounts(cls, value: Any) -> Any:
+        return validate_container_mounts(value) if isinstance(value, dict) else value
 
-    def __init__(self, message: str, path: Path | None = None):
-        self.path = path
-        super().__init__(message)
+    @field_validator("worktree_roots", mode="before")
+    @classmethod
+    def _expand_root_shorthand(cls, value: Any) -> Any:
+        # Allow plain strings as shorthand for {"path": ...}
+        if isinstance(value, list):
+            return [{"path": item} if isinstance(item, str) else item for item in value]
+        return value
 
 
 def load_config(path: Path | None = None) -> BranchspaceConfig:
     """Load configuration from file or return defaults.
 
+    A current snapshot from an earlier load is returned without parsing or
+    validating the file again.
+
     Args:
         path: Explicit path to config file. If None, uses discovery.
 
@@ -212,11 +293,34 @@ def load_config(path: Path | None = None) -> BranchspaceConfig:
     if path is None:
         path = find_config_file()
 
+    snapshot = read_snapshot(path)
+    if snapshot is not None:
+        return snapshot.config()
+
+    # Keyed before reading, so an edit racing the load leaves a stale key behind
+    key = snapshot_key(path)
+    config = load_config_uncached(path)
+    write_snapshot(build_snapshot(config, key))
+    return config
+
+
+def load_config_uncached(path: Path | None) -> BranchspaceConfig:
+    """Load and validate configuration from ``path``, or return defaults if None.
+
+    Raises:
+        ConfigError: If the config file exists but is invalid.
+    """
     env_base = os.environ.get("BRANCHSPACE_BASE")
 
     def apply_env_overrides(config: BranchspaceConfig) -> BranchspaceConfig:
         if env_base:
-            config.worktree_path_template = f"{env_base}/$BRANCH_NAME"
+            bases = [base for base in env_base.split(os.pathsep) if base]
+            if len(bases) > 1:
+                # Several bases become placement roots for the branch directory
+                config.worktree_roots = [WorktreeRoot(path=base) for base in bases]
+                config.worktree_path_template = "$BRANCH_NAME"
+            else:
+                config.worktree_path_template = f"{env_base}/$BRANCH_NAME"
         return config
 
     # No config file found - return defaults
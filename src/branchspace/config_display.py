@@ -8,9 +8,10 @@ from rich.table import Table
 
 from branchspace.config import BranchspaceConfig
 from branchspace.config import ContainerBuildConfig
+from branchspace.config import ContainerComposeConfig
 from branchspace.config import ContainerImageConfig
-from branchspace.config import find_config_file
 from branchspace.config import load_config
+from branchspace.config_snapshot import find_config_file
 from branchspace.console import get_console
 from branchspace.console import info
 
@@ -33,14 +34,39 @@ def _iter_config_rows(config: BranchspaceConfig) -> Iterable[tuple[str, str]]:
     yield "worktreeCopyPatterns", ", ".join(config.worktree_copy_patterns)
     yield "worktreeCopyIgnores", ", ".join(config.worktree_copy_ignores)
     yield "worktreePathTemplate", config.worktree_path_template
+    if config.worktree_roots:
+        roots = [
+            f"{root.path} (ephemeral)" if root.ephemeral else root.path
+            for root in config.worktree_roots
+        ]
+        yield "worktreeRoots", ", ".join(roots)
+        yield "placementPolicy", config.placement_policy
     yield "postCreateCmd", ", ".join(config.post_create_cmd) or "(none)"
     yield "terminalCommand", config.terminal_command or "(none)"
     yield "purgeOnRemove", "true" if config.purge_on_remove else "false"
     if isinstance(config.container_config, ContainerImageConfig):
         yield "containerConfig.image", config.container_config.image
+        yield "containerConfig.pullPolicy", config.container_config.pull_policy
     elif isinstance(config.container_config, ContainerBuildConfig):
         yield "containerConfig.context", config.container_config.context
         yield "containerConfig.dockerfile", config.container_config.dockerfile
+    elif isinstance(config.container_config, ContainerComposeConfig):
+        yield "containerConfig.compose", config.container_config.compose
+        yield "containerConfig.service", config.container_config.service
+    if config.container_setup is not None:
+        yield "containerSetup.commands", ", ".join(config.container_setup.commands)
+        yield "containerSetup.lockfiles", ", ".join(config.container_setup.lockfiles) or "(none)"
+        yield "containerSetup.keep", str(config.container_setup.keep)
+    yield "containerMode", config.container_mode
+    if config.container_mode == "persistent":
+        yield "prewarmContainer", "true" if config.prewarm_container else "false"
+        yield "containerIdleTimeout", config.container_idle_timeout
+    if config.cache_mounts:
+        caches = [f"{name} -> {path}" for name, path in config.cache_mounts.items()]
+        yield "cacheMounts", ", ".join(caches)
+    if config.container_mounts:
+        mounts = [f"{path}: {strategy}" for path, strategy in config.container_mounts.items()]
+        yield "containerMounts", ", ".join(mounts)
     yield "shell", config.shell
 
 
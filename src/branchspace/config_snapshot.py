@@ -0,0 +1,270 @@
+"""Cached snapshots of validated configuration.
+
+Validating ``branchspace.json`` means importing pydantic and running every
+model validator, yet the file rarely changes. After a successful load the
+validated configuration is pickled into the repository's state directory
+together with a small pydantic-free view of the settings that fast commands
+such as ``cd`` need. A snapshot is only used while its key still matches: the
+config file path, mtime and size, ``BRANCHSPACE_BASE`` and the branchspace
+version (with the config module's mtime, for editable installs).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import time
+
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+from branchspace import __version__
+from branchspace.git_utils import GitRepository
+from branchspace.git_utils import find_repository
+from branchspace.git_utils import get_git_root
+from branchspace.state import STATE_DIRNAME
+from branchspace.state import write_bytes_atomic
+from branchspace.template import TemplateVariableError
+from branchspace.template import find_template_variables
+from branchspace.template import substitute_template
+
+
+if TYPE_CHECKING:
+    from branchspace.config import BranchspaceConfig
+
+
+# Config filename
+CONFIG_FILENAME = "branchspace.json"
+SNAPSHOT_PREFIX = "config-"
+SNAPSHOT_SUFFIX = ".snapshot"
+BASE_ENV = "BRANCHSPACE_BASE"
+# Files modified this recently are not snapshotted: a second edit within the
+# filesystem's timestamp granularity could keep the same mtime and size
+RACY_WINDOW = 2.0
+_SNAPSHOT_FORMAT = 1
+_PATH_TEMPLATE_VARIABLES = frozenset({"BASE_PATH", "BRANCH_NAME", "SOURCE_BRANCH", "PROJECT_NAME"})
+
+SnapshotKey = tuple[str, int, int, str, str]
+
+_SCHEMA_FILE = Path(__file__).with_name("config.py")
+
+
+class ConfigError(Exception):
+    """Error loading or parsing configuration."""
+
+    def __init__(self, message: str, path: Path | None = None):
+        self.path = path
+        super().__init__(message)
+
+
+def find_config_file(start_path: Path | None = None) -> Path | None:
+    """Search for branchspace.json from start_path up to git root.
+
+    Args:
+        start_path: Starting directory for search. Defaults to cwd.
+
+    Returns:
+        Path to config file if found, None otherwise.
+    """
+    if start_path is None:
+        start_path = Path.cwd()
+
+    start_path = start_path.resolve()
+
+    # Get git root to know where to stop searching, without forking git if possible
+    repository = find_repository(start_path)
+    git_root = repository.worktree if repository is not None else get_git_root(start_path)
+
+    # If not in a git repo, only check start_path
+    if git_root is None:
+        config_path = start_path / CONFIG_FILENAME
+        return config_path if config_path.is_file() else None
+
+    git_root = git_root.resolve()
+
+    # Search from start_path up to git root
+    current = start_path
+    while True:
+        config_path = current / CONFIG_FILENAME
+        if config_path.is_file():
+            return config_path
+
+        # Stop if we've reached git root
+        if current == git_root:
+            break
+
+        # Move up one directory
+        parent = current.parent
+        if parent == current:
+            # Reached filesystem root
+            break
+        current = parent
+
+    return None
+
+
+@dataclass(frozen=True)
+class RootSnapshot:
+    """A placement root as recorded in a snapshot."""
+
+    path: str
+    ephemeral: bool
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Validated configuration plus the settings hot paths read without pydantic.
+
+    ``model`` holds the pickled ``BranchspaceConfig``; unpickling it imports
+    pydantic, so only commands that need the full configuration do so.
+    """
+
+    key: SnapshotKey
+    worktree_path_template: str
+    worktree_roots: tuple[RootSnapshot, ...]
+    project_name: str
+    # Why the path template cannot be expanded, found once when snapshotting
+    template_error: str | None
+    model: bytes
+
+    def config(self) -> BranchspaceConfig:
+        """Return the full validated configuration, without validating it again."""
+        config: BranchspaceConfig = pickle.loads(self.model)
+        return config
+
+    def worktree_path(
+        self,
+        branch: str,
+        repo_root: Path,
+        source_branch: str,
+        placement_root: Path | None = None,
+    ) -> Path:
+        """Return the path the path template gives ``branch``'s worktree.
+
+        Raises:
+            TemplateVariableError: If the template uses unsupported variables.
+        """
+        if self.template_error is not None:
+            raise TemplateVariableError(self.template_error)
+        base_path = repo_root.name
+        variables = {
+            "BASE_PATH": base_path,
+            "BRANCH_NAME": branch,
+            "SOURCE_BRANCH": source_branch,
+            "PROJECT_NAME": self.project_name or base_path,
+        }
+        path = Path(substitute_template(self.worktree_path_template, variables, strict=False))
+        if not path.is_absolute():
+            path = (placement_root or repo_root) / path
+        return path
+
+
+def snapshot_key(path: Path | None) -> SnapshotKey:
+    """Return the cache key of the configuration loaded from ``path``."""
+    name, mtime, size = "", 0, 0
+    if path is not None:
+        name = str(path.absolute())
+        try:
+            stat = path.stat()
+        except OSError:
+            mtime, size = -1, -1
+        else:
+            mtime, size = stat.st_mtime_ns, stat.st_size
+    try:
+        version = f"{__version__}+{_SCHEMA_FILE.stat().st_mtime_ns}"
+    except OSError:
+        version = __version__
+    return (name, mtime, size, os.environ.get(BASE_ENV, ""), version)
+
+
+def _template_error(template: str) -> str | None:
+    if "$WORKTREE_PATH" in template:
+        return "worktreePathTemplate cannot reference $WORKTREE_PATH."
+    for name in find_template_variables(template):
+        if name not in _PATH_TEMPLATE_VARIABLES:
+            return f"Unknown template variable: {name}"
+    return None
+
+
+def build_snapshot(config: BranchspaceConfig, key: SnapshotKey) -> ConfigSnapshot:
+    """Snapshot a validated configuration under ``key``."""
+    return ConfigSnapshot(
+        key=key,
+        worktree_path_template=config.worktree_path_template,
+        worktree_roots=tuple(
+            RootSnapshot(root.path, root.ephemeral) for root in config.worktree_roots
+        ),
+        project_name=config.project_name,
+        template_error=_template_error(config.worktree_path_template),
+        model=pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL),
+    )
+
+
+def _snapshot_file(repository: GitRepository, key: SnapshotKey) -> Path:
+    digest = hashlib.sha1(key[0].encode("utf-8")).hexdigest()[:16]
+    return repository.common_dir / STATE_DIRNAME / f"{SNAPSHOT_PREFIX}{digest}{SNAPSHOT_SUFFIX}"
+
+
+def _repository_for(path: Path | None, start: Path | None) -> GitRepository | None:
+    return find_repository(path.parent if path is not None else start)
+
+
+def read_snapshot(path: Path | None, start: Path | None = None) -> ConfigSnapshot | None:
+    """Return the snapshot of the configuration at ``path`` if it is still current.
+
+    ``start`` locates the repository when there is no config file.
+    """
+    repository = _repository_for(path, start)
+    if repository is None:
+        return None
+    key = snapshot_key(path)
+    try:
+        payload: Any = pickle.loads(_snapshot_file(repository, key).read_bytes())
+    except (OSError, pickle.UnpicklingError, AttributeError, EOFError, ImportError, ValueError):
+        return None
+    if not isinstance(payload, tuple) or payload[0] != _SNAPSHOT_FORMAT:
+        return None
+    snapshot = payload[1]
+    if not isinstance(snapshot, ConfigSnapshot) or snapshot.key != key:
+        return None
+    return snapshot
+
+
+def write_snapshot(snapshot: ConfigSnapshot, start: Path | None = None) -> None:
+    """Store ``snapshot`` in the state directory; failures are ignored."""
+    name, mtime, _size, _base, _version = snapshot.key
+    path = Path(name) if name else None
+    if mtime > 0 and time.time() - mtime / 1e9 < RACY_WINDOW:
+        return
+    repository = _repository_for(path, start)
+    if repository is None:
+        return
+    target = _snapshot_file(repository, snapshot.key)
+    content = pickle.dumps((_SNAPSHOT_FORMAT, snapshot), protocol=pickle.HIGHEST_PROTOCOL)
+    with suppress(OSError):
+        write_bytes_atomic(target, content)
+
+
+def load_snapshot(path: Path | None, start: Path | None = None) -> ConfigSnapshot:
+    """Return a current snapshot of the configuration at ``path``.
+
+    Only a missing or stale snapshot loads and validates the config file.
+
+    Raises:
+        ConfigError: If the config file exists but is invalid.
+    """
+    snapshot = read_snapshot(path, start)
+    if snapshot is not None:
+        return snapshot
+
+    from branchspace.config import load_config_uncached
+
+    # Keyed before reading, so an edit racing the load leaves a stale key behind
+    key = snapshot_key(path)
+    snapshot = build_snapshot(load_config_uncached(path), key)
+    write_snapshot(snapshot, start)
+    return snapshot
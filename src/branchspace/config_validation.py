@@ -0,0 +1,88 @@
+"""Validators for config values that the Docker modules interpret.
+
+Pull policies, idle timeouts, cache mounts and container mounts are checked
+when ``branchspace.json`` is loaded, but acted on by the Docker modules. The
+checks and the values they share live here, free of Docker and pydantic
+imports, so loading the config never pulls in the Docker modules and the
+Docker modules never need the config models.
+"""
+
+from __future__ import annotations
+
+import re
+
+from pathlib import PurePosixPath
+from typing import Any
+
+
+PULL_ALWAYS = "always"
+PULL_MISSING = "missing"
+PULL_NEVER = "never"
+TTL_PREFIX = "ttl:"
+
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)([smhdw]?)")
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_CACHE_NAME_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]*")
+
+
+def parse_duration(value: str) -> float:
+    """Parse a duration such as ``90s``, ``30m``, ``12h``, ``7d`` or ``1h30m`` into seconds.
+
+    Raises:
+        ValueError: If ``value`` is not a duration.
+    """
+    position = 0
+    total = 0.0
+    while position < len(value):
+        match = _DURATION_PATTERN.match(value, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid duration: {value!r}")
+        total += float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+        position = match.end()
+    if position == 0:
+        raise ValueError("Duration cannot be empty")
+    return total
+
+
+def validate_pull_policy(policy: str) -> str:
+    """Return ``policy`` if it is a valid pull policy.
+
+    Raises:
+        ValueError: If ``policy`` is not ``always``, ``missing``, ``never`` or
+            ``ttl:<duration>``.
+    """
+    if policy in (PULL_ALWAYS, PULL_MISSING, PULL_NEVER):
+        return policy
+    if policy.startswith(TTL_PREFIX):
+        parse_duration(policy.removeprefix(TTL_PREFIX))
+        return policy
+    raise ValueError(f"pullPolicy must be always, missing, never or ttl:<duration>, not {policy!r}")
+
+
+def validate_cache_mounts(mounts: dict[str, str]) -> dict[str, str]:
+    """Return ``mounts`` if every cache name and container path is valid.
+
+    Raises:
+        ValueError: On a name Docker would reject or a relative path.
+    """
+    for name, path in mounts.items():
+        if not _CACHE_NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Invalid cache name {name!r}: use letters, digits, '_', '.' or '-'")
+        if not path.startswith("/"):
+            raise ValueError(f"Cache path for {name!r} must be absolute, not {path!r}")
+    return mounts
+
+
+def validate_container_mounts(mounts: dict[str, Any]) -> dict[str, Any]:
+    """Return ``mounts`` keyed by normalized worktree-relative paths.
+
+    Raises:
+        ValueError: On an absolute path or one outside the worktree.
+    """
+    normalized = {}
+    for path, strategy in mounts.items():
+        relative = PurePosixPath(path)
+        if relative.is_absolute() or ".." in relative.parts or not relative.parts:
+            raise ValueError(f"Mount path {path!r} must be relative and inside the worktree")
+        normalized[relative.as_posix()] = strategy
+    return normalized
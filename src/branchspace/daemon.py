@@ -0,0 +1,420 @@
+"""Optional per-repository daemon keeping repository state warm.
+
+The daemon listens on a Unix socket (see ``daemon_client.socket_path``) and
+answers one JSON object per line with ``{"ok": true, "result": ...}``. It keeps
+the worktree list, a fuzzy-match index over it, branch names and per-worktree
+dirty flags in memory and drops them when inotify reports a change under the
+git directory or a worktree root; where inotify is unavailable, mtimes are
+polled instead. inotify is not recursive, so edits below a worktree's top level are only noticed once
+the status TTL runs out. The daemon exits after ``BRANCHSPACE_DAEMON_IDLE``
+seconds without requests.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+from branchspace.daemon_client import RuntimeDirError
+from branchspace.daemon_client import ensure_runtime_dir
+from branchspace.daemon_client import socket_path
+from branchspace.fuzzy import FuzzyIndex
+from branchspace.git_utils import GitRepository
+from branchspace.git_utils import GitWorktree
+from branchspace.git_utils import find_repository
+from branchspace.git_utils import has_uncommitted_changes_with_untracked
+from branchspace.git_utils import list_branch_names
+from branchspace.git_utils import list_worktrees
+from branchspace.git_utils import worktree_admin_dir
+from branchspace.state import file_lock
+from branchspace.worktree_index import accessed_times
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+IDLE_ENV = "BRANCHSPACE_DAEMON_IDLE"
+DEFAULT_IDLE_SECONDS = 900.0
+# Upper bound on how stale a dirty flag can get when inotify misses an edit
+STATUS_TTL = 5.0
+POLL_INTERVAL = 1.0
+STATUS_WORKERS = 8
+
+WORKTREES = "worktrees"
+REFS = "refs"
+_STATUS_PREFIX = "status:"
+
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _status_key(path: Path) -> str:
+    return f"{_STATUS_PREFIX}{path}"
+
+
+def _idle_seconds() -> float:
+    try:
+        return float(os.environ.get(IDLE_ENV, DEFAULT_IDLE_SECONDS))
+    except ValueError:
+        return DEFAULT_IDLE_SECONDS
+
+
+class _PollingWatcher:
+    """Report changed watch keys by comparing directory mtimes."""
+
+    def __init__(self) -> None:
+        self._watches: dict[Path, tuple[tuple[str, ...], int]] = {}
+
+    @staticmethod
+    def _mtime(path: Path) -> int:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return 0
+
+    def watch(self, path: Path, keys: tuple[str, ...]) -> None:
+        if path not in self._watches:
+            self._watches[path] = (keys, self._mtime(path))
+
+    def wait(self, timeout: float) -> set[str]:
+        time.sleep(timeout)
+        changed: set[str] = set()
+        for path, (keys, mtime) in list(self._watches.items()):
+            current = self._mtime(path)
+            if current != mtime:
+                self._watches[path] = (keys, current)
+                changed.update(keys)
+        return changed
+
+    def close(self) -> None:
+        self._watches.clear()
+
+
+class _InotifyWatcher:
+    """Report changed watch keys from Linux inotify events."""
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._keys: dict[int, tuple[str, ...]] = {}
+
+    def watch(self, path: Path, keys: tuple[str, ...]) -> None:
+        descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if descriptor >= 0:
+            self._keys[descriptor] = keys
+
+    def wait(self, timeout: float) -> set[str]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: set[str] = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            descriptor, _mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            start = offset + _EVENT_HEADER.size
+            name = buffer[start : start + length].rstrip(b"\0")
+            offset = start + length
+            # Lock files come and go on every git command, including our own probes
+            if not name.endswith(b".lock"):
+                changed.update(self._keys.get(descriptor, ()))
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _make_watcher() -> _InotifyWatcher | _PollingWatcher:
+    if sys.platform.startswith("linux"):
+        with suppress(OSError, AttributeError):
+            return _InotifyWatcher()
+    return _PollingWatcher()
+
+
+class RepositoryState:
+    """Cached answers for one repository, invalidated by watch keys."""
+
+    def __init__(self, repository: GitRepository) -> None:
+        self.repository = repository
+        self._lock = threading.Lock()
+        self._worktrees: list[GitWorktree] | None = None
+        self._refs: list[str] | None = None
+        self._dirty: dict[str, tuple[float, bool]] = {}
+        self._fuzzy: FuzzyIndex | None = None
+        self._watcher = _make_watcher()
+        self._watched: set[Path] = set()
+        self._watch_static()
+
+    def _watch(self, path: Path, keys: tuple[str, ...]) -> None:
+        if path in self._watched or not path.is_dir():
+            return
+        self._watched.add(path)
+        self._watcher.watch(path, keys)
+
+    def _watch_static(self) -> None:
+        common_dir = self.repository.common_dir
+        main_root = common_dir.parent
+        # HEAD, index and packed-refs of the main worktree live here
+        self._watch(common_dir, (WORKTREES, REFS, _status_key(main_root)))
+        self._watch(common_dir / "worktrees", (WORKTREES,))
+        for namespace in ("refs/heads", "refs/remotes"):
+            root = common_dir / namespace
+            self._watch(root, (REFS,))
+            if root.is_dir():
+                for directory, _subdirs, _files in os.walk(root):
+                    self._watch(Path(directory), (REFS,))
+
+    def _watch_worktrees(self, worktrees: Iterable[GitWorktree]) -> None:
+        admin_root = self.repository.common_dir / "worktrees"
+        for worktree in worktrees:
+            key = _status_key(worktree.path)
+            self._watch(worktree.path, (key,))
+            admin_dir = worktree_admin_dir(worktree.path)
+            if admin_dir is not None and admin_dir.parent == admin_root:
+                self._watch(admin_dir, (WORKTREES, key))
+
+    def invalidate(self, keys: set[str]) -> None:
+        with self._lock:
+            if WORKTREES in keys:
+                self._worktrees = None
+                self._fuzzy = None
+            if REFS in keys:
+                self._refs = None
+            for key in keys:
+                if key.startswith(_STATUS_PREFIX):
+                    self._dirty.pop(key, None)
+
+    def process_events(self, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for changes and drop affected caches."""
+        changed = self._watcher.wait(timeout)
+        if changed:
+            self.invalidate(changed)
+            # New ref directories (e.g. ``refs/heads/feature/``) need watches too
+            if REFS in changed:
+                self._watch_static()
+
+    def worktrees(self) -> list[GitWorktree]:
+        with self._lock:
+            cached = self._worktrees
+        if cached is not None:
+            return cached
+        worktrees = list_worktrees(self.repository.worktree)
+        self._watch_worktrees(worktrees)
+        with self._lock:
+            self._worktrees = worktrees
+        return worktrees
+
+    def fuzzy_index(self) -> FuzzyIndex:
+        with self._lock:
+            cached = self._fuzzy
+        if cached is not None:
+            return cached
+        branches = [wt.branch for wt in self.worktrees() if not wt.detached]
+        index = FuzzyIndex(branches, accessed_times(self.repository.worktree))
+        with self._lock:
+            self._fuzzy = index
+        return index
+
+    def refs(self) -> list[str]:
+        with self._lock:
+            cached = self._refs
+        if cached is not None:
+            return cached
+        refs = list_branch_names(self.repository.worktree)
+        with self._lock:
+            self._refs = refs
+        return refs
+
+    def is_dirty(self, path: Path) -> bool:
+        key = _status_key(path)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._dirty.get(key)
+        if cached is not None and now - cached[0] < STATUS_TTL:
+            return cached[1]
+        dirty = has_uncommitted_changes_with_untracked(path)
+        with self._lock:
+            self._dirty[key] = (now, dirty)
+        return dirty
+
+    def statuses(self) -> list[dict[str, Any]]:
+        worktrees = self.worktrees()
+        with ThreadPoolExecutor(max_workers=STATUS_WORKERS) as executor:
+            dirty = list(executor.map(lambda wt: self.is_dirty(wt.path), worktrees))
+        return [
+            {
+                "branch": worktree.branch,
+                "path": str(worktree.path),
+                "detached": worktree.detached,
+                "dirty": flag,
+            }
+            for worktree, flag in zip(worktrees, dirty)
+        ]
+
+    def resolve(self, branch: str) -> str | None:
+        for worktree in self.worktrees():
+            if worktree.branch == branch and (worktree.path / ".git").exists():
+                return str(worktree.path)
+        return None
+
+    def close(self) -> None:
+        self._watcher.close()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: _DaemonServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            self.server.touch()
+            try:
+                request = json.loads(line)
+                response = {"ok": True, "result": self.server.dispatch(request)}
+            except Exception as error:  # noqa: BLE001 - reported to the client
+                response = {"ok": False, "error": str(error)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, owner: BranchspaceDaemon) -> None:
+        self.owner = owner
+        super().__init__(os.fspath(path), _RequestHandler)
+
+    def touch(self) -> None:
+        self.owner.last_request = time.monotonic()
+
+    def dispatch(self, request: dict[str, Any]) -> Any:
+        return self.owner.dispatch(request)
+
+
+class BranchspaceDaemon:
+    """Serve a repository's cached state until idle or shut down."""
+
+    def __init__(self, repository: GitRepository, *, idle_timeout: float | None = None) -> None:
+        self.repository = repository
+        self.idle_timeout = _idle_seconds() if idle_timeout is None else idle_timeout
+        self.state = RepositoryState(repository)
+        ensure_runtime_dir()
+        self.socket_path = socket_path(repository.common_dir)
+        self.socket_path.unlink(missing_ok=True)
+        self.last_request = time.monotonic()
+        self._stopped = threading.Event()
+        self._server = _DaemonServer(self.socket_path, self)
+
+    def dispatch(self, request: dict[str, Any]) -> Any:
+        op = request.get("op")
+        if op == "ping":
+            return "pong"
+        if op == "worktrees":
+            return [
+                {"branch": wt.branch, "path": str(wt.path), "detached": wt.detached}
+                for wt in self.state.worktrees()
+            ]
+        if op == "match":
+            matches = self.state.fuzzy_index().rank(str(request["query"]), request.get("limit"))
+            return [match.name for match in matches]
+        if op == "refs":
+            return self.state.refs()
+        if op == "statuses":
+            return self.state.statuses()
+        if op == "status":
+            return self.state.is_dirty(Path(request["path"]))
+        if op == "resolve":
+            return self.state.resolve(str(request["branch"]))
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return True
+        raise ValueError(f"Unknown request: {op!r}")
+
+    def _watch_loop(self) -> None:
+        while not self._stopped.is_set():
+            self.state.process_events(POLL_INTERVAL)
+            idle = time.monotonic() - self.last_request
+            if idle > self.idle_timeout or not self.repository.common_dir.is_dir():
+                self.shutdown()
+
+    def serve_forever(self) -> None:
+        """Answer requests until ``shutdown`` is called or the idle timeout passes."""
+        watcher = threading.Thread(target=self._watch_loop, daemon=True)
+        watcher.start()
+        try:
+            self._server.serve_forever(poll_interval=0.2)
+        finally:
+            self._stopped.set()
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            watcher.join()
+            self.state.close()
+
+    def shutdown(self) -> None:
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self._server.shutdown()
+
+
+def run_daemon(repo_root: Path) -> None:
+    """Run the daemon for the repository containing ``repo_root`` unless one is running.
+
+    Nothing is started when the socket directory is not private to the user.
+    """
+    repository = find_repository(repo_root)
+    if repository is None:
+        return
+    try:
+        ensure_runtime_dir()
+    except RuntimeDirError:
+        return
+    lock_path = socket_path(repository.common_dir).with_suffix(".lock")
+    with file_lock(lock_path, blocking=False) as acquired:
+        if not acquired:
+            return
+        BranchspaceDaemon(repository).serve_forever()
+
+
+if __name__ == "__main__":
+    run_daemon(Path(sys.argv[1]))
@@ -0,0 +1,144 @@
+"""Client side of the optional branchspace daemon.
+
+Callers ask the daemon first and fall back to doing the work themselves when
+``query`` returns None, which happens whenever no daemon is listening, the
+request fails or it takes longer than its timeout. With ``BRANCHSPACE_DAEMON``
+set, a missing daemon is started in the background for later commands.
+
+Sockets live in ``$XDG_RUNTIME_DIR/branchspace`` or, without it, in
+``branchspace-<uid>`` under the temporary directory, where any user could
+have created the path first. Both sides therefore check that the directory is
+owned by the current user with mode ``0700`` before using it; the daemon
+refuses to start otherwise and clients take the fallback path.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import stat
+import tempfile
+
+from pathlib import Path
+from typing import Any
+
+from branchspace.background import spawn_module
+from branchspace.git_utils import GitRepository
+from branchspace.git_utils import find_repository
+
+
+DAEMON_ENV = "BRANCHSPACE_DAEMON"
+DEFAULT_TIMEOUT = 0.05
+
+
+def daemon_enabled() -> bool:
+    """Return True when the user opted into auto-starting the daemon."""
+    return os.environ.get(DAEMON_ENV, "") not in {"", "0"}
+
+
+class RuntimeDirError(RuntimeError):
+    """Raised when the daemon socket directory is not private to the user."""
+
+
+def runtime_dir() -> Path:
+    """Return the private directory holding daemon sockets."""
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if base:
+        return Path(base) / "branchspace"
+    return Path(tempfile.gettempdir()) / f"branchspace-{os.getuid()}"
+
+
+def is_private_dir(directory: Path) -> bool:
+    """Return True if ``directory`` is a real directory owned by the user with mode 0700."""
+    try:
+        info = os.lstat(directory)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(info.st_mode)
+        and info.st_uid == os.getuid()
+        and stat.S_IMODE(info.st_mode) == 0o700
+    )
+
+
+def ensure_runtime_dir() -> Path:
+    """Create the runtime directory if needed and return it once verified private.
+
+    Raises:
+        RuntimeDirError: If it cannot be created, or another user owns it, or
+            its mode lets others in.
+    """
+    directory = runtime_dir()
+    try:
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    except OSError as exc:
+        raise RuntimeDirError(f"Cannot create {directory}: {exc}") from exc
+    if not is_private_dir(directory):
+        raise RuntimeDirError(f"{directory} is not a mode 0700 directory owned by the current user")
+    return directory
+
+
+def socket_path(common_dir: Path) -> Path:
+    """Return the socket path for a repository.
+
+    Sockets live in a short runtime directory rather than the git directory
+    because Unix socket paths are limited to about 100 bytes.
+    """
+    digest = hashlib.sha1(os.fsencode(common_dir)).hexdigest()[:16]
+    return runtime_dir() / f"{digest}.sock"
+
+
+def start_daemon(repository: GitRepository) -> None:
+    """Start a detached daemon for the repository; a running one makes it exit."""
+    try:
+        spawn_module("branchspace.daemon", str(repository.worktree))
+    except OSError:
+        return
+
+
+def _request(path: Path, payload: dict[str, Any], timeout: float) -> Any:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(os.fspath(path))
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    response = json.loads(line)
+    if not isinstance(response, dict) or not response.get("ok"):
+        return None
+    return response.get("result")
+
+
+def query(
+    op: str,
+    repo_root: Path | None = None,
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    **params: Any,
+) -> Any:
+    """Send one request to the repository's daemon.
+
+    Returns the daemon's result, or None when the caller should fall back.
+    """
+    repository = find_repository(repo_root)
+    if repository is None:
+        return None
+    path = socket_path(repository.common_dir)
+    if not path.exists():
+        if daemon_enabled():
+            start_daemon(repository)
+        return None
+    if not is_private_dir(path.parent):
+        # Whoever controls the directory could answer in the daemon's place
+        return None
+    try:
+        return _request(path, {"op": op, **params}, timeout)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Socket left behind by a daemon that died
+        if daemon_enabled():
+            start_daemon(repository)
+        return None
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,340 @@
+"""Minimal Docker Engine API client over the daemon's Unix socket.
+
+Requests share one HTTP/1.1 keep-alive connection, so a discovery or purge
+pass costs one connect and a handful of round trips instead of a ``docker``
+process per step. Streaming endpoints (image pulls) are read line by line as
+the engine produces them. Exec sessions are started detached and polled,
+which keeps the connection reusable; interactive sessions still go through the
+CLI, which owns terminal handling.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import select
+import socket
+import time
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+from urllib.parse import quote
+from urllib.parse import urlencode
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from collections.abc import Mapping
+
+
+DEFAULT_SOCKET = "/var/run/docker.sock"
+DEFAULT_CONTEXT = "default"
+# Requests that can be sent again safely when the engine drops the connection
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "DELETE"})
+DEFAULT_TIMEOUT = 60.0
+EXEC_POLL_INTERVAL = 0.01
+
+Filters = dict[str, list[str]]
+
+
+class DockerAPIError(RuntimeError):
+    """Raised when the engine rejects a request or cannot be reached."""
+
+    def __init__(self, message: str, status: int | None = None):
+        self.status = status
+        super().__init__(message)
+
+
+def _cli_config() -> dict[str, Any]:
+    """Return the docker CLI's ``config.json``, or nothing when it is missing or invalid."""
+    config_dir = os.environ.get("DOCKER_CONFIG") or Path.home() / ".docker"
+    try:
+        data = json.loads((Path(config_dir) / "config.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _current_context() -> str:
+    """Return the context the CLI would use: ``DOCKER_CONTEXT``, else its config file's."""
+    context = os.environ.get("DOCKER_CONTEXT") or _cli_config().get("currentContext")
+    return context if isinstance(context, str) and context else DEFAULT_CONTEXT
+
+
+def has_registry_credentials() -> bool:
+    """Return True if the CLI is configured with credentials for any registry.
+
+    Credentials may live in credential helpers that only the CLI runs, so
+    pulls are left to it whenever any are configured.
+    """
+    config = _cli_config()
+    return any(config.get(key) for key in ("auths", "credsStore", "credHelpers"))
+
+
+def socket_path_from_env() -> Path | None:
+    """Return the engine socket to use, or None when only the CLI can reach it.
+
+    A ``DOCKER_HOST`` other than ``unix://`` or a context other than
+    ``default``, whether from ``DOCKER_CONTEXT`` or ``docker context use``, is
+    left to the CLI, which knows how to resolve them.
+    """
+    host = os.environ.get("DOCKER_HOST")
+    if host:
+        return Path(host.removeprefix("unix://")) if host.startswith("unix://") else None
+    if _current_context() != DEFAULT_CONTEXT:
+        return None
+    return Path(DEFAULT_SOCKET)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float | None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self._socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def _quote(name: str) -> str:
+    # Image references keep their registry, namespace and tag separators
+    return quote(name, safe="/:@")
+
+
+class EngineClient:
+    """A keep-alive connection to the Docker Engine API."""
+
+    def __init__(self, socket_path: Path | str, timeout: float | None = DEFAULT_TIMEOUT) -> None:
+        self.socket_path = str(socket_path)
+        self._connection = _UnixHTTPConnection(self.socket_path, timeout)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        params: Mapping[str, Any] | None,
+        body: Any,
+    ) -> http.client.HTTPResponse:
+        query = {
+            key: json.dumps(value) if isinstance(value, dict) else value
+            for key, value in (params or {}).items()
+            if value is not None
+        }
+        url = f"{path}?{urlencode(query)}" if query else path
+        headers = {"Host": "docker"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        self._drop_if_closed()
+        try:
+            return self._request_once(method, url, payload, headers)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as exc:
+            self._connection.close()
+            # The engine may have acted on a request it never answered, so
+            # only requests that are safe to repeat are sent again
+            if method not in IDEMPOTENT_METHODS:
+                raise DockerAPIError(f"Cannot reach Docker at {self.socket_path}: {exc}") from exc
+        try:
+            return self._request_once(method, url, payload, headers)
+        except (OSError, http.client.HTTPException) as exc:
+            self._connection.close()
+            raise DockerAPIError(f"Cannot reach Docker at {self.socket_path}: {exc}") from exc
+
+    def _drop_if_closed(self) -> None:
+        """Close a keep-alive connection the engine has already hung up on.
+
+        An idle connection has nothing to read until the next request, so a
+        readable socket means the engine closed it; reconnecting before the
+        request is written makes the send safe for every method.
+        """
+        sock = self._connection.sock
+        if sock is None:
+            return
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            readable = [sock]
+        if readable:
+            self._connection.close()
+
+    def _request_once(
+        self, method: str, url: str, payload: bytes | None, headers: dict[str, str]
+    ) -> http.client.HTTPResponse:
+        try:
+            self._connection.request(method, url, body=payload, headers=headers)
+            return self._connection.getresponse()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            raise
+        except (OSError, http.client.HTTPException) as exc:
+            self._connection.close()
+            raise DockerAPIError(f"Cannot reach Docker at {self.socket_path}: {exc}") from exc
+
+    @staticmethod
+    def _error(response: http.client.HTTPResponse, data: bytes) -> DockerAPIError:
+        try:
+            message = json.loads(data).get("message", "")
+        except (ValueError, AttributeError):
+            message = data.decode("utf-8", "replace").strip()
+        return DockerAPIError(message or f"HTTP {response.status}", response.status)
+
+    def call(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Mapping[str, Any] | None = None,
+        body: Any = None,
+    ) -> Any:
+        """Send a request and return its decoded JSON body (None when empty).
+
+        Raises:
+            DockerAPIError: On an error status or a connection failure.
+        """
+        response = self._send(method, path, params, body)
+        data = response.read()
+        if response.status >= 400:
+            raise self._error(response, data)
+        if not data or not response.getheader("Content-Type", "").startswith("application/json"):
+            return None
+        return json.loads(data)
+
+    def stream(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Mapping[str, Any] | None = None,
+        body: Any = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Send a request and yield the JSON messages of its streamed body.
+
+        Raises:
+            DockerAPIError: On an error status, a connection failure or an
+                ``error`` message in the stream.
+        """
+        response = self._send(method, path, params, body)
+        if response.status >= 400:
+            raise self._error(response, response.read())
+        try:
+            for line in response:
+                line = line.strip()
+                if not line:
+                    continue
+                message = json.loads(line)
+                if message.get("error"):
+                    raise DockerAPIError(str(message["error"]))
+                yield message
+            # Reading to the end releases the connection for the next request
+            response.read()
+        finally:
+            if not response.isclosed():
+                # Abandoned mid-stream; the rest of the body would poison the connection
+                self._connection.close()
+
+    def ping(self) -> bool:
+        try:
+            self.call("GET", "/_ping")
+        except DockerAPIError:
+            return False
+        return True
+
+    def list_containers(self, filters: Filters) -> list[dict[str, Any]]:
+        return list(self.call("GET", "/containers/json", params={"all": 1, "filters": filters}))
+
+    def list_images(self, filters: Filters) -> list[dict[str, Any]]:
+        return list(self.call("GET", "/images/json", params={"filters": filters}))
+
+    def list_volumes(self, filters: Filters) -> list[dict[str, Any]]:
+        data = self.call("GET", "/volumes", params={"filters": filters}) or {}
+        return list(data.get("Volumes") or [])
+
+    def inspect_container(self, name: str) -> dict[str, Any] | None:
+        try:
+            return dict(self.call("GET", f"/containers/{_quote(name)}/json"))
+        except DockerAPIError as exc:
+            if exc.status == 404:
+                return None
+            raise
+
+    def inspect_image(self, name: str) -> dict[str, Any] | None:
+        try:
+            return dict(self.call("GET", f"/images/{_quote(name)}/json"))
+        except DockerAPIError as exc:
+            if exc.status == 404:
+                return None
+            raise
+
+    def start_container(self, name: str) -> None:
+        self.call("POST", f"/containers/{_quote(name)}/start")
+
+    def stop_container(self, name: str) -> None:
+        self.call("POST", f"/containers/{_quote(name)}/stop")
+
+    def remove_container(self, name: str, *, force: bool = False) -> None:
+        self.call("DELETE", f"/containers/{_quote(name)}", params={"force": int(force)})
+
+    def remove_image(self, name: str, *, force: bool = False) -> None:
+        self.call("DELETE", f"/images/{_quote(name)}", params={"force": int(force)})
+
+    def remove_volume(self, name: str) -> None:
+        self.call("DELETE", f"/volumes/{_quote(name)}")
+
+    def create_volume(self, name: str, labels: Mapping[str, str]) -> None:
+        self.call("POST", "/volumes/create", body={"Name": name, "Labels": dict(labels)})
+
+    def volume_usage(self) -> list[dict[str, Any]]:
+        """Return the engine's volumes with their ``UsageData`` sizes computed."""
+        data = self.call("GET", "/system/df", params={"type": "volume"}) or {}
+        return list(data.get("Volumes") or [])
+
+    def commit(self, container: str, image: str, labels: Mapping[str, str]) -> None:
+        """Save ``container`` as ``image``; the rest of its config is kept."""
+        repository, _, tag = image.rpartition(":")
+        if not repository or "/" in tag:
+            repository, tag = image, "latest"
+        params = {"container": container, "repo": repository, "tag": tag}
+        self.call("POST", "/commit", params=params, body={"Labels": dict(labels)})
+
+    def pull(self, image: str) -> Iterator[dict[str, Any]]:
+        """Pull ``image`` and yield its progress messages.
+
+        An untagged reference pulls ``latest``, as ``docker pull`` does; the
+        engine would otherwise pull every tag of the repository.
+        """
+        params = {"fromImage": image}
+        if "@" not in image:
+            reference, _, tag = image.rpartition(":")
+            if not reference or "/" in tag:
+                reference, tag = image, "latest"
+            params = {"fromImage": reference, "tag": tag}
+        return self.stream("POST", "/images/create", params=params)
+
+    def exec_run(self, container: str, command: list[str], timeout: float | None = None) -> int:
+        """Run ``command`` in ``container`` without attaching; return its exit code."""
+        created = self.call(
+            "POST",
+            f"/containers/{_quote(container)}/exec",
+            body={"Cmd": command, "AttachStdout": False, "AttachStderr": False},
+        )
+        exec_id = created["Id"]
+        self.call("POST", f"/exec/{exec_id}/start", body={"Detach": True, "Tty": False})
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = self.call("GET", f"/exec/{exec_id}/json")
+            if not state.get("Running"):
+                return int(state.get("ExitCode") or 0)
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DockerAPIError(f"Command in {container} did not finish in time.")
+            time.sleep(EXEC_POLL_INTERVAL)
@@ -0,0 +1,450 @@
+"""Ways of talking to Docker: the Engine API when reachable, else the CLI.
+
+``get_backend`` picks the Engine API client when the daemon's Unix socket
+answers, and the ``docker`` CLI otherwise (remote hosts, contexts, or no
+socket access). ``BRANCHSPACE_DOCKER_BACKEND`` set to ``api`` or ``cli``
+forces a choice. Both backends answer the same questions, so callers never
+need to know which one they have.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+
+from abc import ABC
+from abc import abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import Any
+
+from branchspace.docker_api import DockerAPIError
+from branchspace.docker_api import EngineClient
+from branchspace.docker_api import Filters
+from branchspace.docker_api import has_registry_credentials
+from branchspace.docker_api import socket_path_from_env
+from branchspace.docker_labels import label_args
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+    from typing import TextIO
+
+
+BACKEND_ENV = "BRANCHSPACE_DOCKER_BACKEND"
+BACKEND_API = "api"
+BACKEND_CLI = "cli"
+
+# The CLI prints decimal units
+_SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(B|kB|KB|MB|GB|TB)")
+_SIZE_UNITS = {"B": 1, "kB": 10**3, "KB": 10**3, "MB": 10**6, "GB": 10**9, "TB": 10**12}
+
+
+class DockerBackendError(RuntimeError):
+    """Raised when a Docker operation fails."""
+
+
+@dataclass(frozen=True)
+class DockerObject:
+    """A container, image or volume and its labels."""
+
+    id: str
+    name: str
+    labels: dict[str, str]
+
+
+class DockerBackend(ABC):
+    """Docker operations branchspace needs outside interactive sessions.
+
+    Backends may be used from several threads at once.
+    """
+
+    @abstractmethod
+    def list_containers(self, filters: Filters) -> list[DockerObject]:
+        """Return all containers, running or not, matching ``filters``."""
+
+    @abstractmethod
+    def list_images(self, filters: Filters) -> list[DockerObject]:
+        """Return the images matching ``filters``."""
+
+    @abstractmethod
+    def list_volumes(self, filters: Filters) -> list[DockerObject]:
+        """Return the volumes matching ``filters``; their ID is their name."""
+
+    @abstractmethod
+    def remove_container(self, container: str) -> None:
+        """Remove a container, stopping it first if needed."""
+
+    @abstractmethod
+    def remove_image(self, image: str) -> None:
+        """Remove an image."""
+
+    @abstractmethod
+    def remove_volume(self, volume: str) -> None:
+        """Remove a volume."""
+
+    @abstractmethod
+    def create_volume(self, volume: str, labels: dict[str, str]) -> None:
+        """Create a volume with ``labels``; an existing volume is left as it is."""
+
+    @abstractmethod
+    def volume_sizes(self) -> dict[str, int]:
+        """Return the disk usage in bytes of each volume whose size is known."""
+
+    @abstractmethod
+    def image_id(self, image: str) -> str | None:
+        """Return the ID of local image ``image``, or None if it is not present."""
+
+    def image_exists(self, image: str) -> bool:
+        """Return True if ``image`` is present locally."""
+        return self.image_id(image) is not None
+
+    @abstractmethod
+    def commit_container(self, container: str, image: str, labels: dict[str, str]) -> None:
+        """Save container ``container`` as image ``image`` with extra ``labels``."""
+
+    @abstractmethod
+    def inspect_container(self, container: str) -> tuple[str, str] | None:
+        """Return a container's status and image, or None if it does not exist."""
+
+    @abstractmethod
+    def start_container(self, container: str) -> None:
+        """Start a stopped container."""
+
+    @abstractmethod
+    def stop_container(self, container: str) -> None:
+        """Stop a running container."""
+
+    @abstractmethod
+    def exec_run(self, container: str, command: list[str]) -> int:
+        """Run ``command`` in a running container and return its exit code."""
+
+    @abstractmethod
+    def pull(self, image: str, output: TextIO | None = None) -> None:
+        """Pull ``image``, reporting progress on ``output``."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release any connections held by the backend."""
+
+
+@contextmanager
+def _api_errors() -> Iterator[None]:
+    try:
+        yield
+    except DockerAPIError as exc:
+        raise DockerBackendError(str(exc)) from exc
+
+
+def _image_name(entry: dict[str, Any]) -> str:
+    tags = [tag for tag in entry.get("RepoTags") or [] if tag != "<none>:<none>"]
+    return tags[0] if tags else str(entry["Id"])
+
+
+class EngineBackend(DockerBackend):
+    """Docker Engine API over keep-alive Unix socket connections, one per thread."""
+
+    def __init__(self, client: EngineClient) -> None:
+        self._socket_path = client.socket_path
+        self._local = threading.local()
+        self._local.client = client
+        self._clients = [client]
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> EngineClient:
+        """The calling thread's connection, opened on first use."""
+        client: EngineClient | None = getattr(self._local, "client", None)
+        if client is None:
+            client = EngineClient(self._socket_path)
+            self._local.client = client
+            with self._lock:
+                self._clients.append(client)
+        return client
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients:
+                client.close()
+
+    def list_containers(self, filters: Filters) -> list[DockerObject]:
+        with _api_errors():
+            entries = self.client.list_containers(filters)
+        return [
+            DockerObject(
+                id=entry["Id"],
+                name=(entry.get("Names") or [entry["Id"]])[0].lstrip("/"),
+                labels=entry.get("Labels") or {},
+            )
+            for entry in entries
+        ]
+
+    def list_images(self, filters: Filters) -> list[DockerObject]:
+        with _api_errors():
+            entries = self.client.list_images(filters)
+        return [
+            DockerObject(id=entry["Id"], name=_image_name(entry), labels=entry.get("Labels") or {})
+            for entry in entries
+        ]
+
+    def list_volumes(self, filters: Filters) -> list[DockerObject]:
+        with _api_errors():
+            entries = self.client.list_volumes(filters)
+        return [
+            DockerObject(id=entry["Name"], name=entry["Name"], labels=entry.get("Labels") or {})
+            for entry in entries
+        ]
+
+    def remove_container(self, container: str) -> None:
+        with _api_errors():
+            self.client.remove_container(container, force=True)
+
+    def remove_image(self, image: str) -> None:
+        with _api_errors():
+            self.client.remove_image(image, force=True)
+
+    def remove_volume(self, volume: str) -> None:
+        with _api_errors():
+            self.client.remove_volume(volume)
+
+    def create_volume(self, volume: str, labels: dict[str, str]) -> None:
+        with _api_errors():
+            self.client.create_volume(volume, labels)
+
+    def volume_sizes(self) -> dict[str, int]:
+        with _api_errors():
+            entries = self.client.volume_usage()
+        sizes = {}
+        for entry in entries:
+            # The engine reports -1 when it could not compute a size
+            size = (entry.get("UsageData") or {}).get("Size", -1)
+            if size >= 0:
+                sizes[entry["Name"]] = int(size)
+        return sizes
+
+    def image_id(self, image: str) -> str | None:
+        with _api_errors():
+            data = self.client.inspect_image(image)
+        return None if data is None else str(data["Id"])
+
+    def commit_container(self, container: str, image: str, labels: dict[str, str]) -> None:
+        with _api_errors():
+            self.client.commit(container, image, labels)
+
+    def inspect_container(self, container: str) -> tuple[str, str] | None:
+        with _api_errors():
+            data = self.client.inspect_container(container)
+        if data is None:
+            return None
+        return data["State"]["Status"], data["Config"]["Image"]
+
+    def start_container(self, container: str) -> None:
+        with _api_errors():
+            self.client.start_container(container)
+
+    def stop_container(self, container: str) -> None:
+        with _api_errors():
+            self.client.stop_container(container)
+
+    def exec_run(self, container: str, command: list[str]) -> int:
+        with _api_errors():
+            return self.client.exec_run(container, command)
+
+    def pull(self, image: str, output: TextIO | None = None) -> None:
+        # The engine only sees credentials the client sends; the CLI resolves them
+        if has_registry_credentials():
+            CLIBackend().pull(image, output)
+            return
+        output = output or sys.stderr
+        with _api_errors():
+            for message in self.client.pull(image):
+                # Per-layer progress ticks are noise outside a live terminal
+                if message.get("progress"):
+                    continue
+                layer = f"{message['id']}: " if message.get("id") else ""
+                print(f"{layer}{message.get('status', '')}", file=output)
+
+
+def parse_size(text: str) -> int | None:
+    """Parse a size as the docker CLI prints it (``0B``, ``12.5kB``, ``1.2GB``)."""
+    match = _SIZE_PATTERN.fullmatch(text.strip())
+    if match is None:
+        return None
+    return round(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def _filter_args(filters: Filters) -> list[str]:
+    args = []
+    for key, values in filters.items():
+        for value in values:
+            args += ["--filter", f"{key}={value}"]
+    return args
+
+
+class CLIBackend(DockerBackend):
+    """The ``docker`` command line client, one process per operation."""
+
+    def close(self) -> None:
+        # Every operation is its own process; nothing stays open
+        return
+
+    def _run(self, *args: str, check: bool = True) -> subprocess.CompletedProcess[str]:
+        try:
+            result = subprocess.run(["docker", *args], capture_output=True, text=True, check=False)
+        except OSError as exc:
+            raise DockerBackendError(f"Cannot run docker: {exc}") from exc
+        if check and result.returncode != 0:
+            raise DockerBackendError(result.stderr.strip() or f"docker {args[0]} failed")
+        return result
+
+    def _lines(self, *args: str) -> list[str]:
+        output = self._run(*args).stdout
+        # An image with several tags is listed once per tag
+        return list(dict.fromkeys(line.strip() for line in output.splitlines() if line.strip()))
+
+    def _inspect(self, *args: str) -> list[dict[str, Any]]:
+        # Objects removed since they were listed are reported on stderr and skipped
+        result = self._run(*args, check=False)
+        try:
+            return list(json.loads(result.stdout or "[]"))
+        except ValueError as exc:
+            raise DockerBackendError(f"Unexpected output from docker {args[0]}") from exc
+
+    def list_containers(self, filters: Filters) -> list[DockerObject]:
+        ids = self._lines("ps", "-a", "-q", "--no-trunc", *_filter_args(filters))
+        if not ids:
+            return []
+        return [
+            DockerObject(
+                id=entry["Id"],
+                name=entry["Name"].lstrip("/"),
+                labels=entry["Config"].get("Labels") or {},
+            )
+            for entry in self._inspect("container", "inspect", *ids)
+        ]
+
+    def list_images(self, filters: Filters) -> list[DockerObject]:
+        ids = self._lines("images", "-q", "--no-trunc", *_filter_args(filters))
+        if not ids:
+            return []
+        return [
+            DockerObject(
+                id=entry["Id"],
+                name=_image_name(entry),
+                labels=entry["Config"].get("Labels") or {},
+            )
+            for entry in self._inspect("image", "inspect", *ids)
+        ]
+
+    def list_volumes(self, filters: Filters) -> list[DockerObject]:
+        names = self._lines("volume", "ls", "-q", *_filter_args(filters))
+        if not names:
+            return []
+        return [
+            DockerObject(id=entry["Name"], name=entry["Name"], labels=entry.get("Labels") or {})
+            for entry in self._inspect("volume", "inspect", *names)
+        ]
+
+    def remove_container(self, container: str) -> None:
+        self._run("rm", "-f", container)
+
+    def remove_image(self, image: str) -> None:
+        self._run("rmi", "-f", image)
+
+    def remove_volume(self, volume: str) -> None:
+        self._run("volume", "rm", volume)
+
+    def create_volume(self, volume: str, labels: dict[str, str]) -> None:
+        self._run("volume", "create", *label_args(labels), volume)
+
+    def volume_sizes(self) -> dict[str, int]:
+        output = self._run("system", "df", "-v", "--format", "{{json .Volumes}}").stdout
+        try:
+            entries = json.loads(output or "[]") or []
+        except ValueError as exc:
+            raise DockerBackendError("Unexpected output from docker system df") from exc
+        sizes = {}
+        for entry in entries:
+            size = parse_size(str(entry.get("Size", "")))
+            if size is not None:
+                sizes[entry["Name"]] = size
+        return sizes
+
+    def image_id(self, image: str) -> str | None:
+        result = self._run("image", "inspect", "--format", "{{.Id}}", image, check=False)
+        if result.returncode != 0:
+            return None
+        return result.stdout.strip() or None
+
+    def commit_container(self, container: str, image: str, labels: dict[str, str]) -> None:
+        changes = [
+            arg
+            for key, value in labels.items()
+            for arg in ("--change", f"LABEL {json.dumps(key)}={json.dumps(value)}")
+        ]
+        self._run("commit", *changes, container, image)
+
+    def inspect_container(self, container: str) -> tuple[str, str] | None:
+        result = self._run(
+            "inspect", "--format", "{{.State.Status}} {{.Config.Image}}", container, check=False
+        )
+        if result.returncode != 0:
+            return None
+        status, _, image = result.stdout.strip().partition(" ")
+        return status, image
+
+    def start_container(self, container: str) -> None:
+        self._run("start", container)
+
+    def stop_container(self, container: str) -> None:
+        self._run("stop", container)
+
+    def exec_run(self, container: str, command: list[str]) -> int:
+        return self._run("exec", container, *command, check=False).returncode
+
+    def pull(self, image: str, output: TextIO | None = None) -> None:
+        try:
+            subprocess.run(["docker", "pull", image], stdout=output, check=True)
+        except OSError as exc:
+            raise DockerBackendError(f"Cannot run docker: {exc}") from exc
+        except subprocess.CalledProcessError as exc:
+            raise DockerBackendError(f"docker pull {image} failed") from exc
+
+
+_backend: DockerBackend | None = None
+
+
+def _engine_backend(socket_path: Path | None) -> EngineBackend | None:
+    if socket_path is None or not os.access(socket_path, os.R_OK | os.W_OK):
+        return None
+    client = EngineClient(socket_path)
+    if not client.ping():
+        client.close()
+        return None
+    return EngineBackend(client)
+
+
+def get_backend() -> DockerBackend:
+    """Return the process-wide Docker backend, choosing it on first use."""
+    global _backend
+    if _backend is None:
+        choice = os.environ.get(BACKEND_ENV, "")
+        engine = None if choice == BACKEND_CLI else _engine_backend(socket_path_from_env())
+        if engine is None and choice == BACKEND_API:
+            raise DockerBackendError("The Docker Engine API socket is not reachable.")
+        _backend = engine or CLIBackend()
+    return _backend
+
+
+def reset_backend() -> None:
+    """Forget the chosen backend, closing its connection."""
+    global _backend
+    if _backend is not None:
+        _backend.close()
+    _backend = None
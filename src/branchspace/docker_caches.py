@@ -0,0 +1,144 @@
+"""Dependency caches shared by every branch container of a repository.
+
+Each entry of ``cacheMounts`` maps a cache name to a path inside the
+container, such as ``"pip": "/root/.cache/pip"``. The cache is a named volume
+labelled with the repository and the cache name, created before the first
+container that mounts it, so package downloads made on one branch are reused
+by all the others.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from branchspace.docker_backend import DockerBackendError
+from branchspace.docker_backend import get_backend
+from branchspace.docker_labels import LABEL_REPO
+from branchspace.docker_labels import repo_digest
+from branchspace.docker_labels import repo_label
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from rich.table import Table
+
+
+CACHE_VOLUME_PREFIX = "branchspace-cache"
+LABEL_CACHE = "dev.branchspace.cache"
+
+_SIZE_UNITS = ["B", "KB", "MB", "GB", "TB"]
+
+
+class DockerCacheError(RuntimeError):
+    """Raised when cache volumes cannot be created, listed or removed."""
+
+
+@dataclass(frozen=True)
+class CacheVolume:
+    """A shared cache volume of the repository."""
+
+    name: str
+    volume: str
+    # Mount point from the current config, None for a cache no longer configured
+    path: str | None
+    size: int | None
+
+
+def cache_volume_name(repo: str, name: str) -> str:
+    """Return the volume holding cache ``name`` of the repository labelled ``repo``."""
+    return f"{CACHE_VOLUME_PREFIX}-{repo_digest(repo)}-{name}"
+
+
+def cache_mount_args(mounts: dict[str, str], worktree_path: Path) -> list[str]:
+    """Return ``--mount`` arguments attaching the configured caches."""
+    repo = repo_label(worktree_path)
+    args = []
+    for name, path in mounts.items():
+        args += ["--mount", f"type=volume,src={cache_volume_name(repo, name)},dst={path}"]
+    return args
+
+
+def ensure_cache_volumes(mounts: dict[str, str], worktree_path: Path) -> None:
+    """Create the labelled cache volumes that do not exist yet.
+
+    Raises:
+        DockerCacheError: If a volume cannot be created.
+    """
+    if not mounts:
+        return
+    repo = repo_label(worktree_path)
+    backend = get_backend()
+    try:
+        for name in mounts:
+            labels = {LABEL_REPO: repo, LABEL_CACHE: name}
+            backend.create_volume(cache_volume_name(repo, name), labels)
+    except DockerBackendError as exc:
+        raise DockerCacheError(str(exc)) from exc
+
+
+def list_caches(mounts: dict[str, str], worktree_path: Path) -> list[CacheVolume]:
+    """Return the repository's cache volumes with their disk usage.
+
+    Raises:
+        DockerCacheError: If Docker cannot be queried.
+    """
+    repo = repo_label(worktree_path)
+    backend = get_backend()
+    try:
+        volumes = backend.list_volumes({"label": [f"{LABEL_REPO}={repo}", LABEL_CACHE]})
+        sizes = backend.volume_sizes() if volumes else {}
+    except DockerBackendError as exc:
+        raise DockerCacheError(str(exc)) from exc
+    caches = [
+        CacheVolume(
+            name=volume.labels[LABEL_CACHE],
+            volume=volume.id,
+            path=mounts.get(volume.labels[LABEL_CACHE]),
+            size=sizes.get(volume.id),
+        )
+        for volume in volumes
+    ]
+    return sorted(caches, key=lambda cache: cache.name)
+
+
+def prune_caches(caches: list[CacheVolume]) -> list[CacheVolume]:
+    """Remove cache volumes and return those Docker refused to remove (still in use)."""
+    backend = get_backend()
+    kept = []
+    for cache in caches:
+        try:
+            backend.remove_volume(cache.volume)
+        except DockerBackendError:
+            kept.append(cache)
+    return kept
+
+
+def format_size(size: int | None) -> str:
+    """Return ``size`` in bytes as a short human-readable string."""
+    if size is None:
+        return "?"
+    value = float(size)
+    for unit in _SIZE_UNITS:
+        if value < 1000 or unit == _SIZE_UNITS[-1]:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1000
+    return f"{size} B"
+
+
+def build_cache_table(caches: list[CacheVolume]) -> Table:
+    """Build a Rich table of cache volumes and their sizes."""
+    # Imported here: config validation imports this module on every load
+    from rich.table import Table
+
+    table = Table(title="Shared caches")
+    table.add_column("Cache", style="cyan")
+    table.add_column("Size", justify="right")
+    table.add_column("Mounted at")
+    table.add_column("Volume", style="dim")
+    for cache in caches:
+        table.add_row(
+            cache.name, format_size(cache.size), cache.path or "(not configured)", cache.volume
+        )
+    return table
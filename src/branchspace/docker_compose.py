@@ -0,0 +1,223 @@
+"""Docker Compose projects as branch environments.
+
+With a ``compose`` container config, every branch runs the compose file as a
+project of its own, named like the branch container, so the stacks of several
+branches run side by side. ``docker compose up --wait`` starts the services
+concurrently, ordered only by their ``depends_on``, and returns once each is
+running and passes its healthcheck; shells then exec into the configured
+service. Started projects are recorded in the ``compose-projects.json`` state
+file, which is how purge finds a stack to take down in one ``docker compose
+down``.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from branchspace.config import ContainerComposeConfig
+from branchspace.docker_shell import DockerCommandPlan
+from branchspace.docker_shell import DockerShellError
+from branchspace.docker_shell import build_container_name
+from branchspace.state import StateError
+from branchspace.state import file_lock
+from branchspace.state import get_state_dir
+from branchspace.state import read_state
+from branchspace.state import write_state
+
+
+if TYPE_CHECKING:
+    from branchspace.config import BranchspaceConfig
+
+
+COMPOSE_PROJECTS_FILENAME = "compose-projects.json"
+COMPOSE_PROJECTS_LOCK = "compose-projects.lock"
+COMPOSE_PROJECTS_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ComposeProject:
+    """A branch's compose project as recorded when it was started."""
+
+    name: str
+    branch: str
+    worktree: str
+    file: str
+
+
+def compose_project_name(branch: str, worktree_path: Path) -> str:
+    """Return the compose project of ``branch``; compose only allows ``[a-z0-9_-]``.
+
+    Like the branch container, the name carries the repository digest, so the
+    same branch of two repositories never shares a stack.
+    """
+    return re.sub(r"[^a-z0-9_-]", "-", build_container_name(branch, worktree_path).lower())
+
+
+def _compose_file(config: ContainerComposeConfig, worktree_path: Path) -> Path:
+    path = Path(config.compose)
+    return path if path.is_absolute() else worktree_path / path
+
+
+def _compose_config(config: BranchspaceConfig) -> ContainerComposeConfig:
+    if not isinstance(config.container_config, ContainerComposeConfig):
+        raise DockerShellError("The container configuration is not a compose project.")
+    return config.container_config
+
+
+def _compose_base(project: str, compose_file: Path, worktree_path: Path) -> list[str]:
+    return [
+        "docker",
+        "compose",
+        "--project-name",
+        project,
+        "--file",
+        str(compose_file),
+        "--project-directory",
+        str(worktree_path),
+    ]
+
+
+def build_up_command(config: ContainerComposeConfig, branch: str, worktree_path: Path) -> list[str]:
+    """Return the command starting the branch's stack and waiting until it is healthy."""
+    project = compose_project_name(branch, worktree_path)
+    base = _compose_base(project, _compose_file(config, worktree_path), worktree_path)
+    return [*base, "up", "--detach", "--wait"]
+
+
+def build_service_exec_command(
+    config: ContainerComposeConfig,
+    branch: str,
+    worktree_path: Path,
+    shell: str,
+    command: str | None,
+    *,
+    tty: bool,
+) -> list[str]:
+    """Return the command running a shell or ``command`` in the configured service."""
+    project = compose_project_name(branch, worktree_path)
+    base = _compose_base(project, _compose_file(config, worktree_path), worktree_path)
+    cmd = [*base, "exec", *([] if tty else ["-T"]), config.service, shell]
+    return [*cmd, "-lc", command] if command else cmd
+
+
+def build_down_command(project: ComposeProject) -> list[str]:
+    """Return the command removing a project's containers, networks and volumes."""
+    cmd = ["docker", "compose", "--project-name", project.name]
+    # Without its file compose still finds the project's resources by label
+    if Path(project.file).is_file():
+        cmd += ["--file", project.file]
+    return [*cmd, "down", "--volumes", "--remove-orphans"]
+
+
+def _projects_path(repo_root: Path) -> Path:
+    return get_state_dir(repo_root) / COMPOSE_PROJECTS_FILENAME
+
+
+def _read_projects(path: Path) -> dict[str, dict[str, str]]:
+    data = read_state(path)
+    if data is None or data.get("version") != COMPOSE_PROJECTS_VERSION:
+        return {}
+    projects = data.get("projects")
+    return projects if isinstance(projects, dict) else {}
+
+
+def list_projects(repo_root: Path) -> list[ComposeProject]:
+    """Return the repository's recorded compose projects."""
+    try:
+        projects = _read_projects(_projects_path(repo_root))
+    except StateError:
+        return []
+    return [
+        ComposeProject(
+            name=name,
+            branch=entry.get("branch", ""),
+            worktree=entry.get("worktree", ""),
+            file=entry.get("file", ""),
+        )
+        for name, entry in sorted(projects.items())
+    ]
+
+
+def _update_projects(repo_root: Path, project: ComposeProject | None, forget: list[str]) -> None:
+    with suppress(StateError, OSError):
+        path = _projects_path(repo_root)
+        with file_lock(path.with_name(COMPOSE_PROJECTS_LOCK)):
+            projects = _read_projects(path)
+            for name in forget:
+                projects.pop(name, None)
+            if project is not None:
+                projects[project.name] = {
+                    "branch": project.branch,
+                    "worktree": project.worktree,
+                    "file": project.file,
+                }
+            write_state(path, {"version": COMPOSE_PROJECTS_VERSION, "projects": projects})
+
+
+def record_project(repo_root: Path, project: ComposeProject) -> None:
+    """Record a started project so purge can find it; failures are ignored."""
+    _update_projects(repo_root, project, [])
+
+
+def remove_project(repo_root: Path, project: ComposeProject) -> bool:
+    """Take a project down and forget it; return False if compose failed."""
+    result = subprocess.run(
+        build_down_command(project), capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        return False
+    _update_projects(repo_root, None, [project.name])
+    return True
+
+
+def start_project(config: BranchspaceConfig, branch: str, worktree_path: Path) -> list[str]:
+    """Bring the branch's stack up and return the command that did it.
+
+    Raises:
+        DockerShellError: If the compose file is missing.
+    """
+    compose = _compose_config(config)
+    compose_file = _compose_file(compose, worktree_path)
+    if not compose_file.is_file():
+        raise DockerShellError(f"Compose file {compose_file} not found.")
+    # Recorded first so purge also finds a stack that failed to become healthy
+    project = ComposeProject(
+        name=compose_project_name(branch, worktree_path),
+        branch=branch,
+        worktree=str(worktree_path.resolve()),
+        file=str(compose_file),
+    )
+    record_project(worktree_path, project)
+    up = build_up_command(compose, branch, worktree_path)
+    subprocess.run(up, check=True)
+    return up
+
+
+def exec_in_service(
+    config: BranchspaceConfig,
+    branch: str,
+    worktree_path: Path,
+    *,
+    command: str | None = None,
+) -> DockerCommandPlan:
+    """Run a shell or ``command`` in the configured service of the branch's stack."""
+    up = start_project(config, branch, worktree_path)
+    exec_command = build_service_exec_command(
+        _compose_config(config),
+        branch,
+        worktree_path,
+        config.shell,
+        command,
+        tty=sys.stdin.isatty(),
+    )
+    subprocess.run(exec_command, check=True)
+    return DockerCommandPlan(
+        commands=[up, exec_command], container_name=compose_project_name(branch, worktree_path)
+    )
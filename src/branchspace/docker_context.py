@@ -0,0 +1,195 @@
+"""Content digests of Docker build inputs.
+
+The digest covers the Dockerfile and every file of the build context that
+``.dockerignore`` lets through, so worktrees with identical build inputs get
+the same digest and can share one image. Files are hashed in parallel; ignored
+directories are not walked at all unless a ``!`` pattern could re-include
+something inside them. ``.git`` entries are always left out: a linked
+worktree's gitfile differs per worktree, and the main worktree's git directory
+changes with every branchspace state write.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import posixpath
+import re
+import stat
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+
+DOCKERIGNORE_FILENAME = ".dockerignore"
+GIT_DIRNAME = ".git"
+MAX_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+_CHUNK_SIZE = 1 << 20
+
+
+class BuildContextError(RuntimeError):
+    """Raised when build inputs cannot be read."""
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    """One compiled ``.dockerignore`` pattern."""
+
+    pattern: re.Pattern[str]
+    negated: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translate a ``.dockerignore`` glob into a regular expression."""
+    parts: list[str] = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**", index):
+            index += 2
+            if pattern.startswith("/", index):
+                # "**/" also matches no directories at all
+                parts.append("(?:.*/)?")
+                index += 1
+            else:
+                parts.append(".*")
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", index + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[index + 1 : end]
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                parts.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                index = end
+        elif char == "\\" and index + 1 < len(pattern):
+            index += 1
+            parts.append(re.escape(pattern[index]))
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+def parse_dockerignore(content: str) -> list[IgnoreRule]:
+    """Compile the patterns of a ``.dockerignore`` file, in order."""
+    rules = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:].strip()
+        line = posixpath.normpath(line.lstrip("/"))
+        if line == ".":
+            continue
+        rules.append(IgnoreRule(re.compile(_translate(line)), negated))
+    return rules
+
+
+def is_excluded(path: str, rules: list[IgnoreRule]) -> bool:
+    """Return True if ``rules`` exclude the context-relative POSIX ``path``.
+
+    As in Docker, a pattern matching any parent directory matches the path and
+    the last matching pattern wins.
+    """
+    segments = path.split("/")
+    prefixes = ["/".join(segments[: depth + 1]) for depth in range(len(segments))]
+    excluded = False
+    for rule in rules:
+        if rule.negated != excluded:
+            continue
+        if any(rule.pattern.fullmatch(prefix) for prefix in prefixes):
+            excluded = not rule.negated
+    return excluded
+
+
+def _read_rules(context: Path, dockerfile: Path) -> list[IgnoreRule]:
+    # BuildKit prefers a Dockerfile-specific ignore file next to the Dockerfile
+    for candidate in (
+        dockerfile.with_name(f"{dockerfile.name}{DOCKERIGNORE_FILENAME}"),
+        context / DOCKERIGNORE_FILENAME,
+    ):
+        try:
+            return parse_dockerignore(candidate.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            continue
+        except OSError as exc:
+            raise BuildContextError(f"Cannot read {candidate}: {exc}") from exc
+    return []
+
+
+def iter_context_files(context: Path, rules: list[IgnoreRule]) -> list[str]:
+    """Return the context-relative paths Docker would send, sorted, without ``.git``."""
+    can_reinclude = any(rule.negated for rule in rules)
+    paths: list[str] = []
+    for root, dirs, files in os.walk(context):
+        relative_root = Path(root).relative_to(context).as_posix()
+        prefix = "" if relative_root == "." else f"{relative_root}/"
+        kept_dirs = []
+        for name in dirs:
+            if name == GIT_DIRNAME:
+                continue
+            relative = f"{prefix}{name}"
+            excluded = is_excluded(relative, rules)
+            if not excluded:
+                paths.append(f"{relative}/")
+            if not excluded or can_reinclude:
+                kept_dirs.append(name)
+        dirs[:] = kept_dirs
+        paths.extend(
+            f"{prefix}{name}"
+            for name in files
+            if name != GIT_DIRNAME and not is_excluded(f"{prefix}{name}", rules)
+        )
+    return sorted(paths)
+
+
+def _hash_entry(context: Path, relative: str) -> str:
+    """Return the digest line of one context entry: type, mode and content."""
+    path = context / relative
+    info = path.lstat()
+    if stat.S_ISDIR(info.st_mode):
+        return f"{relative}\0dir\0{info.st_mode & 0o7777:o}\n"
+    if stat.S_ISLNK(info.st_mode):
+        return f"{relative}\0link\0{os.readlink(path)}\n"
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return f"{relative}\0file\0{info.st_mode & 0o7777:o}\0{digest.hexdigest()}\n"
+
+
+def context_digest(context: Path, dockerfile: Path) -> str:
+    """Return a SHA-256 hex digest of the Dockerfile and the filtered context.
+
+    Raises:
+        BuildContextError: If the context or Dockerfile cannot be read.
+    """
+    if not context.is_dir():
+        raise BuildContextError(f"Build context not found: {context}")
+    try:
+        dockerfile_content = dockerfile.read_bytes()
+    except OSError as exc:
+        raise BuildContextError(f"Cannot read Dockerfile {dockerfile}: {exc}") from exc
+
+    rules = _read_rules(context, dockerfile)
+    paths = iter_context_files(context, rules)
+    digest = hashlib.sha256()
+    digest.update(hashlib.sha256(dockerfile_content).hexdigest().encode())
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            for line in executor.map(partial(_hash_entry, context), paths):
+                digest.update(line.encode("utf-8", "surrogateescape"))
+    except OSError as exc:
+        raise BuildContextError(f"Cannot read build context: {exc}") from exc
+    return digest.hexdigest()
@@ -0,0 +1,57 @@
+"""Labels branchspace puts on the Docker resources it creates.
+
+They record the repository, branch and worktree a resource belongs to, so
+purge and cache commands can find resources with label filters instead of
+deriving names.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+
+from typing import TYPE_CHECKING
+
+from branchspace.git_utils import get_git_common_dir
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+LABEL_REPO = "dev.branchspace.repo"
+LABEL_BRANCH = "dev.branchspace.branch"
+LABEL_WORKTREE = "dev.branchspace.worktree"
+# Resource names carry a short digest of the repository so resources of two
+# repositories with the same branch or cache name do not collide
+REPO_DIGEST_LENGTH = 12
+
+
+def repo_label(worktree_path: Path) -> str:
+    """Return the value identifying the worktree's repository in ``LABEL_REPO``."""
+    common_dir = get_git_common_dir(worktree_path)
+    return str(common_dir if common_dir is not None else worktree_path.resolve())
+
+
+def repo_digest(repo: str) -> str:
+    """Return the short digest of the repository labelled ``repo`` used in resource names."""
+    return hashlib.sha256(repo.encode("utf-8")).hexdigest()[:REPO_DIGEST_LENGTH]
+
+
+def sanitize_name(value: str) -> str:
+    """Return ``value`` with runs of characters Docker names reject replaced by ``-``."""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", value).strip("-")
+
+
+def resource_labels(branch: str, worktree_path: Path) -> dict[str, str]:
+    """Return the labels for a resource owned by ``branch`` at ``worktree_path``."""
+    return {
+        LABEL_REPO: repo_label(worktree_path),
+        LABEL_BRANCH: branch,
+        LABEL_WORKTREE: str(worktree_path.resolve()),
+    }
+
+
+def label_args(labels: dict[str, str]) -> list[str]:
+    """Return ``--label`` arguments for ``docker run``, ``build`` or ``volume create``."""
+    return [arg for key, value in labels.items() for arg in ("--label", f"{key}={value}")]
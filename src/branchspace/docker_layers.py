@@ -0,0 +1,156 @@
+"""Layer reuse between branch images.
+
+The image each branch last built or reused is recorded in the repository's
+``branch-images.json`` state file. A branch whose build inputs differ builds
+with the image of the branch it was created from (``sourceBranch`` in the
+worktree index) as a BuildKit ``--cache-from`` source, so layers the two
+Dockerfiles share are not rebuilt. Every build embeds inline cache metadata,
+which is what lets its image serve as a cache source in turn. Hosts without
+the buildx plugin build on the legacy builder instead, without the cache hit
+report.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from branchspace.state import StateError
+from branchspace.state import file_lock
+from branchspace.state import get_state_dir
+from branchspace.state import read_state
+from branchspace.state import write_state
+from branchspace.worktree_index import read_index
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Iterable
+    from pathlib import Path
+
+
+BRANCH_IMAGES_FILENAME = "branch-images.json"
+BRANCH_IMAGES_LOCK = "branch-images.lock"
+BRANCH_IMAGES_VERSION = 1
+INLINE_CACHE_ARGS = ["--build-arg", "BUILDKIT_INLINE_CACHE=1"]
+# Plain progress output is line-oriented, so cache hits can be counted
+PROGRESS_ARGS = ["--progress=plain"]
+
+# "#7 [2/5] RUN ..." or "#7 [stage-1 2/5] COPY ..." starts a Dockerfile step
+_STEP_PATTERN = re.compile(r"#(\d+) \[(?:[^\]]* )?\d+/\d+\]")
+_CACHED_PATTERN = re.compile(r"#(\d+) CACHED\s*$")
+
+
+@dataclass(frozen=True)
+class LayerCacheStats:
+    """How many Dockerfile steps of a build were served from cache."""
+
+    cached: int
+    total: int
+
+
+def _branch_images_path(repo_root: Path) -> Path:
+    return get_state_dir(repo_root) / BRANCH_IMAGES_FILENAME
+
+
+def branch_images(repo_root: Path) -> dict[str, str]:
+    """Return the image each branch last ran, by branch."""
+    try:
+        data = read_state(_branch_images_path(repo_root))
+    except StateError:
+        return {}
+    if data is None or data.get("version") != BRANCH_IMAGES_VERSION:
+        return {}
+    images = data.get("branches", {})
+    return {branch: image for branch, image in images.items() if isinstance(image, str)}
+
+
+def branch_image(repo_root: Path, branch: str) -> str | None:
+    """Return the image ``branch`` last ran, or None if none is recorded."""
+    return branch_images(repo_root).get(branch)
+
+
+def record_branch_image(repo_root: Path, branch: str, image: str) -> None:
+    """Record that ``branch`` runs ``image``; failures are ignored."""
+    with suppress(StateError, OSError):
+        path = _branch_images_path(repo_root)
+        with file_lock(path.with_name(BRANCH_IMAGES_LOCK)):
+            data = read_state(path)
+            if data is None or data.get("version") != BRANCH_IMAGES_VERSION:
+                data = {"version": BRANCH_IMAGES_VERSION, "branches": {}}
+            data["branches"][branch] = image
+            write_state(path, data)
+
+
+def cache_source(
+    repo_root: Path,
+    branch: str,
+    image_exists: Callable[[str], bool],
+) -> str | None:
+    """Return the source branch's image to seed ``branch``'s build, if it is present."""
+    try:
+        entries = read_index(repo_root)
+    except StateError:
+        return None
+    entry = entries.get(branch) if entries else None
+    if entry is None or entry.source_branch in (None, branch):
+        return None
+    image = branch_image(repo_root, entry.source_branch)
+    return image if image is not None and image_exists(image) else None
+
+
+def count_cached_layers(lines: Iterable[str]) -> LayerCacheStats:
+    """Count the Dockerfile steps in BuildKit plain progress output and those cached."""
+    steps: set[str] = set()
+    cached: set[str] = set()
+    for line in lines:
+        if match := _STEP_PATTERN.match(line):
+            steps.add(match.group(1))
+        elif match := _CACHED_PATTERN.match(line):
+            cached.add(match.group(1))
+    return LayerCacheStats(cached=len(steps & cached), total=len(steps))
+
+
+def buildkit_available() -> bool:
+    """Return True if the docker CLI can build with BuildKit, i.e. has the buildx plugin."""
+    try:
+        probe = subprocess.run(["docker", "buildx", "version"], capture_output=True, check=False)
+    except OSError:
+        return False
+    return probe.returncode == 0
+
+
+def run_build(command: list[str]) -> LayerCacheStats:
+    """Run a ``docker build`` with BuildKit, echoing its output, and count cache hits.
+
+    Without BuildKit the build runs on the legacy builder, minus the
+    BuildKit-only progress flag, and no cache hits are reported.
+
+    Raises:
+        subprocess.CalledProcessError: If the build fails.
+    """
+    if not buildkit_available():
+        legacy = [arg for arg in command if arg not in PROGRESS_ARGS]
+        subprocess.run(legacy, env={**os.environ, "DOCKER_BUILDKIT": "0"}, check=True)
+        return LayerCacheStats(cached=0, total=0)
+    env = {**os.environ, "DOCKER_BUILDKIT": "1"}
+    lines: list[str] = []
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env=env,
+    ) as process:
+        for line in process.stdout or ():
+            sys.stderr.write(line)
+            lines.append(line)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return count_cached_layers(lines)
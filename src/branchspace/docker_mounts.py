@@ -0,0 +1,116 @@
+"""Per-path mount strategies for branch containers.
+
+The worktree is bind-mounted read-write at ``/workspace``. ``containerMounts``
+maps paths inside the worktree to another way of mounting them:
+
+- ``volume``: a named volume of the branch over the path, so directories such
+  as ``node_modules``, ``.venv`` or ``target`` stay off the host file system
+- ``tmpfs``: an in-memory file system for scratch paths, empty on every start
+- ``readonly``: the worktree path bind-mounted read-only
+
+Overlay volumes carry the branch's resource labels, so ``purge`` removes them
+with the branch's other resources. Docker fills an empty volume from the
+image on first mount, which is how project-local output of a
+``containerSetup`` snapshot reaches the branch; volumes are labelled with
+the snapshot they were filled from and recreated when it changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from branchspace.docker_backend import DockerBackendError
+from branchspace.docker_backend import get_backend
+from branchspace.docker_labels import LABEL_BRANCH
+from branchspace.docker_labels import LABEL_REPO
+from branchspace.docker_labels import repo_digest
+from branchspace.docker_labels import repo_label
+from branchspace.docker_labels import resource_labels
+from branchspace.docker_labels import sanitize_name
+
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from pathlib import Path
+
+
+MOUNT_VOLUME = "volume"
+MOUNT_TMPFS = "tmpfs"
+MOUNT_READONLY = "readonly"
+MOUNT_VOLUME_PREFIX = "branchspace-mount"
+LABEL_MOUNT = "dev.branchspace.mount"
+LABEL_SEED = "dev.branchspace.seed"
+WORKSPACE = "/workspace"
+# Sanitizing maps feature/x and feature-x to the same name, so volume names
+# also carry a short digest of the raw branch and path
+KEY_DIGEST_LENGTH = 8
+
+
+class DockerMountError(RuntimeError):
+    """Raised when overlay volumes cannot be created."""
+
+
+def mount_volume_name(repo: str, branch: str, path: str) -> str:
+    """Return the overlay volume of ``path`` for ``branch`` of the repository ``repo``."""
+    key = hashlib.sha256(f"{branch}\0{path}".encode()).hexdigest()[:KEY_DIGEST_LENGTH]
+    readable = f"{sanitize_name(branch)}-{sanitize_name(path)}"
+    return f"{MOUNT_VOLUME_PREFIX}-{repo_digest(repo)}-{readable}-{key}"
+
+
+def container_mount_args(mounts: Mapping[str, str], branch: str, worktree_path: Path) -> list[str]:
+    """Return ``--mount`` arguments applying each path's strategy.
+
+    Read-only paths missing from the worktree are skipped, since Docker
+    refuses to bind-mount a source that does not exist.
+    """
+    repo = repo_label(worktree_path) if MOUNT_VOLUME in mounts.values() else ""
+    args = []
+    for path, strategy in mounts.items():
+        target = f"{WORKSPACE}/{path}"
+        if strategy == MOUNT_VOLUME:
+            source = mount_volume_name(repo, branch, path)
+            args += ["--mount", f"type=volume,src={source},dst={target}"]
+        elif strategy == MOUNT_TMPFS:
+            args += ["--mount", f"type=tmpfs,dst={target}"]
+        elif (worktree_path / path).exists():
+            args += ["--mount", f"type=bind,src={worktree_path / path},dst={target},readonly"]
+    return args
+
+
+def ensure_mount_volumes(
+    mounts: Mapping[str, str],
+    branch: str,
+    worktree_path: Path,
+    snapshot: str | None = None,
+) -> None:
+    """Create the branch's labelled overlay volumes that do not exist yet.
+
+    A volume filled from another ``snapshot`` than the one the container
+    runs is removed first, so it is filled afresh; one still mounted by a
+    running container is left for the next start.
+
+    Raises:
+        DockerMountError: If a volume cannot be created.
+    """
+    paths = [path for path, strategy in mounts.items() if strategy == MOUNT_VOLUME]
+    if not paths:
+        return
+    repo = repo_label(worktree_path)
+    backend = get_backend()
+    try:
+        filters = {"label": [f"{LABEL_REPO}={repo}", f"{LABEL_BRANCH}={branch}", LABEL_MOUNT]}
+        existing = {volume.name: volume.labels for volume in backend.list_volumes(filters)}
+        for path in paths:
+            name = mount_volume_name(repo, branch, path)
+            labels = {**resource_labels(branch, worktree_path), LABEL_MOUNT: path}
+            if snapshot is not None:
+                labels[LABEL_SEED] = snapshot
+            if name in existing and existing[name].get(LABEL_SEED) != snapshot:
+                with suppress(DockerBackendError):
+                    backend.remove_volume(name)
+            backend.create_volume(name, labels)
+    except DockerBackendError as exc:
+        raise DockerMountError(str(exc)) from exc
@@ -0,0 +1,303 @@
+"""Long-lived per-branch containers that ``shell`` execs into.
+
+In persistent mode the branch container is started detached, kept alive with
+an idle command, and ``shell`` runs ``docker exec`` inside it, so a one-off
+command costs an exec rather than a container start. Every session touches a
+``<container>.used`` stamp and holds a ``<container>.<pid>.session`` marker in
+the repository's ``containers`` state directory. One detached reaper per
+container stops it once it has had no session for ``containerIdleTimeout``.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+from contextlib import contextmanager
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from branchspace.background import spawn_module
+from branchspace.config_validation import parse_duration
+from branchspace.docker_backend import DockerBackendError
+from branchspace.docker_backend import get_backend
+from branchspace.docker_labels import label_args
+from branchspace.docker_labels import resource_labels
+from branchspace.docker_shell import DockerCommandPlan
+from branchspace.docker_shell import DockerShellError
+from branchspace.docker_shell import branch_mount_args
+from branchspace.docker_shell import build_container_name
+from branchspace.docker_shell import prepare_caches
+from branchspace.docker_shell import prepare_image
+from branchspace.docker_shell import prepare_mounts
+from branchspace.docker_shell import prepare_snapshot
+from branchspace.git_utils import get_current_branch
+from branchspace.state import file_lock
+from branchspace.state import get_state_dir
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from branchspace.config import BranchspaceConfig
+
+
+CONTAINERS_DIRNAME = "containers"
+WORKSPACE = "/workspace"
+# Keeps the container alive without depending on the image's own command
+KEEPALIVE_COMMAND = ["tail", "-f", "/dev/null"]
+READY_TIMEOUT = 30.0
+READY_INTERVAL = 0.05
+
+
+def _containers_dir(worktree_path: Path) -> Path:
+    path = get_state_dir(worktree_path) / CONTAINERS_DIRNAME
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def inspect_container(name: str) -> tuple[str, str] | None:
+    """Return the status and image of container ``name``, or None if it does not exist."""
+    try:
+        return get_backend().inspect_container(name)
+    except DockerBackendError as exc:
+        raise DockerShellError(str(exc)) from exc
+
+
+def build_start_command(
+    image: str,
+    container_name: str,
+    worktree_path: Path,
+    labels: dict[str, str],
+    mount_args: list[str],
+) -> list[str]:
+    """Return the command that starts the branch container detached."""
+    return [
+        "docker",
+        "run",
+        "-d",
+        "--init",
+        "--name",
+        container_name,
+        *label_args(labels),
+        "-v",
+        f"{worktree_path}:{WORKSPACE}",
+        *mount_args,
+        "-w",
+        WORKSPACE,
+        image,
+        *KEEPALIVE_COMMAND,
+    ]
+
+
+def build_exec_command(
+    container_name: str,
+    shell: str,
+    command: str | None,
+    *,
+    tty: bool,
+) -> list[str]:
+    """Return the ``docker exec`` command for a shell or one-off command."""
+    base = ["docker", "exec", "-it" if tty else "-i", "-w", WORKSPACE, container_name, shell]
+    if command:
+        base += ["-lc", command]
+    return base
+
+
+def wait_until_ready(container_name: str, timeout: float = READY_TIMEOUT) -> None:
+    """Block until the container accepts exec sessions.
+
+    Raises:
+        DockerShellError: If it does not within ``timeout`` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        with suppress(DockerBackendError):
+            if get_backend().exec_run(container_name, ["true"]) == 0:
+                return
+        if time.monotonic() >= deadline:
+            raise DockerShellError(f"Container {container_name} did not become ready.")
+        time.sleep(READY_INTERVAL)
+
+
+def ensure_container(config: BranchspaceConfig, branch: str, worktree_path: Path) -> str:
+    """Start the branch's persistent container unless it is running; return its name.
+
+    The container is named after the repository as well as the branch. It is
+    recreated, even while running, when the worktree's image (or its
+    ``containerSetup`` snapshot) has changed since it was created; a stopped
+    one is otherwise restarted.
+    """
+    name = build_container_name(branch, worktree_path)
+    if config.container_setup is not None:
+        # Setup mounts the cache volumes, so they must exist first
+        prepare_caches(config, worktree_path)
+    image = prepare_snapshot(config, prepare_image(config, worktree_path, branch), worktree_path)
+    state = inspect_container(name)
+    try:
+        if state is not None and state[1] != image:
+            get_backend().remove_container(name)
+            state = None
+        if state is not None and state[0] == "running":
+            return name
+        if state is None:
+            snapshot = image if config.container_setup is not None else None
+            prepare_mounts(config, branch, worktree_path, snapshot=snapshot)
+            start = build_start_command(
+                image,
+                name,
+                worktree_path,
+                resource_labels(branch, worktree_path),
+                branch_mount_args(config, branch, worktree_path),
+            )
+            subprocess.run(
+                start,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        else:
+            get_backend().start_container(name)
+    except DockerBackendError as exc:
+        raise DockerShellError(str(exc)) from exc
+    wait_until_ready(name)
+    return name
+
+
+def _mark_used(containers_dir: Path, name: str) -> None:
+    (containers_dir / f"{name}.used").touch()
+
+
+@contextmanager
+def _session(containers_dir: Path, name: str) -> Iterator[None]:
+    """Mark container ``name`` as in use by this process for the reaper."""
+    marker = containers_dir / f"{name}.{os.getpid()}.session"
+    marker.touch()
+    _mark_used(containers_dir, name)
+    try:
+        yield
+    finally:
+        _mark_used(containers_dir, name)
+        marker.unlink(missing_ok=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _live_sessions(containers_dir: Path, name: str) -> Iterator[Path]:
+    for marker in containers_dir.glob(f"{name}.*.session"):
+        pid = marker.name.removeprefix(f"{name}.").removesuffix(".session")
+        if pid.isdigit() and _pid_alive(int(pid)):
+            yield marker
+        else:
+            marker.unlink(missing_ok=True)
+
+
+def start_reaper(worktree_path: Path, name: str, idle_timeout: float) -> None:
+    """Spawn the idle reaper for container ``name`` unless one is running."""
+    if idle_timeout <= 0:
+        return
+    with file_lock(_containers_dir(worktree_path) / f"{name}.reaper.lock", blocking=False) as free:
+        if not free:
+            return
+    with suppress(OSError):
+        spawn_module(
+            "branchspace.docker_persistent",
+            "reap",
+            str(worktree_path),
+            name,
+            str(idle_timeout),
+            low_priority=True,
+        )
+
+
+def reap_idle(worktree_path: Path, name: str, idle_timeout: float) -> bool:
+    """Stop container ``name`` once it has been idle for ``idle_timeout`` seconds.
+
+    Returns False at once if another reaper already watches the container.
+    """
+    containers_dir = _containers_dir(worktree_path)
+    stamp = containers_dir / f"{name}.used"
+    with file_lock(containers_dir / f"{name}.reaper.lock", blocking=False) as acquired:
+        if not acquired:
+            return False
+        while True:
+            try:
+                idle_for = time.time() - stamp.stat().st_mtime
+            except FileNotFoundError:
+                idle_for = idle_timeout
+            if any(_live_sessions(containers_dir, name)):
+                idle_for = 0.0
+            if idle_for >= idle_timeout:
+                break
+            time.sleep(max(idle_timeout - idle_for, 1.0))
+        with suppress(DockerBackendError):
+            get_backend().stop_container(name)
+    return True
+
+
+def exec_in_container(
+    config: BranchspaceConfig,
+    branch: str,
+    worktree_path: Path,
+    *,
+    command: str | None = None,
+) -> DockerCommandPlan:
+    """Run a shell or ``command`` in the branch's persistent container."""
+    name = ensure_container(config, branch, worktree_path)
+    containers_dir = _containers_dir(worktree_path)
+    exec_command = build_exec_command(name, config.shell, command, tty=sys.stdin.isatty())
+    with _session(containers_dir, name):
+        start_reaper(worktree_path, name, parse_duration(config.container_idle_timeout))
+        subprocess.run(exec_command, check=True)
+    return DockerCommandPlan(commands=[exec_command], container_name=name)
+
+
+def prewarm_container(config: BranchspaceConfig, worktree_path: Path) -> str | None:
+    """Start the persistent container of the branch checked out at ``worktree_path``."""
+    branch = get_current_branch(worktree_path)
+    if branch is None:
+        return None
+    name = ensure_container(config, branch, worktree_path)
+    _mark_used(_containers_dir(worktree_path), name)
+    start_reaper(worktree_path, name, parse_duration(config.container_idle_timeout))
+    return name
+
+
+def prewarm_in_background(worktree_path: Path) -> None:
+    """Start the worktree's persistent container from a detached process."""
+    with suppress(OSError):
+        spawn_module("branchspace.docker_persistent", "prewarm", str(worktree_path))
+
+
+def _main(args: list[str]) -> int:
+    if args[:1] == ["reap"] and len(args) == 4:
+        reap_idle(Path(args[1]), args[2], float(args[3]))
+        return 0
+    if args[:1] == ["prewarm"] and len(args) == 2:
+        from branchspace.config import load_config
+        from branchspace.config_snapshot import ConfigError
+        from branchspace.config_snapshot import find_config_file
+
+        worktree_path = Path(args[1])
+        try:
+            config = load_config(find_config_file(worktree_path))
+            prewarm_container(config, worktree_path)
+        except (ConfigError, DockerShellError, OSError, subprocess.CalledProcessError):
+            return 1
+        return 0
+    return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main(sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""Pull policies for image-based container configs.
+
+The last successful pull of each image is recorded in the repository's
+``pulls.json`` state file, so ``ttl:<duration>`` policies can skip the
+registry round trip while the image is fresh enough.
+"""
+
+from __future__ import annotations
+
+import time
+
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from branchspace.config_validation import PULL_ALWAYS
+from branchspace.config_validation import PULL_MISSING
+from branchspace.config_validation import PULL_NEVER
+from branchspace.config_validation import TTL_PREFIX
+from branchspace.config_validation import parse_duration
+from branchspace.state import StateError
+from branchspace.state import file_lock
+from branchspace.state import get_state_dir
+from branchspace.state import read_state
+from branchspace.state import write_state
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+PULLS_FILENAME = "pulls.json"
+PULLS_LOCK = "pulls.lock"
+PULLS_VERSION = 1
+
+
+def _pulls_path(repo_root: Path) -> Path:
+    return get_state_dir(repo_root) / PULLS_FILENAME
+
+
+def last_pulled(repo_root: Path, image: str) -> float | None:
+    """Return when ``image`` was last pulled successfully, or None."""
+    try:
+        data = read_state(_pulls_path(repo_root))
+    except StateError:
+        return None
+    if data is None or data.get("version") != PULLS_VERSION:
+        return None
+    pulled = data.get("images", {}).get(image)
+    return float(pulled) if isinstance(pulled, (int, float)) else None
+
+
+def record_pull(repo_root: Path, image: str) -> None:
+    """Record a successful pull of ``image`` now; failures are ignored."""
+    with suppress(StateError, OSError):
+        path = _pulls_path(repo_root)
+        with file_lock(path.with_name(PULLS_LOCK)):
+            data = read_state(path)
+            if data is None or data.get("version") != PULLS_VERSION:
+                data = {"version": PULLS_VERSION, "images": {}}
+            data["images"][image] = time.time()
+            write_state(path, data)
+
+
+def needs_pull(
+    policy: str,
+    image: str,
+    repo_root: Path,
+    image_exists: Callable[[str], bool],
+) -> bool:
+    """Return True if ``policy`` calls for pulling ``image`` before running it."""
+    if policy == PULL_ALWAYS:
+        return True
+    if policy == PULL_NEVER:
+        return False
+    if not image_exists(image):
+        return True
+    if policy == PULL_MISSING:
+        return False
+    pulled = last_pulled(repo_root, image)
+    ttl = parse_duration(policy.removeprefix(TTL_PREFIX))
+    return pulled is None or time.time() - pulled >= ttl
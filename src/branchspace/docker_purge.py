@@ -1,15 +1,50 @@
-"""Docker purge helper for branchspace."""
-
-import subprocess
-
+"""Docker purge helper for branchspace.
+
+Resources are found by the labels branchspace puts on everything it creates,
+with one label-filtered query per resource kind whatever the scope: the
+current branch, every branch of the repository, or only branches that no
+longer exist or no longer have a worktree. A resource belongs to its branch
+rather than to the worktree path it was made for, so moving a worktree keeps
+its resources. Built images are shared between branches and are stale once
+no live branch records them as its image. Compose projects are found in the state file
+they are recorded in, and each is removed with a single ``docker compose down``.
+"""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
 from pathlib import Path
 
 import questionary
 
 from branchspace.console import info
-from branchspace.docker_shell import build_container_name
+from branchspace.docker_backend import DockerBackendError
+from branchspace.docker_backend import DockerObject
+from branchspace.docker_backend import get_backend
+from branchspace.docker_compose import ComposeProject
+from branchspace.docker_compose import list_projects
+from branchspace.docker_compose import remove_project
+from branchspace.docker_labels import LABEL_BRANCH
+from branchspace.docker_labels import LABEL_REPO
+from branchspace.docker_labels import repo_label
+from branchspace.docker_layers import branch_images
+from branchspace.docker_shell import BUILD_IMAGE_REPOSITORY
 from branchspace.git_utils import get_current_branch
+from branchspace.git_utils import list_branch_names
+from branchspace.git_utils import list_worktrees
+
+
+# Removals in flight at once; the daemon serializes much of the work anyway
+PURGE_CONCURRENCY = 8
+# Container and image IDs are shown as short as ``docker ps`` shows them
+SHORT_ID_LENGTH = 12
+
+SCOPE_BRANCH = "branch"
+SCOPE_ALL = "all"
+SCOPE_STALE = "stale"
 
 
 class DockerPurgeError(RuntimeError):
@@ -23,43 +58,110 @@ class DockerResources:
     containers: list[str]
     images: list[str]
     volumes: list[str]
+    projects: list[ComposeProject] = field(default_factory=list)
 
     def is_empty(self) -> bool:
-        return not (self.containers or self.images or self.volumes)
+        return not (self.containers or self.images or self.volumes or self.projects)
 
 
-def _list_docker_ids(args: list[str]) -> list[str]:
-    result = subprocess.run(args, capture_output=True, text=True, check=True)
-    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+def discover_resources(labels: list[str]) -> DockerResources:
+    """Return the containers, images and volumes carrying all of ``labels``."""
+    containers, images, volumes = _discover_objects(labels)
+    return DockerResources(
+        containers=[obj.id for obj in containers],
+        images=[obj.id for obj in images],
+        volumes=[obj.id for obj in volumes],
+    )
 
 
-def discover_resources(container_name: str) -> DockerResources:
-    containers = _list_docker_ids(
-        ["docker", "ps", "-a", "--filter", f"name=^{container_name}$", "-q"]
-    )
-    images = _list_docker_ids(["docker", "images", "--filter", f"reference={container_name}", "-q"])
-    volumes = _list_docker_ids(
-        ["docker", "volume", "ls", "--filter", f"name=^{container_name}$", "-q"]
+def _discover_objects(
+    labels: list[str],
+) -> tuple[list[DockerObject], list[DockerObject], list[DockerObject]]:
+    backend = get_backend()
+    filters = {"label": labels}
+    try:
+        return (
+            backend.list_containers(filters),
+            backend.list_images(filters),
+            backend.list_volumes(filters),
+        )
+    except DockerBackendError as exc:
+        raise DockerPurgeError(str(exc)) from exc
+
+
+def _owner_gone(branch: str | None, live: set[str]) -> bool:
+    # Resources shared across branches, such as built images, have no owner
+    return branch is not None and branch not in live
+
+
+def _is_stale(obj: DockerObject, live: set[str]) -> bool:
+    return _owner_gone(obj.labels.get(LABEL_BRANCH), live)
+
+
+def _is_unused_build(obj: DockerObject, used: set[str]) -> bool:
+    repository, _, _ = obj.name.partition(":")
+    return repository == BUILD_IMAGE_REPOSITORY and obj.name not in used
+
+
+def discover_stale_resources(repo_path: Path) -> DockerResources:
+    """Return the repository's resources whose branch is gone or has no worktree.
+
+    Built images count as stale when no live branch last ran them.
+    """
+    containers, images, volumes = _discover_objects([f"{LABEL_REPO}={repo_label(repo_path)}"])
+    branches = set(list_branch_names(repo_path))
+    live = {
+        worktree.branch
+        for worktree in list_worktrees(repo_path)
+        if not worktree.detached and worktree.branch in branches
+    }
+    used = {image for branch, image in branch_images(repo_path).items() if branch in live}
+
+    def stale_ids(objects: list[DockerObject]) -> list[str]:
+        return [obj.id for obj in objects if _is_stale(obj, live)]
+
+    return DockerResources(
+        containers=stale_ids(containers),
+        images=[obj.id for obj in images if _is_stale(obj, live) or _is_unused_build(obj, used)],
+        volumes=stale_ids(volumes),
+        projects=[
+            project for project in list_projects(repo_path) if _owner_gone(project.branch, live)
+        ],
     )
-    return DockerResources(containers=containers, images=images, volumes=volumes)
+
+
+def _short_ids(ids: list[str]) -> str:
+    return ", ".join(object_id.removeprefix("sha256:")[:SHORT_ID_LENGTH] for object_id in ids)
 
 
 def render_preview(resources: DockerResources) -> None:
+    if resources.projects:
+        info(f"Compose projects: {', '.join(project.name for project in resources.projects)}")
     if resources.containers:
-        info(f"Containers: {', '.join(resources.containers)}")
+        info(f"Containers: {_short_ids(resources.containers)}")
     if resources.images:
-        info(f"Images: {', '.join(resources.images)}")
+        info(f"Images: {_short_ids(resources.images)}")
     if resources.volumes:
         info(f"Volumes: {', '.join(resources.volumes)}")
 
 
-def purge_resources(resources: DockerResources) -> None:
-    if resources.containers:
-        subprocess.run(["docker", "rm", "-f", *resources.containers], check=False)
-    if resources.images:
-        subprocess.run(["docker", "rmi", "-f", *resources.images], check=False)
-    if resources.volumes:
-        subprocess.run(["docker", "volume", "rm", *resources.volumes], check=False)
+def _remove_all(remove: Callable[[str], None], names: list[str], pool: ThreadPoolExecutor) -> None:
+    def remove_quietly(name: str) -> None:
+        with suppress(DockerBackendError):
+            remove(name)
+
+    list(pool.map(remove_quietly, names))
+
+
+def purge_resources(resources: DockerResources, repo_path: Path) -> None:
+    backend = get_backend()
+    with ThreadPoolExecutor(max_workers=PURGE_CONCURRENCY) as pool:
+        # A project that fails to come down stays recorded for the next purge
+        list(pool.map(lambda project: remove_project(repo_path, project), resources.projects))
+        # Containers go first so their images and volumes are no longer in use
+        _remove_all(backend.remove_container, resources.containers, pool)
+        _remove_all(backend.remove_image, resources.images, pool)
+        _remove_all(backend.remove_volume, resources.volumes, pool)
 
 
 def confirm_purge() -> bool:
@@ -71,15 +173,24 @@ def run_docker_purge(
     worktree_path: Path | None = None,
     dry_run: bool = False,
     force: bool = False,
+    scope: str = SCOPE_BRANCH,
 ) -> DockerResources:
     if worktree_path is None:
         worktree_path = Path.cwd().resolve()
-    branch = get_current_branch(worktree_path)
-    if branch is None:
-        raise DockerPurgeError("Cannot determine current branch.")
 
-    container_name = build_container_name(branch)
-    resources = discover_resources(container_name)
+    repo = f"{LABEL_REPO}={repo_label(worktree_path)}"
+    if scope == SCOPE_STALE:
+        resources = discover_stale_resources(worktree_path)
+    elif scope == SCOPE_ALL:
+        resources = replace(discover_resources([repo]), projects=list_projects(worktree_path))
+    else:
+        branch = get_current_branch(worktree_path)
+        if branch is None:
+            raise DockerPurgeError("Cannot determine current branch.")
+        resources = replace(
+            discover_resources([repo, f"{LABEL_BRANCH}={branch}"]),
+            projects=[p for p in list_projects(worktree_path) if p.branch == branch],
+        )
     render_preview(resources)
 
     if resources.is_empty():
@@ -91,5 +202,5 @@ def run_docker_purge(
     if not force and not confirm_purge():
         return resources
 
-    purge_resources(resources)
+    purge_resources(resources, worktree_path)
     return resources
@@ -1,6 +1,5 @@
 """Docker shell command builder for branchspace."""
 
-import re
 import subprocess
 
 from dataclasses import dataclass
@@ -8,10 +7,43 @@ from pathlib import Path
 
 from branchspace.config import BranchspaceConfig
 from branchspace.config import ContainerBuildConfig
+from branchspace.config import ContainerComposeConfig
 from branchspace.config import ContainerImageConfig
+from branchspace.console import info
+from branchspace.docker_backend import DockerBackendError
+from branchspace.docker_backend import get_backend
+from branchspace.docker_caches import DockerCacheError
+from branchspace.docker_caches import cache_mount_args
+from branchspace.docker_caches import ensure_cache_volumes
+from branchspace.docker_context import BuildContextError
+from branchspace.docker_context import context_digest
+from branchspace.docker_labels import LABEL_REPO
+from branchspace.docker_labels import label_args
+from branchspace.docker_labels import repo_digest
+from branchspace.docker_labels import repo_label
+from branchspace.docker_labels import resource_labels
+from branchspace.docker_labels import sanitize_name
+from branchspace.docker_layers import INLINE_CACHE_ARGS
+from branchspace.docker_layers import PROGRESS_ARGS
+from branchspace.docker_layers import LayerCacheStats
+from branchspace.docker_layers import cache_source
+from branchspace.docker_layers import record_branch_image
+from branchspace.docker_layers import run_build
+from branchspace.docker_mounts import DockerMountError
+from branchspace.docker_mounts import container_mount_args
+from branchspace.docker_mounts import ensure_mount_volumes
+from branchspace.docker_pull import needs_pull
+from branchspace.docker_pull import record_pull
+from branchspace.docker_snapshots import DockerSnapshotError
+from branchspace.docker_snapshots import ensure_snapshot
 from branchspace.git_utils import get_current_branch
 
 
+# Built images are shared by every branch with the same build inputs
+BUILD_IMAGE_REPOSITORY = "branchspace-build"
+BUILD_TAG_LENGTH = 16
+
+
 class DockerShellError(RuntimeError):
     """Raised when docker shell execution fails."""
 
@@ -22,15 +54,40 @@ class DockerCommandPlan:
 
     commands: list[list[str]]
     container_name: str
+    # Image whose pull is among the commands, recorded once it succeeds
+    pulled_image: str | None = None
+    # Built image the branch runs, recorded as a cache source for later branches
+    built_image: str | None = None
+
+
+@dataclass(frozen=True)
+class ImagePlan:
+    """The image a branch container runs and the commands that provide it."""
+
+    image: str
+    commands: list[list[str]]
+    pulled_image: str | None = None
+    built_image: str | None = None
+
 
+def build_container_name(branch: str, worktree_path: Path) -> str:
+    """Return the container of ``branch``, named apart from other repositories' branches."""
+    prefix = f"branchspace-{repo_digest(repo_label(worktree_path))}"
+    sanitized = sanitize_name(branch)
+    return f"{prefix}-{sanitized}" if sanitized else prefix
 
-def _sanitize_branch_name(branch: str) -> str:
-    return re.sub(r"[^A-Za-z0-9_.-]+", "-", branch).strip("-")
 
+def build_image_tag(digest: str) -> str:
+    """Return the image tag for build inputs with the given content digest."""
+    return f"{BUILD_IMAGE_REPOSITORY}:{digest[:BUILD_TAG_LENGTH]}"
 
-def build_container_name(branch: str) -> str:
-    sanitized = _sanitize_branch_name(branch)
-    return f"branchspace-{sanitized}" if sanitized else "branchspace"
+
+def image_exists(image: str) -> bool:
+    """Return True if ``image`` is present locally."""
+    try:
+        return get_backend().image_exists(image)
+    except DockerBackendError:
+        return False
 
 
 def _build_run_command(
@@ -39,6 +96,8 @@ def _build_run_command(
     worktree_path: Path,
     shell: str,
     command: str | None,
+    labels: dict[str, str],
+    mount_args: list[str],
 ) -> list[str]:
     base = [
         "docker",
@@ -47,8 +106,10 @@ def _build_run_command(
         "-it",
         "--name",
         container_name,
+        *label_args(labels),
         "-v",
         f"{worktree_path}:/workspace",
+        *mount_args,
         "-w",
         "/workspace",
         image,
@@ -60,48 +121,182 @@ def _build_run_command(
     return base
 
 
+def _resolve_build_paths(config: ContainerBuildConfig, worktree_path: Path) -> tuple[Path, Path]:
+    context_path = Path(config.context)
+    dockerfile_path = Path(config.dockerfile)
+    if not context_path.is_absolute():
+        context_path = worktree_path / context_path
+    if not dockerfile_path.is_absolute():
+        dockerfile_path = worktree_path / dockerfile_path
+    return context_path, dockerfile_path
+
+
+def plan_image(
+    config: BranchspaceConfig, worktree_path: Path, branch: str | None = None
+) -> ImagePlan:
+    """Return the image for the worktree's container and the commands providing it.
+
+    A build for ``branch`` uses its source branch's image as a cache source.
+    """
+    if isinstance(config.container_config, ContainerImageConfig):
+        image = config.container_config.image
+        if needs_pull(config.container_config.pull_policy, image, worktree_path, image_exists):
+            return ImagePlan(image=image, commands=[["docker", "pull", image]], pulled_image=image)
+        return ImagePlan(image=image, commands=[])
+
+    if isinstance(config.container_config, ContainerBuildConfig):
+        context_path, dockerfile_path = _resolve_build_paths(config.container_config, worktree_path)
+        try:
+            image = build_image_tag(context_digest(context_path, dockerfile_path))
+        except BuildContextError as exc:
+            raise DockerShellError(str(exc)) from exc
+        if image_exists(image):
+            return ImagePlan(image=image, commands=[], built_image=image)
+        # Built images are shared across branches, so only the repository is recorded
+        labels = label_args({LABEL_REPO: repo_label(worktree_path)})
+        source = cache_source(worktree_path, branch, image_exists) if branch else None
+        build = [
+            "docker",
+            "build",
+            *PROGRESS_ARGS,
+            "-t",
+            image,
+            *labels,
+            *INLINE_CACHE_ARGS,
+            *(["--cache-from", source] if source else []),
+            "-f",
+            str(dockerfile_path),
+            str(context_path),
+        ]
+        return ImagePlan(image=image, commands=[build], built_image=image)
+
+    raise DockerShellError("Unsupported container configuration.")
+
+
+def _branch_run_command(
+    config: BranchspaceConfig,
+    branch: str,
+    worktree_path: Path,
+    image: str,
+    command: str | None,
+) -> list[str]:
+    return _build_run_command(
+        image,
+        build_container_name(branch, worktree_path),
+        worktree_path,
+        config.shell,
+        command,
+        resource_labels(branch, worktree_path),
+        branch_mount_args(config, branch, worktree_path),
+    )
+
+
 def build_docker_commands(
     config: BranchspaceConfig,
     branch: str,
     worktree_path: Path,
     command: str | None = None,
 ) -> DockerCommandPlan:
-    container_name = build_container_name(branch)
-    commands: list[list[str]] = []
+    image_plan = plan_image(config, worktree_path, branch)
+    return DockerCommandPlan(
+        commands=[
+            *image_plan.commands,
+            _branch_run_command(config, branch, worktree_path, image_plan.image, command),
+        ],
+        container_name=build_container_name(branch, worktree_path),
+        pulled_image=image_plan.pulled_image,
+        built_image=image_plan.built_image,
+    )
 
-    if isinstance(config.container_config, ContainerImageConfig):
-        image = config.container_config.image
-        commands.append(["docker", "pull", image])
-        commands.append(
-            _build_run_command(image, container_name, worktree_path, config.shell, command)
-        )
-        return DockerCommandPlan(commands=commands, container_name=container_name)
 
-    if isinstance(config.container_config, ContainerBuildConfig):
-        image = container_name
-        context_path = Path(config.container_config.context)
-        dockerfile_path = Path(config.container_config.dockerfile)
-        if not context_path.is_absolute():
-            context_path = worktree_path / context_path
-        if not dockerfile_path.is_absolute():
-            dockerfile_path = worktree_path / dockerfile_path
-        commands.append(
-            [
-                "docker",
-                "build",
-                "-t",
-                image,
-                "-f",
-                str(dockerfile_path),
-                str(context_path),
-            ]
-        )
-        commands.append(
-            _build_run_command(image, container_name, worktree_path, config.shell, command)
-        )
-        return DockerCommandPlan(commands=commands, container_name=container_name)
+def _report_build(image: str, stats: LayerCacheStats) -> None:
+    if stats.total:
+        info(f"Built {image}: {stats.cached} of {stats.total} layers from cache")
 
-    raise DockerShellError("Unsupported container configuration.")
+
+def run_commands(
+    commands: list[list[str]],
+    worktree_path: Path,
+    pulled_image: str | None = None,
+    *,
+    built_image: str | None = None,
+    branch: str | None = None,
+) -> None:
+    """Run docker commands in order, recording a successful pull of ``pulled_image``.
+
+    Pulls go through the Docker backend and builds report their layer cache
+    hits; other commands run the CLI. ``built_image`` is recorded as
+    ``branch``'s image once it is present.
+    """
+    for cmd in commands:
+        if cmd[:2] == ["docker", "build"]:
+            _report_build(cmd[cmd.index("-t") + 1], run_build(cmd))
+        elif cmd[:2] == ["docker", "pull"]:
+            try:
+                get_backend().pull(cmd[2])
+            except DockerBackendError as exc:
+                raise DockerShellError(str(exc)) from exc
+            if pulled_image is not None:
+                record_pull(worktree_path, pulled_image)
+        else:
+            if built_image is not None and branch is not None:
+                record_branch_image(worktree_path, branch, built_image)
+                built_image = None
+            subprocess.run(cmd, check=True)
+    if built_image is not None and branch is not None:
+        record_branch_image(worktree_path, branch, built_image)
+
+
+def branch_mount_args(config: BranchspaceConfig, branch: str, worktree_path: Path) -> list[str]:
+    """Return the cache and ``containerMounts`` arguments of the branch's container."""
+    return [
+        *cache_mount_args(config.cache_mounts, worktree_path),
+        *container_mount_args(config.container_mounts, branch, worktree_path),
+    ]
+
+
+def prepare_mounts(
+    config: BranchspaceConfig, branch: str, worktree_path: Path, snapshot: str | None = None
+) -> None:
+    """Create the volumes the branch's container mounts: caches and path overlays.
+
+    ``snapshot`` is the ``containerSetup`` snapshot the container runs, which
+    overlay volumes are filled from.
+    """
+    prepare_caches(config, worktree_path)
+    try:
+        ensure_mount_volumes(config.container_mounts, branch, worktree_path, snapshot)
+    except DockerMountError as exc:
+        raise DockerShellError(str(exc)) from exc
+
+
+def prepare_caches(config: BranchspaceConfig, worktree_path: Path) -> None:
+    """Create the shared cache volumes the worktree's container mounts."""
+    try:
+        ensure_cache_volumes(config.cache_mounts, worktree_path)
+    except DockerCacheError as exc:
+        raise DockerShellError(str(exc)) from exc
+
+
+def prepare_image(config: BranchspaceConfig, worktree_path: Path, branch: str | None = None) -> str:
+    """Pull or build the worktree's image as needed and return its name."""
+    image_plan = plan_image(config, worktree_path, branch)
+    run_commands(
+        image_plan.commands,
+        worktree_path,
+        image_plan.pulled_image,
+        built_image=image_plan.built_image,
+        branch=branch,
+    )
+    return image_plan.image
+
+
+def prepare_snapshot(config: BranchspaceConfig, image: str, worktree_path: Path) -> str:
+    """Return the ``containerSetup`` snapshot of ``image``, or ``image`` without one."""
+    try:
+        return ensure_snapshot(config, image, worktree_path)
+    except DockerSnapshotError as exc:
+        raise DockerShellError(str(exc)) from exc
 
 
 def run_docker_shell(
@@ -116,7 +311,39 @@ def run_docker_shell(
     if branch is None:
         raise DockerShellError("Cannot determine current branch.")
 
+    if isinstance(config.container_config, ContainerComposeConfig):
+        # Imported lazily: docker_compose builds on this module
+        from branchspace.docker_compose import exec_in_service
+
+        return exec_in_service(config, branch, worktree_path, command=command)
+
+    if config.container_mode == "persistent":
+        # Imported lazily: docker_persistent builds on this module
+        from branchspace.docker_persistent import exec_in_container
+
+        return exec_in_container(config, branch, worktree_path, command=command)
+
+    if config.container_setup is not None:
+        # Setup needs the image and cache volumes in place before the run
+        # command is known, and overlays are filled from its snapshot
+        prepare_caches(config, worktree_path)
+        image = prepare_snapshot(
+            config, prepare_image(config, worktree_path, branch), worktree_path
+        )
+        prepare_mounts(config, branch, worktree_path, snapshot=image)
+        run = _branch_run_command(config, branch, worktree_path, image, command)
+        subprocess.run(run, check=True)
+        return DockerCommandPlan(
+            commands=[run], container_name=build_container_name(branch, worktree_path)
+        )
+
     plan = build_docker_commands(config, branch, worktree_path, command=command)
-    for cmd in plan.commands:
-        subprocess.run(cmd, check=True)
+    prepare_mounts(config, branch, worktree_path)
+    run_commands(
+        plan.commands,
+        worktree_path,
+        plan.pulled_image,
+        built_image=plan.built_image,
+        branch=branch,
+    )
     return plan
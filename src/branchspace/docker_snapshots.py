@@ -0,0 +1,220 @@
+"""Snapshot images of container-side setup, keyed by dependency lockfiles.
+
+With ``containerSetup`` configured, its commands run once in a container of
+the worktree's image and the result is committed as
+``branchspace-snapshot:<key>``. The key digests the repository, the base
+image ID, the commands and the contents of the configured lockfiles, so
+branches with the same lockfiles share one snapshot and a lockfile change
+triggers a new one. The worktree is not mounted during setup: only the lockfiles are copied to
+``/workspace``, so everything the setup writes, including project-local
+installs such as ``node_modules`` or ``.venv``, ends up in the snapshot.
+
+Snapshots are labelled with the repository. Each use touches a stamp in the
+``snapshots`` state directory, and after a new snapshot is made only the
+``keep`` most recently used ones are kept.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import subprocess
+import tarfile
+
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from branchspace.docker_backend import DockerBackendError
+from branchspace.docker_backend import get_backend
+from branchspace.docker_caches import cache_mount_args
+from branchspace.docker_labels import LABEL_REPO
+from branchspace.docker_labels import label_args
+from branchspace.docker_labels import repo_label
+from branchspace.state import file_lock
+from branchspace.state import get_state_dir
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from branchspace.config import BranchspaceConfig
+    from branchspace.config import ContainerSetupConfig
+
+
+SNAPSHOT_REPOSITORY = "branchspace-snapshot"
+SNAPSHOT_TAG_LENGTH = 16
+SNAPSHOTS_DIRNAME = "snapshots"
+LABEL_SNAPSHOT = "dev.branchspace.snapshot"
+WORKSPACE = "/workspace"
+
+
+class DockerSnapshotError(RuntimeError):
+    """Raised when a setup snapshot cannot be created."""
+
+
+def _snapshots_dir(worktree_path: Path) -> Path:
+    path = get_state_dir(worktree_path) / SNAPSHOTS_DIRNAME
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def _tag_key(tag: str) -> str:
+    return tag.rpartition(":")[2]
+
+
+def _stamp(snapshots_dir: Path, tag: str, suffix: str) -> Path:
+    return snapshots_dir / f"{_tag_key(tag)}{suffix}"
+
+
+def snapshot_key(
+    base_image_id: str, setup: ContainerSetupConfig, shell: str, worktree_path: Path
+) -> str:
+    """Return the digest of everything that decides a setup snapshot's contents.
+
+    The repository is part of the key, so each repository has snapshots of
+    its own and collecting them never removes one another repository uses.
+    """
+    digest = hashlib.sha256()
+    for part in (repo_label(worktree_path), base_image_id, shell, *setup.commands):
+        digest.update(part.encode("utf-8") + b"\0")
+    for lockfile in setup.lockfiles:
+        digest.update(lockfile.encode("utf-8") + b"\0")
+        try:
+            digest.update(hashlib.sha256((worktree_path / lockfile).read_bytes()).digest())
+        except FileNotFoundError:
+            digest.update(b"missing")
+    return digest.hexdigest()
+
+
+def snapshot_tag(key: str) -> str:
+    """Return the image tag of the snapshot with ``key``."""
+    return f"{SNAPSHOT_REPOSITORY}:{key[:SNAPSHOT_TAG_LENGTH]}"
+
+
+def build_setup_command(
+    config: BranchspaceConfig,
+    setup: ContainerSetupConfig,
+    image: str,
+    container_name: str,
+    worktree_path: Path,
+) -> list[str]:
+    """Return the ``docker run`` that performs setup in a container kept for commit.
+
+    The container reads a tar archive of the lockfiles from stdin (see
+    ``lockfile_archive``) and unpacks it into ``/workspace`` before setup.
+    """
+    return [
+        "docker",
+        "run",
+        "-i",
+        "--name",
+        container_name,
+        *label_args({LABEL_REPO: repo_label(worktree_path)}),
+        *cache_mount_args(config.cache_mounts, worktree_path),
+        "-w",
+        WORKSPACE,
+        image,
+        config.shell,
+        "-lc",
+        " && ".join(["tar -xf -", *setup.commands]),
+    ]
+
+
+def lockfile_archive(setup: ContainerSetupConfig, worktree_path: Path) -> bytes:
+    """Return a tar archive of the worktree's lockfiles; missing ones are left out."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for lockfile in setup.lockfiles:
+            path = worktree_path / lockfile
+            if path.is_file():
+                archive.add(path, arcname=lockfile)
+    return buffer.getvalue()
+
+
+def _create_snapshot(
+    config: BranchspaceConfig,
+    setup: ContainerSetupConfig,
+    image: str,
+    tag: str,
+    worktree_path: Path,
+) -> None:
+    backend = get_backend()
+    container_name = f"branchspace-setup-{_tag_key(tag)}"
+    # A container left by an interrupted setup would block the name
+    with suppress(DockerBackendError):
+        backend.remove_container(container_name)
+    command = build_setup_command(config, setup, image, container_name, worktree_path)
+    try:
+        subprocess.run(command, input=lockfile_archive(setup, worktree_path), check=True)
+        labels = {LABEL_REPO: repo_label(worktree_path), LABEL_SNAPSHOT: tag}
+        backend.commit_container(container_name, tag, labels)
+    except subprocess.CalledProcessError as exc:
+        raise DockerSnapshotError(
+            f"Container setup failed with exit code {exc.returncode}."
+        ) from exc
+    except DockerBackendError as exc:
+        raise DockerSnapshotError(str(exc)) from exc
+    finally:
+        with suppress(DockerBackendError):
+            backend.remove_container(container_name)
+
+
+def ensure_snapshot(config: BranchspaceConfig, image: str, worktree_path: Path) -> str:
+    """Return the setup snapshot of ``image`` for the worktree, creating it if needed.
+
+    Returns ``image`` itself when no ``containerSetup`` is configured.
+
+    Raises:
+        DockerSnapshotError: If the base image is missing or setup fails.
+    """
+    setup = config.container_setup
+    if setup is None:
+        return image
+    backend = get_backend()
+    try:
+        base_id = backend.image_id(image)
+    except DockerBackendError as exc:
+        raise DockerSnapshotError(str(exc)) from exc
+    if base_id is None:
+        raise DockerSnapshotError(f"Image {image} is not available locally.")
+
+    tag = snapshot_tag(snapshot_key(base_id, setup, config.shell, worktree_path))
+    snapshots_dir = _snapshots_dir(worktree_path)
+    created = False
+    # Concurrent shells wait for one setup run instead of racing
+    with file_lock(_stamp(snapshots_dir, tag, ".lock")):
+        if not backend.image_exists(tag):
+            _create_snapshot(config, setup, image, tag, worktree_path)
+            created = True
+    _stamp(snapshots_dir, tag, ".used").touch()
+    if created:
+        gc_snapshots(worktree_path, setup.keep, current=tag)
+    return tag
+
+
+def gc_snapshots(worktree_path: Path, keep: int, current: str | None = None) -> list[str]:
+    """Remove all but the ``keep`` most recently used snapshots; return those removed.
+
+    The ``current`` snapshot is always kept.
+    """
+    backend = get_backend()
+    snapshots_dir = _snapshots_dir(worktree_path)
+    try:
+        images = backend.list_images(
+            {"label": [f"{LABEL_REPO}={repo_label(worktree_path)}", LABEL_SNAPSHOT]}
+        )
+    except DockerBackendError:
+        return []
+
+    def last_used(tag: str) -> tuple[bool, float]:
+        stamp = _stamp(snapshots_dir, tag, ".used")
+        return tag == current, stamp.stat().st_mtime if stamp.exists() else 0.0
+
+    tags = sorted((image.labels[LABEL_SNAPSHOT] for image in images), key=last_used, reverse=True)
+    removed = []
+    for tag in tags[keep:]:
+        with suppress(DockerBackendError):
+            backend.remove_image(tag)
+            removed.append(tag)
+            _stamp(snapshots_dir, tag, ".used").unlink(missing_ok=True)
+    return removed
@@ -0,0 +1,242 @@
+"""Ranked fuzzy matching of branch names.
+
+Names are matched case-insensitively. A match scores by its best tier (exact,
+prefix, last path segment prefix, any segment prefix, substring, subsequence)
+plus a boost for worktrees used recently. Every tier is a regular expression
+scan over all names joined into one string, mapped to name positions without
+running Python code per match. Tiers are scanned best first, and with a limit
+the scan stops once enough names are out of reach of the remaining tiers.
+"""
+
+from __future__ import annotations
+
+import itertools
+import re
+import sys
+import time
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from collections.abc import Mapping
+
+
+# Given a query and candidate names, return the chosen name or None
+Chooser = Callable[[str, list[str]], str | None]
+
+
+EXACT_SCORE = 1000.0
+PREFIX_SCORE = 900.0
+LAST_SEGMENT_SCORE = 800.0
+SEGMENT_SCORE = 700.0
+SUBSTRING_SCORE = 500.0
+SUBSEQUENCE_SCORE = 300.0
+# Recency adds up to this much, halving every RECENCY_HALF_LIFE seconds
+RECENCY_BOOST = 100.0
+RECENCY_HALF_LIFE = 24 * 60 * 60.0
+# The best match is only taken without asking when it leads by this much
+AMBIGUITY_MARGIN = 150.0
+PICKER_LIMIT = 20
+
+_SEPARATORS = "/-_."
+# Written after every separator in the scanned text, so a segment start is
+# found by a literal search instead of a character class tried at every offset
+_MARK = "\0"
+_MARK_SEPARATORS = str.maketrans({separator: separator + _MARK for separator in _SEPARATORS})
+
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    """A candidate name and its score for a query."""
+
+    name: str
+    score: float
+
+
+def _best_first(match: FuzzyMatch) -> tuple[float, str]:
+    return (-match.score, match.name)
+
+
+class FuzzyIndex:
+    """Candidate names prepared once for repeated queries."""
+
+    def __init__(self, names: Iterable[str], accessed: Mapping[str, float] | None = None) -> None:
+        self.names = sorted(set(names))
+        self._lowered = [name.lower() for name in self.names]
+        marked = [lowered.translate(_MARK_SEPARATORS) for lowered in self._lowered]
+        # Every name is framed by newlines so prefixes and ends match literally
+        self._blob = "\n" + "".join(f"{name}\n" for name in marked)
+        self._positions = {lowered: index for index, lowered in enumerate(self._lowered)}
+        # Offset of the newline ending each name
+        self._ends = {}
+        offset = 0
+        for index, name in enumerate(marked):
+            offset += len(name) + 1
+            self._ends[offset] = index
+        now = time.time()
+        accessed = accessed or {}
+        # Everything but the tier: recency, and shorter names win ties as they
+        # leave less for the user to have meant
+        self._bias = [
+            (
+                RECENCY_BOOST * 0.5 ** (max(now - accessed[name], 0.0) / RECENCY_HALF_LIFE)
+                if name in accessed
+                else 0.0
+            )
+            - len(name) / 100
+            for name in self.names
+        ]
+        self._min_bias = min(self._bias, default=0.0)
+        # Best bias first; within a tier, names rank in this order
+        self._by_bias = sorted(range(len(self.names)), key=lambda index: -self._bias[index])
+
+    def _scan(self, pattern: str) -> Iterator[int]:
+        """Yield the index of every name matched by ``pattern``.
+
+        Patterns must consume the rest of the name, so each match ends at a
+        name's closing newline and is mapped back by a dict lookup.
+        """
+        return map(self._ends.__getitem__, map(re.Match.end, re.finditer(pattern, self._blob)))
+
+    def _leaders(self, positions: list[int], limit: int) -> list[int]:
+        """Return the ``limit`` names of one tier that rank first."""
+        if len(positions) <= limit:
+            return positions
+        members = set(positions)
+        return list(itertools.islice(filter(members.__contains__, self._by_bias), limit))
+
+    @staticmethod
+    def _gaps(query: str, name: str) -> int:
+        """Return the fewest skipped characters over all subsequence matches."""
+        best = len(name)
+        start = name.find(query[0])
+        while start != -1:
+            position = start
+            for char in query[1:]:
+                position = name.find(char, position + 1)
+                if position == -1:
+                    return best
+            best = min(best, position + 1 - start - len(query))
+            start = name.find(query[0], start + 1)
+        return best
+
+    def _tiers(self, query: str, limit: int | None) -> list[tuple[float, list[int]]]:
+        """Return the names containing ``query`` grouped by their best tier.
+
+        Each tier is one regex scan over the joined names, best tier first, so
+        a name keeps the first tier that finds it. Patterns start with a
+        literal, which the regex engine searches quickly, and a trailing
+        ``[^\\n]*`` consumes the rest of the name so it is reported once. With
+        a ``limit``, lower tiers are skipped once that many names are certain
+        to outscore anything a lower tier could reach with the full recency
+        boost.
+        """
+        marked = query.translate(_MARK_SEPARATORS)
+        literal = re.escape(marked)
+        # From the first query character, negated classes jump to the next
+        # one, so a name is checked in one pass with little backtracking
+        first, *rest = map(re.escape, marked)
+        subsequence = first + "".join(f"[^\\n{char}]*{char}" for char in rest)
+        scans = (
+            (PREFIX_SCORE, f"\\n{literal}[^\\n]*"),
+            (LAST_SEGMENT_SCORE, f"/{_MARK}{literal}[^\\n/]*(?=\\n)"),
+            (SEGMENT_SCORE, f"{_MARK}{literal}[^\\n]*"),
+            (SUBSTRING_SCORE, f"{literal}[^\\n]*"),
+            (SUBSEQUENCE_SCORE, f"{subsequence}[^\\n]*"),
+        )
+        exact = self._positions.get(query)
+        groups = [(EXACT_SCORE, [exact])] if exact is not None else []
+        seen = {position for _, found in groups for position in found}
+        for tier, pattern in scans:
+            if limit is not None:
+                bound = tier + RECENCY_BOOST
+                ahead = sum(len(found) for best, found in groups if best + self._min_bias >= bound)
+                if ahead >= limit:
+                    break
+            found = list(itertools.filterfalse(seen.__contains__, self._scan(pattern)))
+            if found:
+                seen.update(found)
+                groups.append((tier, found))
+        return groups
+
+    def _match(self, query: str, position: int, tier: float) -> FuzzyMatch:
+        if tier == SUBSEQUENCE_SCORE:
+            # Tighter subsequences rank higher
+            gaps = self._gaps(query, self._lowered[position])
+            tier = max(tier - 10.0 * gaps, tier / 3)
+        return FuzzyMatch(self.names[position], tier + self._bias[position])
+
+    def rank(self, query: str, limit: int | None = None) -> list[FuzzyMatch]:
+        """Return names matching ``query``, best first.
+
+        With a ``limit``, the best names are picked before subsequence gaps are
+        scored, so only those few are scored in Python.
+        """
+        lowered = query.lower()
+        groups = self._tiers(lowered, limit) if lowered else [(0.0, list(range(len(self.names))))]
+        matches = [
+            self._match(lowered, position, tier)
+            for tier, positions in groups
+            for position in (positions if limit is None else self._leaders(positions, limit))
+        ]
+        matches.sort(key=_best_first)
+        return matches if limit is None else matches[:limit]
+
+    def best(self, query: str) -> tuple[str | None, list[FuzzyMatch]]:
+        """Return the unambiguous best match for ``query`` (or None) and the leading matches."""
+        matches = self.rank(query, PICKER_LIMIT)
+        if not matches:
+            return None, matches
+        if matches[0].name == query or len(matches) == 1:
+            return matches[0].name, matches
+        if matches[0].score - matches[1].score >= AMBIGUITY_MARGIN:
+            return matches[0].name, matches
+        return None, matches
+
+
+def resolve_match(
+    query: str,
+    index: FuzzyIndex,
+    choose: Chooser | None = None,
+    *,
+    confirm: bool = False,
+) -> str | None:
+    """Resolve ``query`` to one name, asking ``choose`` when that is not clear-cut.
+
+    With ``confirm``, even an unambiguous match is passed to ``choose`` for
+    approval, for commands where a wrong guess is costly.
+    """
+    best, matches = index.best(query)
+    if best is not None and (not confirm or best == query):
+        return best
+    if choose is None or not matches:
+        return None
+    names = [best] if best is not None else [match.name for match in matches[:PICKER_LIMIT]]
+    return choose(query, names)
+
+
+def pick_match(query: str, names: list[str]) -> str | None:
+    """Ask the user which of ``names`` they meant by ``query``.
+
+    The prompt is drawn on stderr so it works inside ``$(branchspace cd ...)``.
+    Returns None when there is no terminal to ask on or the user declines.
+    """
+    if not names or not (sys.stdin.isatty() and sys.stderr.isatty()):
+        return None
+
+    import questionary
+
+    from prompt_toolkit.output import create_output
+
+    output = create_output(stdout=sys.stderr)
+    if len(names) == 1:
+        confirmed = questionary.confirm(f"Use '{names[0]}' for '{query}'?", output=output)
+        return names[0] if confirmed.unsafe_ask() else None
+    choice = questionary.select(f"Which worktree for '{query}'?", choices=names, output=output)
+    selected = choice.unsafe_ask()
+    return str(selected) if selected is not None else None
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
 
 from dataclasses import dataclass
@@ -52,7 +53,10 @@ class BranchInfo:
 
 
 def _run_git_command(
-    command: list[str], cwd: Path | None = None, capture_output: bool = True
+    command: list[str],
+    cwd: Path | None = None,
+    capture_output: bool = True,
+    timeout: float | None = None,
 ) -> subprocess.CompletedProcess:
     """Run a git command with proper error handling.
 
@@ -60,12 +64,14 @@ def _run_git_command(
         command: Git command to run as list of strings
         cwd: Working directory to run command in
         capture_output: Whether to capture stdout/stderr
+        timeout: Seconds after which git is killed. Defaults to no limit.
 
     Returns:
         Completed process result
 
     Raises:
         CalledProcessError: If git command fails
+        TimeoutExpired: If git runs longer than timeout
     """
     try:
         result = subprocess.run(
@@ -74,6 +80,7 @@ def _run_git_command(
             capture_output=capture_output,
             text=True,
             check=True,
+            timeout=timeout,
         )
         return result
     except subprocess.CalledProcessError as e:
@@ -82,6 +89,119 @@ def _run_git_command(
         raise
 
 
+@dataclass(frozen=True)
+class GitRepository:
+    """Location of a worktree and its git directories, found without running git."""
+
+    worktree: Path
+    git_dir: Path
+    common_dir: Path
+
+
+def _read_gitfile(gitfile: Path) -> Path | None:
+    try:
+        content = gitfile.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not content.startswith("gitdir:"):
+        return None
+    git_dir = Path(content.removeprefix("gitdir:").strip())
+    return git_dir if git_dir.is_absolute() else gitfile.parent / git_dir
+
+
+def worktree_admin_dir(worktree_path: Path) -> Path | None:
+    """Return the git admin directory a linked worktree's gitfile points to."""
+    admin_dir = _read_gitfile(worktree_path / ".git")
+    return admin_dir if admin_dir is not None and admin_dir.is_dir() else None
+
+
+def read_head_branch(git_dir: Path) -> str | None:
+    """Return the branch a git directory's HEAD points at, without running git.
+
+    Returns None for a detached HEAD or an unreadable git directory.
+    """
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    prefix = "ref: refs/heads/"
+    return head.removeprefix(prefix) if head.startswith(prefix) else None
+
+
+def holds_branch(path: Path, branch: str | None, common_dir: Path) -> bool:
+    """Check without running git that ``path`` is a worktree of the repository on ``branch``.
+
+    ``branch`` None stands for a detached HEAD. A linked worktree's gitfile
+    must point into the repository's ``worktrees`` directory and the admin
+    entry's ``gitdir`` must point back at the same worktree, so a stale or
+    foreign directory at ``path`` is never accepted.
+    """
+    dot_git = path / ".git"
+    if dot_git.is_dir():
+        return dot_git.resolve() == common_dir and read_head_branch(common_dir) == branch
+    admin_dir = worktree_admin_dir(path)
+    if admin_dir is None or admin_dir.resolve().parent != common_dir / "worktrees":
+        return False
+    try:
+        back_reference = Path((admin_dir / "gitdir").read_text(encoding="utf-8").strip())
+    except OSError:
+        return False
+    if back_reference.resolve() != dot_git.resolve():
+        return False
+    return read_head_branch(admin_dir) == branch
+
+
+def find_repository(start_path: Path | None = None) -> GitRepository | None:
+    """Locate the enclosing repository by walking up for ``.git``.
+
+    Handles regular checkouts and linked worktrees (gitfile plus ``commondir``)
+    with plain file reads, so hot paths avoid forking git. Returns None when
+    nothing is found or when ``GIT_DIR`` is set, in which case callers should
+    ask git instead.
+    """
+    if "GIT_DIR" in os.environ:
+        return None
+    start = (start_path or Path.cwd()).resolve()
+    for directory in (start, *start.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            git_dir: Path | None = dot_git
+        elif dot_git.is_file():
+            git_dir = _read_gitfile(dot_git)
+        else:
+            continue
+        if git_dir is None or not (git_dir / "HEAD").is_file():
+            return None
+        git_dir = git_dir.resolve()
+        try:
+            common = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+        except OSError:
+            common_dir = git_dir
+        else:
+            common_dir = (git_dir / common).resolve()
+        return GitRepository(worktree=directory, git_dir=git_dir, common_dir=common_dir)
+    return None
+
+
+def get_git_root(start_path: Path | None = None) -> Path | None:
+    """Find the git repository root from start_path or cwd.
+
+    Args:
+        start_path: Starting directory for search. Defaults to cwd.
+
+    Returns:
+        Path to git root, or None if not in a git repository.
+    """
+    if start_path is None:
+        start_path = Path.cwd()
+
+    try:
+        result = _run_git_command(["rev-parse", "--show-toplevel"], cwd=start_path)
+        return Path(result.stdout.strip())
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+
 def is_git_repository(path: Path | None = None) -> bool:
     """Check if a directory is a git repository.
 
@@ -115,19 +235,59 @@ def get_current_branch(path: Path | None = None) -> str | None:
         return None
 
 
-def list_worktrees(path: Path | None = None) -> list[GitWorktree]:
+def get_git_common_dir(path: Path | None = None) -> Path | None:
+    """Get the git directory shared by all worktrees of the repository.
+
+    Args:
+        path: Directory to check. Defaults to current directory.
+
+    Returns:
+        Absolute path to the common git directory, or None if not in a repository.
+    """
+    repository = find_repository(path)
+    if repository is not None:
+        return repository.common_dir
+    try:
+        result = _run_git_command(["rev-parse", "--git-common-dir"], cwd=path)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    common_dir = Path(result.stdout.strip())
+    if not common_dir.is_absolute():
+        common_dir = (path or Path.cwd()) / common_dir
+    return common_dir.resolve()
+
+
+def get_hooks_dir(path: Path | None = None) -> Path:
+    """Get the hooks directory git uses for the repository, honoring core.hooksPath.
+
+    Args:
+        path: Repository path. Defaults to current directory.
+
+    Raises:
+        CalledProcessError: If git command fails.
+    """
+    result = _run_git_command(["rev-parse", "--git-path", "hooks"], cwd=path)
+    hooks_dir = Path(result.stdout.strip())
+    if not hooks_dir.is_absolute():
+        hooks_dir = (path or Path.cwd()) / hooks_dir
+    return hooks_dir
+
+
+def list_worktrees(path: Path | None = None, timeout: float | None = None) -> list[GitWorktree]:
     """List all worktrees in the repository.
 
     Args:
         path: Repository path. Defaults to current directory.
+        timeout: Seconds after which git is killed. Defaults to no limit.
 
     Returns:
         List of GitWorktree objects representing each worktree.
 
     Raises:
         CalledProcessError: If git command fails.
+        TimeoutExpired: If git runs longer than timeout.
     """
-    result = _run_git_command(["worktree", "list", "--porcelain"], cwd=path)
+    result = _run_git_command(["worktree", "list", "--porcelain"], cwd=path, timeout=timeout)
 
     worktrees = []
     current_path = None
@@ -160,7 +320,7 @@ def list_worktrees(path: Path | None = None) -> list[GitWorktree]:
         elif prefix == "branch":
             # Strip refs/heads/ prefix if present
             current_branch = value.removeprefix("refs/heads/")
-        elif prefix == "HEAD detached":
+        elif prefix == "detached":
             current_branch = "HEAD"
             current_committed = False
 
@@ -178,6 +338,40 @@ def list_worktrees(path: Path | None = None) -> list[GitWorktree]:
     return worktrees
 
 
+def list_branch_names(
+    path: Path | None = None, timeout: float | None = None, *, remotes: bool = True
+) -> list[str]:
+    """List local branch names plus remote branch names without their remote prefix.
+
+    Args:
+        path: Repository path. Defaults to current directory.
+        timeout: Seconds after which git is killed. Defaults to no limit.
+        remotes: Whether to include remote branch names.
+
+    Returns:
+        Sorted, de-duplicated branch names.
+
+    Raises:
+        CalledProcessError: If git command fails.
+        TimeoutExpired: If git runs longer than timeout.
+    """
+    refs = ["refs/heads", "refs/remotes"] if remotes else ["refs/heads"]
+    result = _run_git_command(
+        ["for-each-ref", "--format=%(refname)", *refs],
+        cwd=path,
+        timeout=timeout,
+    )
+    names: set[str] = set()
+    for ref in result.stdout.splitlines():
+        if ref.startswith("refs/heads/"):
+            names.add(ref.removeprefix("refs/heads/"))
+        elif ref.startswith("refs/remotes/"):
+            parts = ref.split("/", 3)
+            if len(parts) == 4 and parts[3] != "HEAD":
+                names.add(parts[3])
+    return sorted(names)
+
+
 def create_worktree(
     path: Path,
     branch: str,
@@ -238,6 +432,34 @@ def remove_worktree(
         _run_git_command(["worktree", "remove", str(worktree_path)], cwd=repository_path)
 
 
+def repair_worktrees(paths: list[Path], repository_path: Path | None = None) -> None:
+    """Repair worktree administrative links after worktrees were moved.
+
+    Args:
+        paths: New locations of moved worktrees, repaired in one git invocation.
+        repository_path: Path to the main repository. Defaults to current directory.
+
+    Raises:
+        CalledProcessError: If the repair fails.
+    """
+    if paths:
+        _run_git_command(["worktree", "repair", *map(str, paths)], cwd=repository_path)
+
+
+def delete_branches(branches: list[str], repository_path: Path | None = None) -> None:
+    """Force-delete local branches in a single git invocation.
+
+    Args:
+        branches: Branch names to delete.
+        repository_path: Path to the main repository. Defaults to current directory.
+
+    Raises:
+        CalledProcessError: If branch deletion fails.
+    """
+    if branches:
+        _run_git_command(["branch", "-D", *branches], cwd=repository_path)
+
+
 def get_protected_branches(
     repository_path: Path | None = None,
 ) -> list[str]:
@@ -291,13 +513,20 @@ def has_uncommitted_changes(path: Path | None = None) -> bool:
         return False
 
 
-def has_uncommitted_changes_with_untracked(path: Path | None = None) -> bool:
-    """Check if there are uncommitted or untracked changes in the repository."""
+def has_uncommitted_changes_with_untracked(
+    path: Path | None = None, timeout: float | None = None
+) -> bool:
+    """Check if there are uncommitted or untracked changes in the repository.
+
+    Raises:
+        TimeoutExpired: If ``timeout`` is given and git takes longer.
+    """
     try:
         result = _run_git_command(
             ["status", "--porcelain"],
             cwd=path,
             capture_output=True,
+            timeout=timeout,
         )
         return bool(result.stdout.strip())
     except subprocess.CalledProcessError:
@@ -7,11 +7,11 @@ from pathlib import Path
 
 import questionary
 
-from branchspace.config import CONFIG_FILENAME
 from branchspace.config import BranchspaceConfig
 from branchspace.config import ContainerBuildConfig
 from branchspace.config import ContainerImageConfig
-from branchspace.config import get_git_root
+from branchspace.config_snapshot import CONFIG_FILENAME
+from branchspace.git_utils import get_git_root
 
 
 DOCKERFILE_CANDIDATES = ("Dockerfile", "Dockerfile.dev", "Dockerfile.local")
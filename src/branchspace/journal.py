@@ -0,0 +1,166 @@
+"""Operation journal for resumable batch create and remove."""
+
+from __future__ import annotations
+
+import threading
+
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+from branchspace.state import get_state_dir
+from branchspace.state import read_state
+from branchspace.state import write_state
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+JOURNAL_VERSION = 1
+
+# Create phases, in the order they run
+PHASE_WORKTREE = "worktree"
+PHASE_COPY = "copy"
+PHASE_POST_CREATE = "post_create"
+PHASE_TERMINAL = "terminal"
+
+# Remove phases, in the order they run
+PHASE_REMOVED = "removed"
+PHASE_BRANCH_DELETED = "branch_deleted"
+
+
+@dataclass
+class JournalEntry:
+    """Checkpoints recorded for one branch of a batch."""
+
+    branch: str
+    phases: list[str] = field(default_factory=list)
+    path: Path | None = None
+    source_branch: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "branch": self.branch,
+            "phases": list(self.phases),
+            "path": str(self.path) if self.path is not None else None,
+            "source_branch": self.source_branch,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> JournalEntry:
+        path = data.get("path")
+        return cls(
+            branch=data["branch"],
+            phases=list(data.get("phases", [])),
+            path=Path(path) if path else None,
+            source_branch=data.get("source_branch"),
+        )
+
+
+class OperationJournal:
+    """Per-branch phase checkpoints for an in-flight batch operation.
+
+    The journal is written after every checkpoint and deleted once the whole
+    batch finishes, so its presence means the last batch was interrupted.
+    """
+
+    def __init__(self, path: Path, operation: str, entries: Iterable[JournalEntry] = ()):
+        self.path = path
+        self.operation = operation
+        self._entries = {entry.branch: entry for entry in entries}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def journal_path(repo_root: Path, operation: str) -> Path:
+        return get_state_dir(repo_root) / f"journal-{operation}.json"
+
+    @classmethod
+    def load(cls, repo_root: Path, operation: str) -> OperationJournal | None:
+        """Load the pending journal for an operation, if one exists."""
+        path = cls.journal_path(repo_root, operation)
+        data = read_state(path)
+        if data is None or data.get("version") != JOURNAL_VERSION:
+            return None
+        entries = [JournalEntry.from_dict(item) for item in data.get("entries", [])]
+        return cls(path, operation, entries)
+
+    @classmethod
+    def start(cls, repo_root: Path, operation: str, branches: Iterable[str]) -> OperationJournal:
+        """Start a new journal for a batch of branches."""
+        journal = cls(cls.journal_path(repo_root, operation), operation)
+        journal.add_branches(branches)
+        return journal
+
+    @property
+    def branches(self) -> list[str]:
+        return list(self._entries)
+
+    def entry(self, branch: str) -> JournalEntry:
+        return self._entries[branch]
+
+    def add_branches(self, branches: Iterable[str]) -> None:
+        with self._lock:
+            for branch in branches:
+                self._entries.setdefault(branch, JournalEntry(branch=branch))
+            self._save()
+
+    def is_done(self, branch: str, phase: str) -> bool:
+        entry = self._entries.get(branch)
+        return entry is not None and phase in entry.phases
+
+    def is_complete(self, branch: str, phases: Iterable[str]) -> bool:
+        return all(self.is_done(branch, phase) for phase in phases)
+
+    def record(
+        self,
+        branch: str,
+        *,
+        path: Path | None = None,
+        source_branch: str | None = None,
+    ) -> None:
+        """Record branch details needed to resume or roll back."""
+        with self._lock:
+            entry = self._entries.setdefault(branch, JournalEntry(branch=branch))
+            if path is not None:
+                entry.path = path
+            if source_branch is not None:
+                entry.source_branch = source_branch
+            self._save()
+
+    def checkpoint(self, branch: str, phase: str) -> None:
+        """Mark a phase as finished for a branch and persist the journal."""
+        with self._lock:
+            entry = self._entries.setdefault(branch, JournalEntry(branch=branch))
+            if phase not in entry.phases:
+                entry.phases.append(phase)
+            self._save()
+
+    def forget_if_untouched(self, branch: str) -> None:
+        """Drop a branch that failed before any phase ran, so it does not block resume."""
+        with self._lock:
+            entry = self._entries.get(branch)
+            if entry is None or entry.phases:
+                return
+            del self._entries[branch]
+            if self._entries:
+                self._save()
+            else:
+                self.path.unlink(missing_ok=True)
+
+    def discard(self) -> None:
+        """Delete the journal once the batch is finished."""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+
+    def _save(self) -> None:
+        write_state(
+            self.path,
+            {
+                "version": JOURNAL_VERSION,
+                "operation": self.operation,
+                "entries": [entry.to_dict() for entry in self._entries.values()],
+            },
+        )
@@ -1,45 +1,20 @@
-"""Main CLI entrypoint for branchspace."""
+"""Main CLI entrypoint for branchspace.
+
+Command modules and heavy dependencies (rich, pydantic, questionary) are
+imported inside each command so that hot paths such as ``cd`` and shell
+completion only pay for what they use.
+"""
 
 import subprocess
 
+from contextlib import suppress
+
 import click
-import questionary
 
 from branchspace import __version__
-from branchspace.agents import SUPPORTED_AGENTS
-from branchspace.agents import format_agent_label
-from branchspace.agents import generate_instructions
-from branchspace.agents import get_project_root
-from branchspace.agents import write_instructions
+from branchspace.completion import BranchRefComplete
 from branchspace.completion import WorktreeBranchComplete
-from branchspace.config import ConfigError
-from branchspace.config import load_config
-from branchspace.config_display import load_config_view
-from branchspace.config_display import render_config
-from branchspace.console import error
-from branchspace.console import info
-from branchspace.console import spinner
-from branchspace.console import success
-from branchspace.docker_purge import DockerPurgeError
-from branchspace.docker_purge import run_docker_purge
-from branchspace.docker_shell import DockerShellError
-from branchspace.docker_shell import run_docker_shell
-from branchspace.init_config import init_config
-from branchspace.shell_integration import append_integration
-from branchspace.shell_integration import build_shell_function
-from branchspace.shell_integration import detect_shell_rc_files
-from branchspace.shell_integration import render_manual_instructions
-from branchspace.skill import format_skill_path
-from branchspace.skill import install_skill
-from branchspace.skill import is_skill_installed
-from branchspace.worktree_cd import WorktreeLookupError
-from branchspace.worktree_cd import resolve_worktree_path
-from branchspace.worktree_create import CreateWorktreeError
-from branchspace.worktree_create import create_worktrees
-from branchspace.worktree_list import build_worktree_list_table
-from branchspace.worktree_list import list_worktree_statuses
-from branchspace.worktree_remove import WorktreeRemoveError
-from branchspace.worktree_remove import remove_worktrees
+from branchspace.completion import refresh_after_upgrade
 
 
 @click.group(
@@ -49,12 +24,48 @@ from branchspace.worktree_remove import remove_worktrees
 @click.version_option(__version__, "--version", prog_name="branchspace")
 def main() -> None:
     """Branchspace CLI."""
+    # Keep sourced completion scripts in step with the installed version
+    with suppress(OSError):
+        refresh_after_upgrade()
 
 
 @main.command(help="Create a new worktree.")
-@click.argument("branch", nargs=-1, required=True)
-def create(branch: tuple[str, ...]) -> None:
+@click.argument("branch", nargs=-1, shell_complete=BranchRefComplete())
+@click.option("--resume", is_flag=True, help="Finish an interrupted create batch.")
+@click.option("--rollback", is_flag=True, help="Undo the unfinished part of an interrupted batch.")
+def create(branch: tuple[str, ...], resume: bool, rollback: bool) -> None:
     """Create a new worktree."""
+    from branchspace.config import load_config
+    from branchspace.config_snapshot import ConfigError
+    from branchspace.console import error
+    from branchspace.console import info
+    from branchspace.console import spinner
+    from branchspace.console import success
+    from branchspace.worktree_create import CreateWorktreeError
+    from branchspace.worktree_create import create_worktrees
+    from branchspace.worktree_create import rollback_worktrees
+
+    if resume and rollback:
+        raise click.UsageError("--resume and --rollback cannot be used together.")
+    if not branch and not (resume or rollback):
+        raise click.UsageError("Missing argument 'BRANCH...'.")
+
+    if rollback:
+        try:
+            with spinner("Rolling back interrupted create"):
+                rolled_back = rollback_worktrees()
+        except CreateWorktreeError as exc:
+            error(str(exc))
+            raise SystemExit(1) from exc
+        except subprocess.CalledProcessError as exc:
+            error(exc.stderr.strip() if exc.stderr else str(exc))
+            raise SystemExit(1) from exc
+
+        for undone in rolled_back:
+            success(f"Rolled back {undone.branch} at {undone.path}")
+        info("Rollback complete.")
+        return
+
     try:
         config = load_config()
     except ConfigError as exc:
@@ -63,7 +74,7 @@ def create(branch: tuple[str, ...]) -> None:
 
     try:
         with spinner("Creating worktrees"):
-            results = create_worktrees(list(branch), config)
+            results = create_worktrees(list(branch), config, resume=resume)
     except CreateWorktreeError as exc:
         error(str(exc))
         raise SystemExit(1) from exc
@@ -76,13 +87,32 @@ def create(branch: tuple[str, ...]) -> None:
 
     for created in results:
         success(f"Created {created.branch} at {created.path}")
+    if config.container_mode == "persistent" and config.prewarm_container:
+        from branchspace.docker_persistent import prewarm_in_background
+
+        for created in results:
+            prewarm_in_background(created.path)
+        info("Starting containers in the background.")
     info("Worktrees ready.")
 
 
 @main.command(help="Remove a worktree.")
-@click.argument("branch", nargs=-1, required=True, shell_complete=WorktreeBranchComplete())
-def rm(branch: tuple[str, ...]) -> None:
+@click.argument("branch", nargs=-1, shell_complete=WorktreeBranchComplete())
+@click.option("--resume", is_flag=True, help="Finish an interrupted remove batch.")
+def rm(branch: tuple[str, ...], resume: bool) -> None:
     """Remove a worktree."""
+    from branchspace.config import load_config
+    from branchspace.config_snapshot import ConfigError
+    from branchspace.console import error
+    from branchspace.console import info
+    from branchspace.console import success
+    from branchspace.fuzzy import pick_match
+    from branchspace.worktree_remove import WorktreeRemoveError
+    from branchspace.worktree_remove import remove_worktrees
+
+    if not branch and not resume:
+        raise click.UsageError("Missing argument 'BRANCH...'.")
+
     try:
         config = load_config()
     except ConfigError as exc:
@@ -90,7 +120,7 @@ def rm(branch: tuple[str, ...]) -> None:
         raise SystemExit(1) from exc
 
     try:
-        results = remove_worktrees(list(branch), config)
+        results = remove_worktrees(branch, config, resume=resume, choose=pick_match)
     except WorktreeRemoveError as exc:
         error(str(exc))
         raise SystemExit(1) from exc
@@ -105,13 +135,61 @@ def rm(branch: tuple[str, ...]) -> None:
             info(f"Skipped {result.branch} at {result.path}")
 
 
+@main.command(help="Move worktrees to their templated paths.")
+@click.argument("branch", nargs=-1, shell_complete=WorktreeBranchComplete())
+@click.option("--dry-run", is_flag=True, help="Preview moves without relocating.")
+def mv(branch: tuple[str, ...], dry_run: bool) -> None:
+    """Move worktrees to their templated paths."""
+    from branchspace.config import load_config
+    from branchspace.config_snapshot import ConfigError
+    from branchspace.console import error
+    from branchspace.console import info
+    from branchspace.console import spinner
+    from branchspace.console import success
+    from branchspace.worktree_create import CreateWorktreeError
+    from branchspace.worktree_move import WorktreeMoveError
+    from branchspace.worktree_move import move_worktrees
+
+    try:
+        config = load_config()
+    except ConfigError as exc:
+        error(str(exc))
+        raise SystemExit(1) from exc
+
+    try:
+        with spinner("Moving worktrees"):
+            moves = move_worktrees(list(branch), config, dry_run=dry_run)
+    except (WorktreeMoveError, CreateWorktreeError) as exc:
+        error(str(exc))
+        raise SystemExit(1) from exc
+    except subprocess.CalledProcessError as exc:
+        error(exc.stderr.strip() if exc.stderr else str(exc))
+        raise SystemExit(1) from exc
+
+    if not moves:
+        info("All worktrees are already at their templated paths.")
+        return
+
+    for move in moves:
+        if dry_run:
+            info(f"Would move {move.branch}: {move.source} -> {move.destination}")
+        else:
+            success(f"Moved {move.branch} to {move.destination}")
+
+
 @main.command(help="Change to a worktree.")
 @click.argument("branch", required=False, shell_complete=WorktreeBranchComplete())
 def cd(branch: str | None) -> None:
     """Change to a worktree."""
+    from branchspace.fuzzy import pick_match
+    from branchspace.worktree_cd import WorktreeLookupError
+    from branchspace.worktree_cd import resolve_worktree_path
+
     try:
-        resolved = resolve_worktree_path(branch)
+        resolved = resolve_worktree_path(branch, choose=pick_match)
     except WorktreeLookupError as exc:
+        from branchspace.console import error
+
         error(str(exc))
         raise SystemExit(1) from exc
 
@@ -121,6 +199,12 @@ def cd(branch: str | None) -> None:
 @main.command(help="List worktrees.")
 def ls() -> None:
     """List worktrees."""
+    from branchspace.console import error
+    from branchspace.console import get_console
+    from branchspace.console import info
+    from branchspace.worktree_list import build_worktree_list_table
+    from branchspace.worktree_list import list_worktree_statuses
+
     try:
         statuses = list_worktree_statuses()
     except subprocess.CalledProcessError as exc:
@@ -132,15 +216,115 @@ def ls() -> None:
         return
 
     table = build_worktree_list_table(statuses)
-    from branchspace.console import get_console
-
     get_console().print(table)
 
 
+@main.command(help="Rebuild the worktree index from git.")
+@click.option(
+    "--install-hook",
+    is_flag=True,
+    help="Install a post-checkout hook that keeps the index current.",
+)
+@click.option("--quiet", is_flag=True, help="Suppress output.")
+def reindex(install_hook: bool, quiet: bool) -> None:
+    """Rebuild the worktree index from git."""
+    from branchspace.console import error
+    from branchspace.console import info
+    from branchspace.console import success
+    from branchspace.git_utils import get_git_root
+    from branchspace.worktree_index import install_post_checkout_hook
+    from branchspace.worktree_index import rebuild_index
+
+    root = get_git_root()
+    if root is None:
+        error("Not inside a git repository.")
+        raise SystemExit(1)
+
+    try:
+        entries = rebuild_index(root)
+        hook_path = install_post_checkout_hook(root) if install_hook else None
+    except (OSError, subprocess.CalledProcessError) as exc:
+        error(str(exc))
+        raise SystemExit(1) from exc
+
+    if quiet:
+        return
+    success(f"Indexed {len(entries)} worktree(s).")
+    if hook_path is not None:
+        success(f"Installed index hook in {hook_path}")
+    elif install_hook:
+        info("Index hook already installed.")
+
+
+@main.command(help="Print the prompt segment for the current worktree.")
+@click.option("--refresh", is_flag=True, help="Recompute the segment instead of reading the cache.")
+def prompt(refresh: bool) -> None:
+    """Print the cached prompt segment, or recompute it with --refresh."""
+    from branchspace.prompt import cached_segment
+    from branchspace.prompt import refresh_prompt
+
+    if refresh:
+        refresh_prompt()
+        return
+    segment = cached_segment()
+    if segment:
+        click.echo(segment)
+
+
+@main.command(help="Start, stop or check the repository daemon.")
+@click.argument(
+    "action", type=click.Choice(["start", "stop", "status"]), default="status", required=False
+)
+def daemon(action: str) -> None:
+    """Manage the optional daemon that keeps repository state warm."""
+    import time
+
+    from branchspace.console import error
+    from branchspace.console import info
+    from branchspace.console import success
+    from branchspace.daemon_client import query
+    from branchspace.daemon_client import start_daemon
+    from branchspace.git_utils import find_repository
+
+    repository = find_repository()
+    if repository is None:
+        error("Not inside a git repository.")
+        raise SystemExit(1)
+
+    running = query("ping", repository.worktree) == "pong"
+    if action == "status":
+        info("Daemon is running." if running else "Daemon is not running.")
+    elif action == "stop":
+        if running:
+            query("shutdown", repository.worktree)
+            success("Daemon stopped.")
+        else:
+            info("Daemon is not running.")
+    elif running:
+        info("Daemon is already running.")
+    else:
+        start_daemon(repository)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if query("ping", repository.worktree) == "pong":
+                success("Daemon started.")
+                return
+            time.sleep(0.05)
+        error("Daemon did not start.")
+        raise SystemExit(1)
+
+
 @main.command(help="Open an interactive shell.")
 @click.argument("command", required=False)
 def shell(command: str | None) -> None:
     """Open an interactive shell."""
+    from branchspace.config import load_config
+    from branchspace.config_snapshot import ConfigError
+    from branchspace.console import error
+    from branchspace.console import spinner
+    from branchspace.docker_shell import DockerShellError
+    from branchspace.docker_shell import run_docker_shell
+
     try:
         config = load_config()
     except ConfigError as exc:
@@ -161,11 +345,30 @@ def shell(command: str | None) -> None:
 @main.command(help="Purge a worktree and related resources.")
 @click.option("--force", is_flag=True, help="Skip confirmation prompts.")
 @click.option("--dry-run", is_flag=True, help="Preview resources without removing.")
-def purge(force: bool, dry_run: bool) -> None:
+@click.option(
+    "--all", "all_branches", is_flag=True, help="Purge resources of every branch of the repo."
+)
+@click.option(
+    "--stale", is_flag=True, help="Purge resources whose branch or worktree no longer exists."
+)
+def purge(force: bool, dry_run: bool, all_branches: bool, stale: bool) -> None:
     """Purge a worktree and related resources."""
+    from branchspace.console import error
+    from branchspace.console import info
+    from branchspace.console import spinner
+    from branchspace.docker_purge import SCOPE_ALL
+    from branchspace.docker_purge import SCOPE_BRANCH
+    from branchspace.docker_purge import SCOPE_STALE
+    from branchspace.docker_purge import DockerPurgeError
+    from branchspace.docker_purge import run_docker_purge
+
+    if all_branches and stale:
+        raise click.UsageError("--all and --stale cannot be used together.")
+    scope = SCOPE_ALL if all_branches else SCOPE_STALE if stale else SCOPE_BRANCH
+
     try:
         with spinner("Discovering Docker resources"):
-            resources = run_docker_purge(dry_run=dry_run, force=force)
+            resources = run_docker_purge(dry_run=dry_run, force=force, scope=scope)
     except DockerPurgeError as exc:
         error(str(exc))
         raise SystemExit(1) from exc
@@ -181,9 +384,65 @@ def purge(force: bool, dry_run: bool) -> None:
         info("Dry run only. No resources removed.")
 
 
+@main.command(help="List or prune the shared dependency cache volumes.")
+@click.argument("action", type=click.Choice(["ls", "prune"]), default="ls", required=False)
+@click.argument("names", nargs=-1)
+@click.option("--force", is_flag=True, help="Skip the confirmation prompt.")
+def cache(action: str, names: tuple[str, ...], force: bool) -> None:
+    """Show the size of each shared cache, or remove caches."""
+    from pathlib import Path
+
+    import questionary
+
+    from branchspace.config import load_config
+    from branchspace.config_snapshot import ConfigError
+    from branchspace.console import error
+    from branchspace.console import get_console
+    from branchspace.console import info
+    from branchspace.console import success
+    from branchspace.console import warning
+    from branchspace.docker_caches import DockerCacheError
+    from branchspace.docker_caches import build_cache_table
+    from branchspace.docker_caches import list_caches
+    from branchspace.docker_caches import prune_caches
+
+    worktree_path = Path.cwd().resolve()
+    try:
+        config = load_config()
+        caches = list_caches(config.cache_mounts, worktree_path)
+    except (ConfigError, DockerCacheError) as exc:
+        error(str(exc))
+        raise SystemExit(1) from exc
+
+    if names:
+        unknown = set(names) - {entry.name for entry in caches}
+        if unknown:
+            error(f"No such cache: {', '.join(sorted(unknown))}")
+            raise SystemExit(1)
+        caches = [entry for entry in caches if entry.name in names]
+
+    if not caches:
+        info("No cache volumes found.")
+        return
+    get_console().print(build_cache_table(caches))
+    if action == "ls":
+        return
+
+    if not force and not questionary.confirm("Remove these cache volumes?").unsafe_ask():
+        return
+    kept = prune_caches(caches)
+    for entry in kept:
+        warning(f"{entry.name} is in use by a container and was kept.")
+    success(f"Removed {len(caches) - len(kept)} cache volume(s).")
+
+
 @main.command(help="Initialize configuration for this repository.")
 def init() -> None:
     """Initialize branchspace configuration."""
+    from branchspace.console import error
+    from branchspace.console import success
+    from branchspace.init_config import init_config
+
     try:
         config_path = init_config()
     except RuntimeError as exc:
@@ -196,6 +455,11 @@ def init() -> None:
 @main.command(name="config", help="Show or edit configuration.")
 def config_cmd() -> None:
     """Show or edit configuration."""
+    from branchspace.config_display import load_config_view
+    from branchspace.config_display import render_config
+    from branchspace.config_snapshot import ConfigError
+    from branchspace.console import error
+
     try:
         view = load_config_view()
     except ConfigError as exc:
@@ -208,6 +472,18 @@ def config_cmd() -> None:
 @main.command(name="shell-integration", help="Install shell integration.")
 def shell_integration() -> None:
     """Install shell integration."""
+    import questionary
+
+    from branchspace.completion import refresh_completion_scripts
+    from branchspace.completion import write_completion_script
+    from branchspace.console import info
+    from branchspace.console import success
+    from branchspace.shell_integration import append_integration
+    from branchspace.shell_integration import build_shell_function
+    from branchspace.shell_integration import detect_shell_rc_files
+    from branchspace.shell_integration import render_manual_instructions
+
+    refresh_completion_scripts()
     candidates = detect_shell_rc_files()
     if not candidates:
         info("No supported shell rc files detected.")
@@ -229,6 +505,8 @@ def shell_integration() -> None:
         label = f"{candidate.name}: {candidate.rc_path}"
         if label not in selection:
             continue
+        completion_path = write_completion_script(candidate.name)
+        info(f"Wrote completion script {completion_path}")
         snippet = build_shell_function(candidate.name)
         if append_integration(candidate.rc_path, snippet):
             success(f"Updated {candidate.rc_path}")
@@ -243,6 +521,19 @@ def shell_integration() -> None:
 @main.command(help="Generate AI agent instructions for this repository.")
 def agents() -> None:
     """Generate AI agent instructions for this repository."""
+    import questionary
+
+    from branchspace.agents import SUPPORTED_AGENTS
+    from branchspace.agents import format_agent_label
+    from branchspace.agents import generate_instructions
+    from branchspace.agents import get_project_root
+    from branchspace.agents import write_instructions
+    from branchspace.console import info
+    from branchspace.console import success
+    from branchspace.skill import format_skill_path
+    from branchspace.skill import install_skill
+    from branchspace.skill import is_skill_installed
+
     choices = [format_agent_label(agent) for agent in SUPPORTED_AGENTS]
     selection = questionary.checkbox(
         "Select agents to generate instructions for:",
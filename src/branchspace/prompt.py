@@ -0,0 +1,202 @@
+"""Shell prompt segment for the current worktree, answered from cached state.
+
+The rendered segment lives in a ``branchspace-prompt`` file next to the
+worktree's ``HEAD``, so the shell snippets can read it with builtins alone and
+``git worktree prune`` cleans it up. Reading never runs git or docker: a stale
+or missing segment is returned as is (or rendered from ``HEAD`` with an unknown
+dirty state) while a detached ``branchspace prompt --refresh`` recomputes it.
+The refresh itself runs git and docker under strict timeouts and also records
+its findings in the repository's ``status.json`` state file.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+
+from branchspace.background import spawn_module
+from branchspace.daemon_client import query
+from branchspace.git_utils import GitRepository
+from branchspace.git_utils import find_repository
+from branchspace.git_utils import has_uncommitted_changes_with_untracked
+from branchspace.git_utils import read_head_branch
+from branchspace.state import STATE_DIRNAME
+from branchspace.state import file_lock
+from branchspace.state import read_state
+from branchspace.state import write_state
+from branchspace.state import write_text_atomic
+from branchspace.worktree_index import read_index
+
+
+PROMPT_FILENAME = "branchspace-prompt"
+STATUS_FILENAME = "status.json"
+STATUS_LOCK = "status.lock"
+FORMAT_ENV = "BRANCHSPACE_PROMPT_FORMAT"
+TTL_ENV = "BRANCHSPACE_PROMPT_TTL"
+DEFAULT_FORMAT = "({branch}{dirty}{container})"
+DEFAULT_TTL = 10.0
+GIT_TIMEOUT = 2.0
+DOCKER_TIMEOUT = 1.0
+DIRTY_MARK = "*"
+UNKNOWN_MARK = "?"
+CONTAINER_MARK = " ⬢"
+
+
+@dataclass(frozen=True)
+class WorktreeState:
+    """What the prompt shows for one worktree; None means not known."""
+
+    branch: str
+    worktree: str
+    dirty: bool | None
+    container_running: bool | None
+
+
+def _ttl() -> float:
+    try:
+        return float(os.environ.get(TTL_ENV, DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+
+def _head_label(git_dir: Path) -> str:
+    branch = read_head_branch(git_dir)
+    if branch is not None:
+        return branch
+    try:
+        return (git_dir / "HEAD").read_text(encoding="utf-8").strip()[:7]
+    except OSError:
+        return "HEAD"
+
+
+def render_segment(state: WorktreeState, fmt: str | None = None) -> str:
+    """Render ``state`` with ``fmt`` or ``BRANCHSPACE_PROMPT_FORMAT``.
+
+    Fields: ``{branch}``, ``{worktree}``, ``{dirty}`` and ``{container}``.
+    """
+    dirty = {None: UNKNOWN_MARK, True: DIRTY_MARK, False: ""}[state.dirty]
+    fmt = fmt or os.environ.get(FORMAT_ENV) or DEFAULT_FORMAT
+    try:
+        return fmt.format(
+            branch=state.branch,
+            worktree=state.worktree,
+            dirty=dirty,
+            container=CONTAINER_MARK if state.container_running else "",
+        )
+    except (KeyError, IndexError, ValueError):
+        return DEFAULT_FORMAT.format(branch=state.branch, dirty=dirty, container="")
+
+
+def _is_stale(repository: GitRepository, prompt_file: Path) -> bool:
+    try:
+        written = prompt_file.stat().st_mtime
+    except OSError:
+        return True
+    if time.time() - written > _ttl():
+        return True
+    for name in ("HEAD", "index"):
+        with suppress(OSError):
+            if (repository.git_dir / name).stat().st_mtime > written:
+                return True
+    return False
+
+
+def _refresh_in_background(repository: GitRepository) -> None:
+    try:
+        spawn_module("branchspace.prompt", str(repository.worktree), low_priority=True)
+    except OSError:
+        return
+
+
+def cached_segment(start: Path | None = None) -> str:
+    """Return the prompt segment for the worktree containing ``start``.
+
+    Returns an empty string outside a repository. Never blocks on git or
+    docker; stale segments trigger a background refresh.
+    """
+    repository = find_repository(start)
+    if repository is None:
+        return ""
+    prompt_file = repository.git_dir / PROMPT_FILENAME
+    if _is_stale(repository, prompt_file):
+        _refresh_in_background(repository)
+    try:
+        with prompt_file.open(encoding="utf-8") as handle:
+            return handle.readline().rstrip("\n")
+    except OSError:
+        label = _head_label(repository.git_dir)
+        return render_segment(WorktreeState(label, repository.worktree.name, None, None))
+
+
+def _probe_dirty(worktree: Path) -> bool | None:
+    served = query("status", worktree, timeout=GIT_TIMEOUT, path=str(worktree))
+    if isinstance(served, bool):
+        return served
+    try:
+        return has_uncommitted_changes_with_untracked(worktree, timeout=GIT_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _probe_container(name: str | None) -> bool | None:
+    if name is None:
+        return False
+    try:
+        result = subprocess.run(
+            ["docker", "inspect", "--format", "{{.State.Running}}", name],
+            capture_output=True,
+            text=True,
+            timeout=DOCKER_TIMEOUT,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    # A missing container is simply not running
+    return result.returncode == 0 and result.stdout.strip() == "true"
+
+
+def refresh_prompt(start: Path | None = None) -> WorktreeState | None:
+    """Recompute the current worktree's state and rewrite its prompt segment.
+
+    Concurrent refreshes of the same worktree collapse into one; the loser
+    returns None.
+    """
+    repository = find_repository(start)
+    if repository is None:
+        return None
+    git_dir = repository.git_dir
+    with file_lock(git_dir / f"{PROMPT_FILENAME}.lock", blocking=False) as acquired:
+        if not acquired:
+            return None
+        branch = _head_label(git_dir)
+        entries = read_index(repository.worktree) or {}
+        entry = entries.get(branch)
+        state = WorktreeState(
+            branch=branch,
+            worktree=repository.worktree.name,
+            dirty=_probe_dirty(repository.worktree),
+            container_running=_probe_container(entry.container if entry else None),
+        )
+        write_text_atomic(git_dir / PROMPT_FILENAME, render_segment(state) + "\n")
+
+    state_dir = repository.common_dir / STATE_DIRNAME
+    with suppress(OSError), file_lock(state_dir / STATUS_LOCK):
+        statuses = read_state(state_dir / STATUS_FILENAME) or {}
+        statuses[str(repository.worktree)] = {
+            "branch": state.branch,
+            "dirty": state.dirty,
+            "containerRunning": state.container_running,
+            "checked": time.time(),
+        }
+        write_state(state_dir / STATUS_FILENAME, statuses)
+    return state
+
+
+if __name__ == "__main__":
+    refresh_prompt(Path(sys.argv[1]))
@@ -10,6 +10,143 @@ from branchspace.console import info
 MARKER_START = "# >>> branchspace shell integration >>>"
 MARKER_END = "# <<< branchspace shell integration <<<"
 
+# `branchspace cd` fast paths. They find the repository's common git dir by
+# walking up for .git, then resolve the branch from the worktree index's
+# plain-text `paths` file using shell builtins only. A miss or a stale entry
+# returns non-zero so the caller falls back to `command branchspace cd`.
+POSIX_CD_FAST_PATH = r"""_branchspace_gitdir() {
+  # Sets the caller's $dir and $gitdir to the worktree containing $PWD
+  local line=""
+  dir="$PWD"
+  gitdir=""
+  while :; do
+    if [[ -d "$dir/.git" ]]; then
+      gitdir="$dir/.git"
+      return
+    elif [[ -f "$dir/.git" ]]; then
+      IFS= read -r line < "$dir/.git" || return 1
+      gitdir="${line#gitdir: }"
+      [[ "$gitdir" == /* ]] || gitdir="$dir/$gitdir"
+      return
+    fi
+    [[ -z "$dir" || "$dir" == / ]] && return 1
+    dir="${dir%/*}"
+  done
+}
+_branchspace_cd() {
+  local dir="" gitdir="" common="" line="" name="" wt_path=""
+  _branchspace_gitdir || return 1
+  if [[ $# -eq 0 ]]; then
+    cd -- "${dir:-/}"
+    return
+  fi
+  common="$gitdir"
+  if [[ -f "$gitdir/commondir" ]]; then
+    IFS= read -r line < "$gitdir/commondir"
+    if [[ "$line" == /* ]]; then common="$line"; else common="$gitdir/$line"; fi
+  fi
+  [[ -f "$common/branchspace/paths" ]] || return 1
+  while IFS=$'\t' read -r name wt_path; do
+    if [[ "$name" == "$1" ]]; then
+      [[ -e "$wt_path/.git" ]] || return 1
+      cd -- "$wt_path"
+      return
+    fi
+  done < "$common/branchspace/paths"
+  return 1
+}"""
+
+FISH_CD_FAST_PATH = r"""function __branchspace_gitdir
+    # Prints the worktree containing $PWD and its git dir, one per line
+    set -l dir $PWD
+    while true
+        if test -d "$dir/.git"
+            printf '%s\n' $dir "$dir/.git"
+            return
+        else if test -f "$dir/.git"
+            read -l line < "$dir/.git"; or return 1
+            set -l gitdir (string replace -r '^gitdir: ' '' -- $line)
+            string match -q '/*' -- $gitdir; or set gitdir "$dir/$gitdir"
+            printf '%s\n' $dir $gitdir
+            return
+        end
+        if test -z "$dir" -o "$dir" = /
+            return 1
+        end
+        set dir (string replace -r '/[^/]*$' '' -- $dir)
+    end
+end
+function __branchspace_cd
+    set -l found (__branchspace_gitdir); or return 1
+    set -l dir $found[1]
+    set -l gitdir $found[2]
+    if test (count $argv) -eq 0
+        cd "$dir/"
+        return
+    end
+    set -l common $gitdir
+    if test -f "$gitdir/commondir"
+        read -l line < "$gitdir/commondir"
+        if string match -q '/*' -- $line
+            set common $line
+        else
+            set common "$gitdir/$line"
+        end
+    end
+    test -f "$common/branchspace/paths"; or return 1
+    while read -l line
+        set -l fields (string split -m 1 \t -- $line)
+        if test "$fields[1]" = "$argv[1]"
+            test -e "$fields[2]/.git"; or return 1
+            cd "$fields[2]"
+            return
+        end
+    end < "$common/branchspace/paths"
+    return 1
+end"""
+
+
+# Prompt segment hooks. They read the segment `branchspace prompt --refresh`
+# caches next to the worktree's HEAD and start a detached refresh when it is
+# missing, older than HEAD or the git index, or after BRANCHSPACE_PROMPT_TTL
+# seconds. Only shell builtins run on the prompt path itself.
+POSIX_PROMPT = r"""_branchspace_prompt_update() {
+  local dir="" gitdir="" file=""
+  BRANCHSPACE_PROMPT=""
+  _branchspace_gitdir || return 0
+  file="$gitdir/branchspace-prompt"
+  [[ -f "$file" ]] && IFS= read -r BRANCHSPACE_PROMPT < "$file"
+  if [[ ! -f "$file" || "$gitdir/HEAD" -nt "$file" || "$gitdir/index" -nt "$file" ]] ||
+    (( SECONDS - ${_branchspace_prompt_at:-0} >= ${BRANCHSPACE_PROMPT_TTL:-10} )); then
+    _branchspace_prompt_at=$SECONDS
+    (command branchspace prompt --refresh >/dev/null 2>&1 &)
+  fi
+  return 0
+}"""
+
+FISH_PROMPT = r"""function branchspace_prompt
+    set -l found (__branchspace_gitdir); or return 0
+    set -l file "$found[2]/branchspace-prompt"
+    set -l ttl 10
+    set -q BRANCHSPACE_PROMPT_TTL; and set ttl $BRANCHSPACE_PROMPT_TTL
+    set -l stale 1
+    if test -f $file
+        read -l segment < $file
+        printf '%s' $segment
+        set -l written (path mtime $file)
+        set stale 0
+        test (path mtime --relative $file) -ge $ttl; and set stale 1
+        for name in HEAD index
+            set -l changed (path mtime "$found[2]/$name"); or continue
+            test $changed -gt $written; and set stale 1
+        end
+    end
+    if test $stale -eq 1
+        command branchspace prompt --refresh >/dev/null 2>&1 &
+        disown
+    end
+end"""
+
 
 @dataclass(frozen=True)
 class ShellIntegration:
@@ -30,12 +167,31 @@ def detect_shell_rc_files(home: Path | None = None) -> list[ShellIntegration]:
     return [candidate for candidate in candidates if candidate.rc_path.exists()]
 
 
+def _posix_completion_lines(shell: str) -> list[str]:
+    """Source the pre-generated completion script, generating it on the fly if missing."""
+    script = f"${{XDG_CONFIG_HOME:-$HOME/.config}}/branchspace/completions/branchspace.{shell}"
+    return [
+        f'_branchspace_completion_file="{script}"',
+        'if [[ -f "$_branchspace_completion_file" ]]; then',
+        '  source "$_branchspace_completion_file"',
+        "else",
+        f'  eval "$(_BRANCHSPACE_COMPLETE={shell}_source branchspace)"',
+        "fi",
+        "unset _branchspace_completion_file",
+    ]
+
+
 def build_bash_integration() -> str:
     """Return the bash shell integration snippet with completion."""
     lines = [
         MARKER_START,
+        POSIX_CD_FAST_PATH,
+        POSIX_PROMPT,
         "branchspace() {",
         '  if [[ "$1" == "cd" ]]; then',
+        '    if [[ $# -le 2 && "$2" != -* ]] && _branchspace_cd "${@:2}"; then',
+        "      return",
+        "    fi",
         '    local target=$(command branchspace cd "${@:2}")',
         '    if [[ -n "$target" ]]; then',
         '      cd "$target"',
@@ -44,7 +200,7 @@ def build_bash_integration() -> str:
         '    command branchspace "$@"',
         "  fi",
         "}",
-        'eval "$(_BRANCHSPACE_COMPLETE=bash_source branchspace)"',
+        *_posix_completion_lines("bash"),
         MARKER_END,
     ]
     return "\n".join(lines)
@@ -54,8 +210,13 @@ def build_zsh_integration() -> str:
     """Return the zsh shell integration snippet with completion."""
     lines = [
         MARKER_START,
+        POSIX_CD_FAST_PATH,
+        POSIX_PROMPT,
         "branchspace() {",
         '  if [[ "$1" == "cd" ]]; then',
+        '    if [[ $# -le 2 && "$2" != -* ]] && _branchspace_cd "${@:2}"; then',
+        "      return",
+        "    fi",
         '    local target=$(command branchspace cd "${@:2}")',
         '    if [[ -n "$target" ]]; then',
         '      cd "$target"',
@@ -64,7 +225,7 @@ def build_zsh_integration() -> str:
         '    command branchspace "$@"',
         "  fi",
         "}",
-        'eval "$(_BRANCHSPACE_COMPLETE=zsh_source branchspace)"',
+        *_posix_completion_lines("zsh"),
         MARKER_END,
     ]
     return "\n".join(lines)
@@ -74,8 +235,14 @@ def build_fish_integration() -> str:
     """Return the fish shell integration snippet with completion."""
     lines = [
         MARKER_START,
+        FISH_CD_FAST_PATH,
+        FISH_PROMPT,
         "function branchspace",
         '    if test (count $argv) -gt 0 && test $argv[1] = "cd"',
+        "        if test (count $argv) -le 2 && not string match -q -- '-*' \"$argv[2]\"",
+        "            and __branchspace_cd $argv[2..]",
+        "            return",
+        "        end",
         "        set target (command branchspace cd $argv[2..])",
         '        if test -n "$target"',
         "            cd $target",
@@ -84,7 +251,17 @@ def build_fish_integration() -> str:
         "        command branchspace $argv",
         "    end",
         "end",
-        "_BRANCHSPACE_COMPLETE=fish_source branchspace | source",
+        "if set -q XDG_CONFIG_HOME",
+        "    set -g __branchspace_completion $XDG_CONFIG_HOME/branchspace/completions/branchspace.fish",
+        "else",
+        "    set -g __branchspace_completion $HOME/.config/branchspace/completions/branchspace.fish",
+        "end",
+        "if test -f $__branchspace_completion",
+        "    source $__branchspace_completion",
+        "else",
+        "    _BRANCHSPACE_COMPLETE=fish_source branchspace | source",
+        "end",
+        "set -e __branchspace_completion",
         MARKER_END,
     ]
     return "\n".join(lines)
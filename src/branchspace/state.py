@@ -0,0 +1,105 @@
+"""On-disk state shared by branchspace commands.
+
+Per-repository state lives in a ``branchspace`` directory inside the common git
+directory so that every worktree of a repository sees the same files.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+from branchspace.git_utils import get_git_common_dir
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+STATE_DIRNAME = "branchspace"
+
+
+class StateError(RuntimeError):
+    """Raised when branchspace state cannot be located."""
+
+
+def get_state_dir(repo_root: Path | None = None) -> Path:
+    """Return the per-repository state directory, creating it if needed.
+
+    Args:
+        repo_root: Any path inside the repository. Defaults to current directory.
+
+    Raises:
+        StateError: If not inside a git repository.
+    """
+    common_dir = get_git_common_dir(repo_root)
+    if common_dir is None:
+        raise StateError("Not inside a git repository.")
+    state_dir = common_dir / STATE_DIRNAME
+    state_dir.mkdir(parents=True, exist_ok=True)
+    return state_dir
+
+
+def read_state(path: Path) -> dict[str, Any] | None:
+    """Read a JSON state file, returning None if missing or unreadable."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def write_bytes_atomic(path: Path, content: bytes) -> None:
+    """Write a file atomically so readers never observe a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(content)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_text_atomic(path: Path, content: str) -> None:
+    """Write a text file atomically so readers never observe a partial file."""
+    write_bytes_atomic(path, content.encode("utf-8"))
+
+
+def write_state(path: Path, data: dict[str, Any]) -> None:
+    """Write a JSON state file atomically."""
+    write_text_atomic(path, json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+@contextmanager
+def file_lock(path: Path, *, blocking: bool = True) -> Iterator[bool]:
+    """Hold an advisory lock on ``path`` for the duration of the block.
+
+    Yields False when ``blocking`` is off and another process holds the lock.
+    Platforms without ``fcntl`` get no cross-process locking.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield True
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as handle:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(handle, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
@@ -34,10 +34,14 @@ def normalize_template_variables(variables: Mapping[str, str]) -> dict[str, str]
     return normalized
 
 
+def find_template_variables(template: str) -> list[str]:
+    """Return the names of the variables ``template`` references, in order."""
+    return [match[1:] for match in _ANY_VARIABLE_PATTERN.findall(template)]
+
+
 def _substitute_string(template: str, variables: Mapping[str, str], strict: bool) -> str:
     if strict:
-        for match in _ANY_VARIABLE_PATTERN.findall(template):
-            name = match[1:]
+        for name in find_template_variables(template):
             if name not in variables:
                 raise TemplateVariableError(f"Unknown template variable: {name}")
 
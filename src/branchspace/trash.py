@@ -0,0 +1,151 @@
+"""Rename-to-trash worktree removal with a background reaper.
+
+Removing a worktree with ``git worktree remove`` unlinks every file before
+returning. Instead, a worktree is renamed into a trash directory on the same
+filesystem and its git admin entry is dropped, which is instant. A detached
+reaper process then deletes the trash at low priority. Trash directories are
+registered in the repository state so an interrupted reaper resumes on the
+next run.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from branchspace.background import spawn_module
+from branchspace.git_utils import worktree_admin_dir
+from branchspace.state import file_lock
+from branchspace.state import get_state_dir
+from branchspace.state import read_state
+from branchspace.state import write_state
+
+
+TRASH_DIRNAME = ".branchspace-trash"
+REGISTRY_FILENAME = "trash.json"
+REGISTRY_LOCK = "trash.lock"
+REAPER_LOCK = "reaper.lock"
+REAPER_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _registry_path(state_dir: Path) -> Path:
+    return state_dir / REGISTRY_FILENAME
+
+
+def registered_trash_dirs(state_dir: Path) -> list[Path]:
+    """Return the trash directories the reaper is responsible for."""
+    data = read_state(_registry_path(state_dir)) or {}
+    return [Path(item) for item in data.get("dirs", [])]
+
+
+def _write_registry(state_dir: Path, dirs: list[Path]) -> None:
+    write_state(_registry_path(state_dir), {"dirs": sorted({str(item) for item in dirs})})
+
+
+def _unique_name(path: Path) -> str:
+    return f"{path.name}-{uuid.uuid4().hex[:8]}"
+
+
+def move_to_trash(worktree_path: Path, repo_root: Path) -> Path | None:
+    """Move a worktree into trash and drop its git admin entry.
+
+    Returns the trash location, or None when the fast path does not apply
+    (locked worktree, missing gitfile, or a rename across filesystems) and the
+    caller should fall back to ``git worktree remove``.
+    """
+    admin_dir = worktree_admin_dir(worktree_path)
+    if admin_dir is None or (admin_dir / "locked").exists():
+        return None
+
+    state_dir = get_state_dir(repo_root)
+    worktree_trash = worktree_path.parent / TRASH_DIRNAME
+    admin_trash = state_dir / "trash"
+    trashed = worktree_trash / _unique_name(worktree_path)
+
+    with file_lock(state_dir / REGISTRY_LOCK):
+        try:
+            worktree_trash.mkdir(exist_ok=True)
+            os.rename(worktree_path, trashed)
+        except OSError:
+            return None
+        # Same effect as `git worktree prune` for this entry only
+        admin_trash.mkdir(exist_ok=True)
+        os.rename(admin_dir, admin_trash / _unique_name(admin_dir))
+        _write_registry(state_dir, [*registered_trash_dirs(state_dir), worktree_trash, admin_trash])
+    return trashed
+
+
+def start_reaper(repo_root: Path) -> None:
+    """Start a detached, low-priority reaper for the repository's trash."""
+    spawn_module("branchspace.trash", str(get_state_dir(repo_root)), low_priority=True)
+
+
+def _delete(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _trash_items(state_dir: Path) -> set[Path]:
+    return {
+        item
+        for trash_dir in registered_trash_dirs(state_dir)
+        if trash_dir.is_dir()
+        for item in trash_dir.iterdir()
+    }
+
+
+def reap_trash(state_dir: Path) -> None:
+    """Delete everything in the registered trash directories.
+
+    Only one reaper runs per repository; a second one exits immediately, so
+    before exiting the registry is re-read under its lock and anything
+    trashed in the meantime is deleted too. Top-level entries of each trashed
+    worktree are deleted in parallel. Entries that survive a pass are left
+    for the next run.
+    """
+    with file_lock(state_dir / REAPER_LOCK, blocking=False) as acquired:
+        if not acquired:
+            return
+
+        undeletable: set[Path] = set()
+        while True:
+            items = _trash_items(state_dir) - undeletable
+            if items:
+                entries = [
+                    entry
+                    for item in items
+                    for entry in (
+                        item.iterdir() if item.is_dir() and not item.is_symlink() else [item]
+                    )
+                ]
+                with ThreadPoolExecutor(max_workers=REAPER_WORKERS) as pool:
+                    list(pool.map(_delete, entries))
+                for item in items:
+                    _delete(item)
+                undeletable |= {item for item in items if os.path.lexists(item)}
+                continue
+
+            with file_lock(state_dir / REGISTRY_LOCK):
+                if _trash_items(state_dir) - undeletable:
+                    continue
+                remaining: list[Path] = []
+                for trash_dir in registered_trash_dirs(state_dir):
+                    try:
+                        trash_dir.rmdir()
+                    except FileNotFoundError:
+                        continue
+                    except OSError:
+                        remaining.append(trash_dir)
+                _write_registry(state_dir, remaining)
+            return
+
+
+if __name__ == "__main__":
+    reap_trash(Path(sys.argv[1]))
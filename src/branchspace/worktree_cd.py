@@ -1,10 +1,23 @@
 """Worktree path resolution for `branchspace cd`."""
 
+from __future__ import annotations
+
 from dataclasses import dataclass
 from pathlib import Path
 
-from branchspace.config import get_git_root
+from branchspace.daemon_client import query
+from branchspace.fuzzy import Chooser
+from branchspace.fuzzy import FuzzyIndex
+from branchspace.fuzzy import resolve_match
+from branchspace.git_utils import GitRepository
+from branchspace.git_utils import find_repository
+from branchspace.git_utils import get_git_root
+from branchspace.git_utils import holds_branch
 from branchspace.git_utils import list_worktrees
+from branchspace.git_utils import read_head_branch
+from branchspace.worktree_index import accessed_times
+from branchspace.worktree_index import lookup_worktree
+from branchspace.worktree_index import touch_worktree
 
 
 class WorktreeLookupError(RuntimeError):
@@ -19,8 +32,96 @@ class WorktreePath:
     path: Path
 
 
-def resolve_worktree_path(branch: str | None, repo_root: Path | None = None) -> WorktreePath:
-    """Resolve a worktree path for a branch or git root when branch is None."""
+def _predicted_paths(branch: str, repository: GitRepository) -> list[Path]:
+    """Return the paths the configured template could have given ``branch``."""
+    # Imported lazily: prediction only runs when the index has no entry
+    from branchspace.config_snapshot import ConfigError
+    from branchspace.config_snapshot import find_config_file
+    from branchspace.config_snapshot import load_snapshot
+    from branchspace.template import TemplateVariableError
+    from branchspace.worktree_placement import get_placement
+    from branchspace.worktree_placement import resolve_roots
+
+    main_root = repository.common_dir.parent
+    try:
+        # A current snapshot answers without importing pydantic
+        config = load_snapshot(find_config_file(repository.worktree), repository.worktree)
+    except ConfigError:
+        return []
+
+    placement = get_placement(main_root, branch)
+    placement_roots: list[Path | None] = (
+        [placement] if placement else [*resolve_roots(config, main_root), None]
+    )
+    # Worktrees are named after the worktree create ran in, usually the main one
+    repo_roots = dict.fromkeys([repository.worktree, main_root])
+    source_branch = read_head_branch(repository.git_dir) or ""
+
+    candidates: list[Path] = []
+    for repo_root in repo_roots:
+        for placement_root in placement_roots:
+            try:
+                path = config.worktree_path(branch, repo_root, source_branch, placement_root)
+            except TemplateVariableError:
+                return []
+            if path not in candidates:
+                candidates.append(path)
+    return candidates
+
+
+def predict_worktree_path(branch: str, repo_root: Path | None = None) -> Path | None:
+    """Resolve ``branch`` by predicting its path instead of asking git.
+
+    The main worktree is matched by its HEAD; linked worktrees are matched by
+    computing the templated path and verifying it with a gitfile back-reference
+    and HEAD check. Returns None when no prediction verifies.
+    """
+    repository = find_repository(repo_root)
+    if repository is None:
+        return None
+
+    main_root = repository.common_dir.parent
+    if (
+        repository.common_dir == main_root / ".git"
+        and read_head_branch(repository.common_dir) == branch
+    ):
+        return main_root
+
+    for path in _predicted_paths(branch, repository):
+        if holds_branch(path, branch, repository.common_dir):
+            return path
+    return None
+
+
+def resolve_worktree_path(
+    branch: str | None,
+    repo_root: Path | None = None,
+    *,
+    choose: Chooser | None = None,
+) -> WorktreePath:
+    """Resolve a worktree path for a branch or git root when branch is None.
+
+    Branches are looked up through the daemon when one is running, then in the
+    worktree index, then at the path the configured template predicts; git is
+    only consulted when none of these answers. A name that matches no branch
+    exactly is fuzzy-matched against the worktree branches, and ``choose`` is
+    asked to pick when several match equally well.
+    """
+    if branch is not None:
+        served = query("resolve", repo_root, branch=branch)
+        if isinstance(served, str):
+            touch_worktree(branch, repo_root)
+            return WorktreePath(branch=branch, path=Path(served))
+
+        indexed = lookup_worktree(branch, repo_root)
+        if indexed is not None:
+            touch_worktree(branch, repo_root)
+            return WorktreePath(branch=branch, path=indexed)
+
+        predicted = predict_worktree_path(branch, repo_root)
+        if predicted is not None:
+            return WorktreePath(branch=branch, path=predicted)
+
     root = get_git_root(repo_root)
     if root is None:
         raise WorktreeLookupError("Not inside a git repository.")
@@ -28,8 +129,18 @@ def resolve_worktree_path(branch: str | None, repo_root: Path | None = None) ->
     if branch is None:
         return WorktreePath(branch=None, path=root)
 
-    for worktree in list_worktrees(root):
+    worktrees = list_worktrees(root)
+    for worktree in worktrees:
         if worktree.branch == branch:
             return WorktreePath(branch=branch, path=worktree.path)
 
-    raise WorktreeLookupError(f"No worktree found for branch '{branch}'.")
+    paths = {wt.branch: wt.path for wt in worktrees if not wt.detached}
+    index = FuzzyIndex(paths, accessed_times(root))
+    matched = resolve_match(branch, index, choose)
+    if matched is not None:
+        touch_worktree(matched, root)
+        return WorktreePath(branch=matched, path=paths[matched])
+
+    suggestions = [match.name for match in index.rank(branch, limit=5)]
+    hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+    raise WorktreeLookupError(f"No worktree found for branch '{branch}'.{hint}")
@@ -1,20 +1,40 @@
 """Worktree creation logic for branchspace."""
 
 import glob
+import os
 import subprocess
 
 from collections.abc import Iterable
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
 from branchspace.config import BranchspaceConfig
 from branchspace.config import TemplateContext
-from branchspace.config import get_git_root
 from branchspace.git_utils import create_worktree as git_create_worktree
+from branchspace.git_utils import delete_branches
 from branchspace.git_utils import get_current_branch
+from branchspace.git_utils import get_git_root
+from branchspace.git_utils import list_branch_names
+from branchspace.git_utils import remove_worktree as git_remove_worktree
+from branchspace.journal import PHASE_COPY
+from branchspace.journal import PHASE_POST_CREATE
+from branchspace.journal import PHASE_TERMINAL
+from branchspace.journal import PHASE_WORKTREE
+from branchspace.journal import JournalEntry
+from branchspace.journal import OperationJournal
 from branchspace.template import TemplateVariableError
 from branchspace.template import substitute_template
+from branchspace.worktree_index import forget_worktrees
+from branchspace.worktree_index import record_worktree
+from branchspace.worktree_placement import choose_root
+from branchspace.worktree_placement import record_placement
+
+
+CREATE_OPERATION = "create"
+CREATE_PHASES = (PHASE_WORKTREE, PHASE_COPY, PHASE_POST_CREATE, PHASE_TERMINAL)
+MAX_WORKERS = min(8, os.cpu_count() or 1)
 
 
 class CreateWorktreeError(RuntimeError):
@@ -37,6 +57,10 @@ def _ensure_git_root(repo_root: Path | None) -> Path:
     return repo_root
 
 
+def _is_worktree(path: Path) -> bool:
+    return (path / ".git").is_file()
+
+
 def _resolve_worktree_path(
     template: str,
     base_path: str,
@@ -44,6 +68,7 @@ def _resolve_worktree_path(
     source_branch: str,
     project_name: str,
     repo_root: Path,
+    placement_root: Path | None = None,
 ) -> Path:
     if "$WORKTREE_PATH" in template:
         raise CreateWorktreeError("worktreePathTemplate cannot reference $WORKTREE_PATH.")
@@ -58,10 +83,33 @@ def _resolve_worktree_path(
     resolved = substitute_template(template, context.as_mapping())
     path = Path(resolved)
     if not path.is_absolute():
-        path = repo_root / path
+        path = (placement_root or repo_root) / path
     return path
 
 
+def expected_worktree_path(
+    branch: str,
+    config: BranchspaceConfig,
+    repo_root: Path,
+    source_branch: str,
+    placement_root: Path | None = None,
+) -> Path:
+    """Return the path the configured template gives a branch's worktree."""
+    base_path = repo_root.name
+    try:
+        return _resolve_worktree_path(
+            config.worktree_path_template,
+            base_path,
+            branch,
+            source_branch,
+            config.project_name or base_path,
+            repo_root,
+            placement_root,
+        )
+    except TemplateVariableError as exc:
+        raise CreateWorktreeError(str(exc)) from exc
+
+
 def _is_ignored(relative_path: Path, ignore_patterns: Sequence[str]) -> bool:
     path = relative_path.as_posix()
     for pattern in ignore_patterns:
@@ -124,50 +172,75 @@ def create_worktree_for_branch(
     repo_root: Path | None = None,
     *,
     open_terminal: bool = True,
+    journal: OperationJournal | None = None,
 ) -> CreatedWorktree:
     repo_root = _ensure_git_root(repo_root)
     base_path = repo_root.name
-    source_branch = get_current_branch(repo_root)
+    project_name = config.project_name or base_path
+
+    def done(phase: str) -> bool:
+        return journal is not None and journal.is_done(branch, phase)
+
+    def checkpoint(phase: str) -> None:
+        if journal is not None:
+            journal.checkpoint(branch, phase)
+
+    entry = journal.entry(branch) if journal is not None and branch in journal.branches else None
+    source_branch = entry.source_branch if entry is not None else None
+    if source_branch is None:
+        source_branch = get_current_branch(repo_root)
     if source_branch is None:
         raise CreateWorktreeError("Cannot determine current branch.")
 
-    try:
-        worktree_path = _resolve_worktree_path(
-            config.worktree_path_template,
-            base_path,
-            branch,
-            source_branch,
-            config.project_name or base_path,
-            repo_root,
+    resuming = False
+    placement_root: Path | None = None
+    if entry is not None and entry.path is not None:
+        worktree_path = entry.path
+        resuming = True
+    else:
+        placement_root = choose_root(branch, config, repo_root)
+        worktree_path = expected_worktree_path(
+            branch, config, repo_root, source_branch, placement_root
         )
-    except TemplateVariableError as exc:
-        raise CreateWorktreeError(str(exc)) from exc
 
-    git_create_worktree(worktree_path, branch, repository_path=repo_root)
+    if journal is not None:
+        journal.record(branch, path=worktree_path, source_branch=source_branch)
+
+    # A crash between `git worktree add` and the checkpoint leaves a finished worktree
+    if not done(PHASE_WORKTREE) and not (resuming and _is_worktree(worktree_path)):
+        git_create_worktree(worktree_path, branch, repository_path=repo_root)
+    checkpoint(PHASE_WORKTREE)
+    record_worktree(repo_root, branch, worktree_path, source_branch=source_branch)
+    if placement_root is not None and placement_root in worktree_path.parents:
+        record_placement(repo_root, branch, placement_root)
 
     context = TemplateContext(
         base_path=base_path,
         worktree_path=str(worktree_path),
         branch_name=branch,
         source_branch=source_branch,
-        project_name=config.project_name or base_path,
+        project_name=project_name,
     )
     variables = context.as_mapping()
 
-    copy_worktree_files(
-        repo_root,
-        worktree_path,
-        config.worktree_copy_patterns,
-        config.worktree_copy_ignores,
-    )
+    if not done(PHASE_COPY):
+        copy_worktree_files(
+            repo_root,
+            worktree_path,
+            config.worktree_copy_patterns,
+            config.worktree_copy_ignores,
+        )
+        checkpoint(PHASE_COPY)
 
-    if config.post_create_cmd:
+    if config.post_create_cmd and not done(PHASE_POST_CREATE):
         commands = substitute_template(config.post_create_cmd, variables)
         run_post_create_commands(commands, worktree_path)
+    checkpoint(PHASE_POST_CREATE)
 
-    if open_terminal and config.terminal_command:
+    if open_terminal and config.terminal_command and not done(PHASE_TERMINAL):
         terminal_command = substitute_template(config.terminal_command, variables)
         run_terminal_command(terminal_command, worktree_path)
+    checkpoint(PHASE_TERMINAL)
 
     return CreatedWorktree(branch=branch, path=worktree_path)
 
@@ -178,13 +251,86 @@ def create_worktrees(
     repo_root: Path | None = None,
     *,
     open_terminal: bool = True,
+    resume: bool = False,
 ) -> list[CreatedWorktree]:
-    return [
-        create_worktree_for_branch(
-            branch,
-            config,
-            repo_root=repo_root,
-            open_terminal=open_terminal,
-        )
-        for branch in branches
+    """Create worktrees for a batch of branches, journaling each phase.
+
+    With ``resume``, the pending journal's branches are finished first and any
+    phase already recorded as complete is skipped.
+    """
+    repo_root = _ensure_git_root(repo_root)
+    journal = OperationJournal.load(repo_root, CREATE_OPERATION)
+
+    if resume:
+        if journal is None:
+            raise CreateWorktreeError("No interrupted create to resume.")
+        journal.add_branches(branches)
+    else:
+        if journal is not None:
+            pending = ", ".join(journal.branches)
+            raise CreateWorktreeError(
+                f"An interrupted create is pending for: {pending}. "
+                "Rerun with --resume or --rollback."
+            )
+        journal = OperationJournal.start(repo_root, CREATE_OPERATION, branches)
+
+    results: list[CreatedWorktree] = []
+    for branch in journal.branches:
+        try:
+            created = create_worktree_for_branch(
+                branch,
+                config,
+                repo_root=repo_root,
+                open_terminal=open_terminal,
+                journal=journal,
+            )
+        except CreateWorktreeError:
+            journal.forget_if_untouched(branch)
+            raise
+        results.append(created)
+    journal.discard()
+    return results
+
+
+def _rollback_entry(entry: JournalEntry, repo_root: Path) -> CreatedWorktree | None:
+    if entry.path is None:
+        return None
+    if _is_worktree(entry.path):
+        git_remove_worktree(entry.path, force=True, repository_path=repo_root)
+    elif not entry.phases:
+        return None
+    return CreatedWorktree(branch=entry.branch, path=entry.path)
+
+
+def rollback_worktrees(repo_root: Path | None = None) -> list[CreatedWorktree]:
+    """Undo the unfinished part of an interrupted create batch.
+
+    Worktrees of incomplete branches are removed in parallel, then those of
+    their branches that still exist are deleted in one git call. Completed
+    branches are kept. The journal is discarded even if deletion fails, so a
+    failed rollback is not repeated by every later one.
+    """
+    repo_root = _ensure_git_root(repo_root)
+    journal = OperationJournal.load(repo_root, CREATE_OPERATION)
+    if journal is None:
+        raise CreateWorktreeError("No interrupted create to roll back.")
+
+    incomplete = [
+        journal.entry(branch)
+        for branch in journal.branches
+        if not journal.is_complete(branch, CREATE_PHASES)
     ]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        undone = list(pool.map(lambda entry: _rollback_entry(entry, repo_root), incomplete))
+
+    rolled_back = [item for item in undone if item is not None]
+    try:
+        existing = set(list_branch_names(repo_root, remotes=False))
+        delete_branches(
+            [item.branch for item in rolled_back if item.branch in existing],
+            repository_path=repo_root,
+        )
+        forget_worktrees(repo_root, [item.branch for item in rolled_back])
+    finally:
+        journal.discard()
+    return rolled_back
@@ -0,0 +1,326 @@
+"""Persistent index of a repository's worktrees.
+
+The index lives in the branchspace state directory and maps each branch to
+its worktree path, creation and last-access times and container name. It is
+updated by ``create``, ``rm`` and ``mv``, reconciled by an optional
+``post-checkout`` hook for worktrees made with plain ``git worktree add``, and
+rebuilt from scratch by ``branchspace reindex``. Worktrees with a detached
+HEAD have no branch to key them by and are kept in a separate list of paths.
+Read paths (``cd``, completion and ``ls``) consult it instead of spawning git
+and fall back to ``git worktree list`` when it has not been built yet or an
+entry no longer matches the worktree on disk, as after a plain
+``git worktree remove``.
+
+Every write also refreshes ``paths``, a tab-separated ``branch<TAB>path``
+copy of the mapping that the shell integration reads with builtins alone.
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+from branchspace.git_utils import GitWorktree
+from branchspace.git_utils import get_git_common_dir
+from branchspace.git_utils import get_hooks_dir
+from branchspace.git_utils import holds_branch
+from branchspace.git_utils import list_worktrees
+from branchspace.state import STATE_DIRNAME
+from branchspace.state import StateError
+from branchspace.state import file_lock
+from branchspace.state import get_state_dir
+from branchspace.state import read_state
+from branchspace.state import write_state
+from branchspace.state import write_text_atomic
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+
+INDEX_FILENAME = "index.json"
+PATHS_FILENAME = "paths"
+INDEX_LOCK = "index.lock"
+INDEX_VERSION = 1
+
+HOOK_NAME = "post-checkout"
+HOOK_MARKER_START = "# >>> branchspace index >>>"
+HOOK_MARKER_END = "# <<< branchspace index <<<"
+# Branch checkouts ($3 = 1) cover both `git worktree add` and switching branches
+# inside a worktree, which change the branch -> path mapping. The refresh is
+# detached so checkout never waits on it.
+HOOK_SNIPPET = f"""{HOOK_MARKER_START}
+if [ "$3" = "1" ] && command -v branchspace >/dev/null 2>&1; then
+  (branchspace reindex --quiet >/dev/null 2>&1 &)
+fi
+{HOOK_MARKER_END}
+"""
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """Indexed state for one worktree."""
+
+    branch: str
+    path: Path
+    created: float
+    accessed: float
+    container: str | None = None
+    source_branch: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "created": self.created,
+            "accessed": self.accessed,
+            "container": self.container,
+            "sourceBranch": self.source_branch,
+        }
+
+    @classmethod
+    def from_dict(cls, branch: str, data: dict[str, Any]) -> IndexEntry:
+        return cls(
+            branch=branch,
+            path=Path(data["path"]),
+            created=float(data.get("created", 0.0)),
+            accessed=float(data.get("accessed", 0.0)),
+            container=data.get("container"),
+            source_branch=data.get("sourceBranch"),
+        )
+
+
+def _container_name(branch: str, path: Path) -> str:
+    # Imported lazily: docker_shell pulls in the config models
+    from branchspace.docker_shell import build_container_name
+
+    return build_container_name(branch, path)
+
+
+def _new_entry(branch: str, path: Path, *, source_branch: str | None = None) -> IndexEntry:
+    now = time.time()
+    return IndexEntry(
+        branch=branch,
+        path=path,
+        created=now,
+        accessed=now,
+        container=_container_name(branch, path),
+        source_branch=source_branch,
+    )
+
+
+@dataclass(frozen=True)
+class _Index:
+    common_dir: Path
+    entries: dict[str, IndexEntry]
+    detached: list[Path]
+
+
+def _load_index(repo_root: Path | None) -> _Index | None:
+    # Locating the index does not fork git in the common case, and the file is
+    # replaced atomically, so readers need no lock
+    common_dir = get_git_common_dir(repo_root)
+    if common_dir is None:
+        return None
+    data = read_state(common_dir / STATE_DIRNAME / INDEX_FILENAME)
+    if data is None or data.get("version") != INDEX_VERSION:
+        return None
+    entries = {
+        branch: IndexEntry.from_dict(branch, item)
+        for branch, item in data.get("worktrees", {}).items()
+    }
+    detached = [Path(path) for path in data.get("detached", [])]
+    return _Index(common_dir, entries, detached)
+
+
+def read_index(repo_root: Path | None = None) -> dict[str, IndexEntry] | None:
+    """Return the indexed worktrees by branch, or None if the index has not been built."""
+    index = _load_index(repo_root)
+    return index.entries if index is not None else None
+
+
+def indexed_worktrees(repo_root: Path | None = None) -> list[GitWorktree] | None:
+    """Return indexed worktrees shaped like ``list_worktrees`` output.
+
+    Every entry is checked against the worktree on disk without running git;
+    returns None when the index has not been built or is out of date, so the
+    caller asks git instead.
+    """
+    index = _load_index(repo_root)
+    if index is None:
+        return None
+    worktrees = [
+        GitWorktree(path=entry.path, branch=entry.branch, committed=True, detached=False)
+        for entry in index.entries.values()
+    ]
+    worktrees += [
+        GitWorktree(path=path, branch="HEAD", committed=True, detached=True)
+        for path in index.detached
+    ]
+    for worktree in worktrees:
+        branch = None if worktree.detached else worktree.branch
+        if not holds_branch(worktree.path, branch, index.common_dir):
+            return None
+    return worktrees
+
+
+def lookup_worktree(branch: str, repo_root: Path | None = None) -> Path | None:
+    """Return the indexed path for ``branch`` if it still holds that branch's worktree."""
+    index = _load_index(repo_root)
+    if index is None:
+        return None
+    entry = index.entries.get(branch)
+    if entry is None or not holds_branch(entry.path, branch, index.common_dir):
+        return None
+    return entry.path
+
+
+def accessed_times(repo_root: Path | None = None) -> dict[str, float]:
+    """Return the last access time of every indexed branch, or nothing without an index."""
+    entries = read_index(repo_root) or {}
+    return {branch: entry.accessed for branch, entry in entries.items()}
+
+
+def _scan(
+    repo_root: Path, previous: dict[str, IndexEntry]
+) -> tuple[dict[str, IndexEntry], list[Path]]:
+    entries: dict[str, IndexEntry] = {}
+    detached: list[Path] = []
+    for worktree in list_worktrees(repo_root):
+        if worktree.detached:
+            detached.append(worktree.path)
+            continue
+        existing = previous.get(worktree.branch)
+        if existing is not None:
+            entries[worktree.branch] = replace(
+                existing,
+                path=worktree.path,
+                container=_container_name(worktree.branch, worktree.path),
+            )
+        else:
+            entries[worktree.branch] = _new_entry(worktree.branch, worktree.path)
+    return entries, detached
+
+
+def _render_paths(entries: dict[str, IndexEntry]) -> str:
+    # Paths containing newlines cannot be read line by line; leave them to git
+    lines = [
+        f"{branch}\t{entry.path}\n"
+        for branch, entry in sorted(entries.items())
+        if "\n" not in str(entry.path)
+    ]
+    return "".join(lines)
+
+
+def _write_index(state_dir: Path, entries: dict[str, IndexEntry], detached: list[Path]) -> None:
+    write_state(
+        state_dir / INDEX_FILENAME,
+        {
+            "version": INDEX_VERSION,
+            "worktrees": {branch: entry.to_dict() for branch, entry in entries.items()},
+            "detached": [str(path) for path in detached],
+        },
+    )
+    write_text_atomic(state_dir / PATHS_FILENAME, _render_paths(entries))
+
+
+@contextmanager
+def update_index(repo_root: Path) -> Iterator[dict[str, IndexEntry]]:
+    """Lock the index and yield its entries for editing in place.
+
+    The edited entries are written back when the block exits normally; an
+    exception leaves the index untouched. A missing index is seeded from
+    ``git worktree list`` first so it always covers every worktree.
+    """
+    state_dir = get_state_dir(repo_root)
+    with file_lock(state_dir / INDEX_LOCK):
+        index = _load_index(repo_root)
+        if index is None:
+            entries, detached = _scan(repo_root, {})
+        else:
+            entries, detached = index.entries, index.detached
+        yield entries
+        _write_index(state_dir, entries, detached)
+
+
+def record_worktree(
+    repo_root: Path, branch: str, path: Path, *, source_branch: str | None = None
+) -> None:
+    """Add or update the index entry for a worktree created or moved by branchspace."""
+    with update_index(repo_root) as entries:
+        existing = entries.get(branch)
+        if existing is not None:
+            entries[branch] = replace(
+                existing, path=path, source_branch=source_branch or existing.source_branch
+            )
+        else:
+            entries[branch] = _new_entry(branch, path, source_branch=source_branch)
+
+
+def forget_worktrees(repo_root: Path, branches: Iterable[str]) -> None:
+    """Drop index entries for removed worktrees."""
+    branches = list(branches)
+    if not branches:
+        return
+    with update_index(repo_root) as entries:
+        for branch in branches:
+            entries.pop(branch, None)
+
+
+def touch_worktree(branch: str, repo_root: Path | None = None) -> None:
+    """Record an access to ``branch``; failures are ignored."""
+    try:
+        state_dir = get_state_dir(repo_root)
+        with file_lock(state_dir / INDEX_LOCK):
+            index = _load_index(repo_root)
+            if index is None or branch not in index.entries:
+                return
+            entries = index.entries
+            entries[branch] = replace(entries[branch], accessed=time.time())
+            _write_index(state_dir, entries, index.detached)
+    except (OSError, StateError):
+        return
+
+
+def rebuild_index(repo_root: Path) -> dict[str, IndexEntry]:
+    """Rebuild the index from ``git worktree list``.
+
+    Timestamps and container names of worktrees that are still present are
+    kept; entries for worktrees that no longer exist are dropped.
+    """
+    state_dir = get_state_dir(repo_root)
+    with file_lock(state_dir / INDEX_LOCK):
+        entries, detached = _scan(repo_root, read_index(repo_root) or {})
+        _write_index(state_dir, entries, detached)
+    return entries
+
+
+def install_post_checkout_hook(repo_root: Path) -> Path | None:
+    """Install the index-refresh snippet into the repository's post-checkout hook.
+
+    Existing hooks are preserved and the snippet is appended once. Returns the
+    hook path, or None if the snippet was already present.
+    """
+    hooks_dir = get_hooks_dir(repo_root)
+    hook_path = hooks_dir / HOOK_NAME
+
+    existing = hook_path.read_text(encoding="utf-8") if hook_path.exists() else ""
+    if HOOK_MARKER_START in existing:
+        return None
+
+    content = existing or "#!/bin/sh\n"
+    if not content.endswith("\n"):
+        content += "\n"
+    hooks_dir.mkdir(parents=True, exist_ok=True)
+    hook_path.write_text(f"{content}\n{HOOK_SNIPPET}", encoding="utf-8")
+    mode = os.stat(hook_path).st_mode
+    os.chmod(hook_path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return hook_path
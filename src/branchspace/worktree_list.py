@@ -5,9 +5,11 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from branchspace.console import build_worktree_table as build_rich_worktree_table
+from branchspace.daemon_client import query
 from branchspace.git_utils import GitWorktree
 from branchspace.git_utils import has_uncommitted_changes_with_untracked
 from branchspace.git_utils import list_worktrees
+from branchspace.worktree_index import indexed_worktrees
 
 
 @dataclass(frozen=True)
@@ -27,8 +29,43 @@ def _resolve_current_worktree_path(worktrees: Iterable[GitWorktree]) -> Path | N
     return None
 
 
+# Dirty checks over many worktrees can take a while on a cold daemon
+DAEMON_STATUS_TIMEOUT = 10.0
+
+
+def _served_statuses(repository_path: Path | None) -> list[WorktreeStatus] | None:
+    served = query("statuses", repository_path, timeout=DAEMON_STATUS_TIMEOUT)
+    if not isinstance(served, list):
+        return None
+    worktrees = [
+        GitWorktree(
+            path=Path(item["path"]),
+            branch=item["branch"],
+            committed=True,
+            detached=item["detached"],
+        )
+        for item in served
+    ]
+    current_path = _resolve_current_worktree_path(worktrees)
+    statuses = [
+        WorktreeStatus(
+            branch=item["branch"],
+            path=worktree.path,
+            is_current=current_path is not None and worktree.path.resolve() == current_path,
+            is_dirty=bool(item["dirty"]),
+        )
+        for worktree, item in zip(worktrees, served)
+    ]
+    return sorted(statuses, key=lambda item: item.path.as_posix())
+
+
 def list_worktree_statuses(repository_path: Path | None = None) -> list[WorktreeStatus]:
-    worktrees = list_worktrees(repository_path)
+    served = _served_statuses(repository_path)
+    if served is not None:
+        return served
+    worktrees = indexed_worktrees(repository_path)
+    if worktrees is None:
+        worktrees = list_worktrees(repository_path)
     current_path = _resolve_current_worktree_path(worktrees)
     statuses: list[WorktreeStatus] = []
     for worktree in worktrees:
@@ -0,0 +1,176 @@
+"""Bulk worktree relocation for `branchspace mv`."""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from branchspace.git_utils import get_current_branch
+from branchspace.git_utils import get_git_root
+from branchspace.git_utils import list_worktrees
+from branchspace.git_utils import repair_worktrees
+from branchspace.worktree_create import MAX_WORKERS
+from branchspace.worktree_create import expected_worktree_path
+from branchspace.worktree_index import read_index
+from branchspace.worktree_index import record_worktree
+from branchspace.worktree_placement import advance_cursor
+from branchspace.worktree_placement import choose_root
+from branchspace.worktree_placement import get_placement
+from branchspace.worktree_placement import record_placement
+from branchspace.worktree_placement import resolve_roots
+
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+    from branchspace.config import BranchspaceConfig
+
+
+class WorktreeMoveError(RuntimeError):
+    """Raised when worktrees cannot be relocated."""
+
+
+@dataclass(frozen=True)
+class WorktreeMove:
+    """A planned or completed worktree relocation."""
+
+    branch: str
+    source: Path
+    destination: Path
+    placement_root: Path | None = None
+    # Whether placement_root was newly chosen rather than recorded
+    chosen: bool = False
+
+
+def _ensure_git_root(repo_root: Path | None) -> Path:
+    root = get_git_root(repo_root)
+    if root is None:
+        raise WorktreeMoveError("Not inside a git repository.")
+    return root
+
+
+def plan_moves(
+    branches: Sequence[str],
+    config: BranchspaceConfig,
+    repo_root: Path | None = None,
+) -> list[WorktreeMove]:
+    """Plan moves for worktrees that are not at their templated path.
+
+    An empty ``branches`` selects every linked worktree on a branch. Planning
+    changes no state: roots picked for unplaced worktrees are only claimed
+    from the round-robin cursor when the moves are made.
+    ``$SOURCE_BRANCH`` is the branch each worktree was created from, as
+    recorded in the index, falling back to the current branch.
+    """
+    root = _ensure_git_root(repo_root)
+
+    # The first entry is always the main worktree, which never moves
+    linked = [wt for wt in list_worktrees(root)[1:] if not wt.detached]
+    by_branch = {wt.branch: wt for wt in linked}
+    missing = [branch for branch in branches if branch not in by_branch]
+    if missing:
+        raise WorktreeMoveError(f"No worktree found for branch '{missing[0]}'.")
+
+    selected = [by_branch[branch] for branch in branches] if branches else linked
+    entries = read_index(root) or {}
+    current_branch = get_current_branch(root)
+    roots = resolve_roots(config, root)
+    moves: list[WorktreeMove] = []
+    for worktree in selected:
+        entry = entries.get(worktree.branch)
+        source_branch = (entry.source_branch if entry else None) or current_branch
+        if source_branch is None:
+            raise WorktreeMoveError("Cannot determine current branch.")
+        current = worktree.path.resolve()
+        placement_root = get_placement(root, worktree.branch)
+        if placement_root not in roots:
+            placement_root = None
+        chosen = False
+        if placement_root is None and roots:
+            # Unrecorded worktrees already at any root's templated path stay put
+            candidates = {
+                expected_worktree_path(worktree.branch, config, root, source_branch, candidate)
+                for candidate in roots
+            }
+            if current in {path.resolve() for path in candidates}:
+                continue
+            claimed = sum(move.chosen for move in moves)
+            placement_root = choose_root(
+                worktree.branch, config, root, offset=claimed, advance=False
+            )
+            chosen = True
+        destination = expected_worktree_path(
+            worktree.branch, config, root, source_branch, placement_root
+        )
+        if destination.resolve() == current:
+            continue
+        moves.append(
+            WorktreeMove(
+                branch=worktree.branch,
+                source=worktree.path,
+                destination=destination,
+                placement_root=placement_root,
+                chosen=chosen,
+            )
+        )
+    return moves
+
+
+def _relocate(move: WorktreeMove) -> WorktreeMove:
+    if move.destination.exists():
+        raise WorktreeMoveError(f"Destination already exists: {move.destination}")
+    move.destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.rename(move.source, move.destination)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        # Different filesystem: copy, then drop the original
+        shutil.copytree(move.source, move.destination, symlinks=True)
+        shutil.rmtree(move.source)
+    return move
+
+
+def move_worktrees(
+    branches: Sequence[str],
+    config: BranchspaceConfig,
+    repo_root: Path | None = None,
+    *,
+    dry_run: bool = False,
+) -> list[WorktreeMove]:
+    """Relocate worktrees to their templated paths in parallel.
+
+    Worktrees are renamed in place (copied across devices) and git's
+    administrative links are fixed afterwards with a single repair.
+    """
+    root = _ensure_git_root(repo_root)
+    moves = plan_moves(branches, config, root)
+    if dry_run or not moves:
+        return moves
+
+    moved: list[WorktreeMove] = []
+    failures: list[str] = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = [(move, pool.submit(_relocate, move)) for move in moves]
+        for move, future in futures:
+            try:
+                moved.append(future.result())
+            except (OSError, WorktreeMoveError) as exc:
+                failures.append(f"{move.branch}: {exc}")
+
+    repair_worktrees([move.destination for move in moved], repository_path=root)
+    advance_cursor(root, sum(move.chosen for move in moves))
+    for move in moved:
+        record_worktree(root, move.branch, move.destination)
+        if move.placement_root is not None and move.placement_root in move.destination.parents:
+            record_placement(root, move.branch, move.placement_root)
+
+    if failures:
+        raise WorktreeMoveError("Failed to move worktrees:\n  " + "\n  ".join(failures))
+    return moved
@@ -0,0 +1,180 @@
+"""Placement of worktrees across several root directories."""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import shutil
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+from branchspace.state import file_lock
+from branchspace.state import get_state_dir
+from branchspace.state import read_state
+from branchspace.state import write_state
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from branchspace.config import BranchspaceConfig
+    from branchspace.config import WorktreeRoot
+    from branchspace.config_snapshot import ConfigSnapshot
+    from branchspace.config_snapshot import RootSnapshot
+
+
+PLACEMENTS_FILENAME = "placements.json"
+PLACEMENTS_VERSION = 1
+# Held across every read-modify-write of the placements file, so concurrent
+# creates get distinct round-robin slots and no update is lost
+PLACEMENTS_LOCK = "placements.lock"
+
+_MOUNTS_FILE = Path("/proc/mounts")
+
+
+def _placements_path(repo_root: Path) -> Path:
+    return get_state_dir(repo_root) / PLACEMENTS_FILENAME
+
+
+def _load_placements(repo_root: Path) -> dict[str, Any]:
+    data = read_state(_placements_path(repo_root))
+    if data is None or data.get("version") != PLACEMENTS_VERSION:
+        return {"version": PLACEMENTS_VERSION, "cursor": 0, "branches": {}}
+    return data
+
+
+def _resolve_root(root: WorktreeRoot | RootSnapshot, repo_root: Path) -> Path:
+    path = Path(root.path).expanduser()
+    if not path.is_absolute():
+        path = repo_root / path
+    return path
+
+
+def resolve_roots(config: BranchspaceConfig | ConfigSnapshot, repo_root: Path) -> list[Path]:
+    """Return the configured placement roots as absolute paths."""
+    return [_resolve_root(root, repo_root) for root in config.worktree_roots]
+
+
+def _existing_ancestor(path: Path) -> Path:
+    while not path.exists() and path.parent != path:
+        path = path.parent
+    return path
+
+
+def _free_space(path: Path) -> int:
+    try:
+        return shutil.disk_usage(_existing_ancestor(path)).free
+    except OSError:
+        return 0
+
+
+def _is_tmpfs(path: Path) -> bool:
+    """Return True if the path lives on a tmpfs mount (Linux only)."""
+    try:
+        mounts = _MOUNTS_FILE.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return False
+    target = _existing_ancestor(path).resolve()
+    best_match: tuple[int, str] | None = None
+    for line in mounts:
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        mount_point = Path(fields[1].replace("\\040", " "))
+        if target == mount_point or mount_point in target.parents:
+            depth = len(mount_point.parts)
+            if best_match is None or depth > best_match[0]:
+                best_match = (depth, fields[2])
+    return best_match is not None and best_match[1] == "tmpfs"
+
+
+def is_ephemeral_branch(branch: str, config: BranchspaceConfig) -> bool:
+    """Return True if the branch matches one of the ephemeral branch patterns."""
+    return any(fnmatch.fnmatchcase(branch, pattern) for pattern in config.ephemeral_branches)
+
+
+def _most_free(roots: list[Path]) -> Path:
+    return max(roots, key=_free_space)
+
+
+def advance_cursor(repo_root: Path, count: int = 1) -> int:
+    """Move the round-robin cursor ``count`` slots on; return its previous value."""
+    with file_lock(get_state_dir(repo_root) / PLACEMENTS_LOCK):
+        data = _load_placements(repo_root)
+        cursor = int(data.get("cursor", 0))
+        if count:
+            data["cursor"] = cursor + count
+            write_state(_placements_path(repo_root), data)
+    return cursor
+
+
+def choose_root(
+    branch: str,
+    config: BranchspaceConfig,
+    repo_root: Path,
+    *,
+    offset: int = 0,
+    advance: bool = True,
+) -> Path | None:
+    """Pick the placement root for a new worktree according to the policy.
+
+    Round-robin takes the slot ``offset`` past the cursor and moves the
+    cursor on by one. Without ``advance`` the cursor is left alone, so a plan
+    can pick several slots and claim them later with ``advance_cursor``.
+
+    Returns None when no placement roots are configured.
+    """
+    if not config.worktree_roots:
+        return None
+
+    roots = resolve_roots(config, repo_root)
+
+    if config.placement_policy == "round-robin":
+        cursor = advance_cursor(repo_root, 1 if advance else 0)
+        return roots[(cursor + offset) % len(roots)]
+
+    if config.placement_policy == "tmpfs-for-ephemeral":
+        ephemeral = [
+            path
+            for root, path in zip(config.worktree_roots, roots)
+            if root.ephemeral or _is_tmpfs(path)
+        ]
+        durable = [path for path in roots if path not in ephemeral]
+        preferred = ephemeral if is_ephemeral_branch(branch, config) else durable
+        return _most_free(preferred or roots)
+
+    return _most_free(roots)
+
+
+def get_placement(repo_root: Path, branch: str) -> Path | None:
+    """Return the root recorded for a branch, if any."""
+    root = _load_placements(repo_root)["branches"].get(branch)
+    return Path(root) if root else None
+
+
+def record_placement(repo_root: Path, branch: str, root: Path) -> None:
+    """Record the root a branch's worktree was placed under."""
+    with file_lock(get_state_dir(repo_root) / PLACEMENTS_LOCK):
+        data = _load_placements(repo_root)
+        data["branches"][branch] = os.fspath(root)
+        write_state(_placements_path(repo_root), data)
+
+
+def forget_placements(repo_root: Path, branches: Iterable[str]) -> None:
+    """Drop the recorded roots for branches."""
+    path = _placements_path(repo_root)
+    if not path.exists():
+        return
+    with file_lock(get_state_dir(repo_root) / PLACEMENTS_LOCK):
+        data = read_state(path)
+        if data is None:
+            return
+        recorded = data.get("branches", {})
+        forgotten = [branch for branch in branches if branch in recorded]
+        if not forgotten:
+            return
+        for branch in forgotten:
+            del recorded[branch]
+        write_state(path, data)
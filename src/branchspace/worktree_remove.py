@@ -2,21 +2,39 @@
 
 from collections.abc import Iterable
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
 import questionary
 
+from rich.table import Table
+
 from branchspace.config import BranchspaceConfig
-from branchspace.config import get_git_root
+from branchspace.console import get_console
+from branchspace.fuzzy import Chooser
+from branchspace.fuzzy import FuzzyIndex
+from branchspace.fuzzy import resolve_match
+from branchspace.git_utils import GitWorktree
+from branchspace.git_utils import get_git_root
 from branchspace.git_utils import get_protected_branches
 from branchspace.git_utils import has_uncommitted_changes_with_untracked
 from branchspace.git_utils import has_unpushed_commits
 from branchspace.git_utils import list_worktrees
 from branchspace.git_utils import remove_worktree
+from branchspace.journal import PHASE_BRANCH_DELETED
+from branchspace.journal import PHASE_REMOVED
+from branchspace.journal import OperationJournal
+from branchspace.trash import move_to_trash
+from branchspace.trash import start_reaper
+from branchspace.worktree_create import MAX_WORKERS
+from branchspace.worktree_index import accessed_times
+from branchspace.worktree_index import forget_worktrees
+from branchspace.worktree_placement import forget_placements
 
 
 PROTECTED_BRANCHES = {"main", "master", "develop", "staging", "production"}
+REMOVE_OPERATION = "remove"
 
 
 class WorktreeRemoveError(RuntimeError):
@@ -44,7 +62,9 @@ def _is_protected(branch: str, repo_root: Path) -> bool:
     return branch in protected
 
 
-def _branch_checked_out_in_multiple_worktrees(branch: str, worktrees: Sequence) -> bool:
+def _branch_checked_out_in_multiple_worktrees(
+    branch: str, worktrees: Sequence[GitWorktree]
+) -> bool:
     """Check if a branch is checked out in multiple worktrees.
 
     Returns True if the branch appears in more than one worktree,
@@ -58,13 +78,121 @@ def _confirm(prompt: str) -> bool:
     return bool(questionary.confirm(prompt).unsafe_ask())
 
 
-def _find_worktree_path(branch: str, worktrees: Sequence) -> Path | None:
+def _find_worktree_path(branch: str, worktrees: Sequence[GitWorktree]) -> Path | None:
     for worktree in worktrees:
         if worktree.branch == branch:
             return worktree.path
     return None
 
 
+def resolve_branch_names(
+    names: Sequence[str],
+    worktrees: Sequence[GitWorktree],
+    root: Path,
+    *,
+    choose: Chooser | None = None,
+) -> list[str]:
+    """Map each name to a branch of ``worktrees``, fuzzy-matching names that are not exact.
+
+    Removal is destructive, so every fuzzy match goes through ``choose`` for
+    confirmation. Names nobody confirms are kept as given and later fail with
+    the usual "no worktree" error.
+    """
+    branches = [wt.branch for wt in worktrees if not wt.detached]
+    if all(name in branches for name in names):
+        return list(names)
+
+    index = FuzzyIndex(branches, accessed_times(root))
+    return [resolve_match(name, index, choose, confirm=True) or name for name in names]
+
+
+def _delete_branches(branches: Sequence[str], root: Path) -> None:
+    if not branches:
+        return
+    import subprocess
+
+    subprocess.run(["git", "branch", "-D", *branches], cwd=root, check=False)
+
+
+@dataclass(frozen=True)
+class RemovalAssessment:
+    """Pre-removal checks for one branch."""
+
+    branch: str
+    path: Path
+    dirty: bool
+    unpushed: bool
+
+    @property
+    def needs_confirmation(self) -> bool:
+        return self.dirty or self.unpushed
+
+    @property
+    def status(self) -> str:
+        flags = [
+            name for name, flag in (("dirty", self.dirty), ("unpushed", self.unpushed)) if flag
+        ]
+        return ", ".join(flags) or "clean"
+
+
+def _locate_worktree(branch: str, protected: set[str], worktrees: Sequence[GitWorktree]) -> Path:
+    if branch in protected:
+        raise WorktreeRemoveError(f"Branch '{branch}' is protected and cannot be removed.")
+    if _branch_checked_out_in_multiple_worktrees(branch, worktrees):
+        raise WorktreeRemoveError(f"Branch '{branch}' is checked out in multiple worktrees.")
+    worktree_path = _find_worktree_path(branch, worktrees)
+    if worktree_path is None:
+        raise WorktreeRemoveError(f"No worktree found for branch '{branch}'.")
+    return worktree_path
+
+
+def _assess(branch: str, worktree_path: Path, *, probe_unpushed: bool) -> RemovalAssessment:
+    return RemovalAssessment(
+        branch=branch,
+        path=worktree_path,
+        dirty=has_uncommitted_changes_with_untracked(worktree_path),
+        unpushed=probe_unpushed and has_unpushed_commits(worktree_path),
+    )
+
+
+def _discard_worktree(
+    assessment: RemovalAssessment,
+    config: BranchspaceConfig,
+    root: Path,
+    *,
+    confirmed: bool,
+    journal: OperationJournal | None = None,
+) -> bool:
+    """Remove an assessed worktree; return True if it went through the trash."""
+    if journal is not None:
+        journal.record(assessment.branch, path=assessment.path)
+
+    # Dirty worktrees only skip git's own refusal when the user confirmed it
+    trashed = None
+    if config.fast_remove and (confirmed or not assessment.dirty):
+        trashed = move_to_trash(assessment.path, root)
+    if trashed is None:
+        remove_worktree(assessment.path, repository_path=root)
+
+    if journal is not None:
+        journal.checkpoint(assessment.branch, PHASE_REMOVED)
+    return trashed is not None
+
+
+def build_removal_table(assessments: Sequence[RemovalAssessment]) -> Table:
+    """Build a Rich table summarizing worktrees about to be removed."""
+    table = Table(title="Worktrees to remove")
+    table.add_column("Branch", style="bold")
+    table.add_column("Path", style="cyan")
+    table.add_column("Status")
+    for assessment in assessments:
+        status = assessment.status
+        if assessment.needs_confirmation:
+            status = f"[yellow]{status}[/]"
+        table.add_row(assessment.branch, str(assessment.path), status)
+    return table
+
+
 def remove_worktree_for_branch(
     branch: str,
     config: BranchspaceConfig,
@@ -76,17 +204,12 @@ def remove_worktree_for_branch(
     if _is_protected(branch, root):
         raise WorktreeRemoveError(f"Branch '{branch}' is protected and cannot be removed.")
 
-    worktrees = list_worktrees(root)
-    if _branch_checked_out_in_multiple_worktrees(branch, worktrees):
-        raise WorktreeRemoveError(f"Branch '{branch}' is checked out in multiple worktrees.")
-
-    worktree_path = _find_worktree_path(branch, worktrees)
-    if worktree_path is None:
-        raise WorktreeRemoveError(f"No worktree found for branch '{branch}'.")
+    worktree_path = _locate_worktree(branch, set(), list_worktrees(root))
+    assessment = _assess(branch, worktree_path, probe_unpushed=False)
 
     if (
         confirm
-        and has_uncommitted_changes_with_untracked(worktree_path)
+        and assessment.dirty
         and not _confirm(f"Worktree '{branch}' has uncommitted changes. Remove anyway?")
     ):
         return RemovalResult(branch=branch, path=worktree_path, removed=False)
@@ -98,12 +221,13 @@ def remove_worktree_for_branch(
     ):
         return RemovalResult(branch=branch, path=worktree_path, removed=False)
 
-    remove_worktree(worktree_path, repository_path=root)
+    if _discard_worktree(assessment, config, root, confirmed=confirm):
+        start_reaper(root)
+    forget_placements(root, [branch])
+    forget_worktrees(root, [branch])
 
     if config.purge_on_remove:
-        import subprocess
-
-        subprocess.run(["git", "branch", "-D", branch], cwd=root, check=False)
+        _delete_branches([branch], root)
 
     return RemovalResult(branch=branch, path=worktree_path, removed=True)
 
@@ -114,15 +238,107 @@ def remove_worktrees(
     repo_root: Path | None = None,
     *,
     confirm: bool = True,
+    resume: bool = False,
+    choose: Chooser | None = None,
 ) -> list[RemovalResult]:
-    results: list[RemovalResult] = []
-    for branch in branches:
-        results.append(
-            remove_worktree_for_branch(
-                branch,
-                config,
-                repo_root=repo_root,
-                confirm=confirm,
+    """Remove worktrees for a batch of branches in two phases.
+
+    Names are resolved and all branches assessed in parallel against a single
+    worktree snapshot, with one consolidated confirmation for the dirty or
+    unpushed ones; declining it skips only those, and clean worktrees are
+    still removed. Approved worktrees are then removed concurrently. Each
+    phase is journaled; with ``resume``, branches left over from an
+    interrupted batch are finished and completed phases are skipped.
+    """
+    root = _ensure_git_root(repo_root)
+    worktrees = list_worktrees(root)
+    branches = resolve_branch_names(list(branches), worktrees, root, choose=choose)
+    journal = OperationJournal.load(root, REMOVE_OPERATION)
+
+    if resume:
+        if journal is None:
+            raise WorktreeRemoveError("No interrupted remove to resume.")
+        journal.add_branches(branches)
+    else:
+        if journal is not None:
+            pending = ", ".join(journal.branches)
+            raise WorktreeRemoveError(
+                f"An interrupted remove is pending for: {pending}. Rerun with --resume."
             )
-        )
+        journal = OperationJournal.start(root, REMOVE_OPERATION, branches)
+
+    finished = [branch for branch in journal.branches if journal.is_done(branch, PHASE_REMOVED)]
+    to_assess = [branch for branch in journal.branches if branch not in finished]
+
+    # Phase 1: validate against one snapshot, then probe every worktree in parallel
+    located: list[tuple[str, Path]] = []
+    if to_assess:
+        protected = set(get_protected_branches(root)) | PROTECTED_BRANCHES
+        problems: list[str] = []
+        for branch in to_assess:
+            try:
+                located.append((branch, _locate_worktree(branch, protected, worktrees)))
+            except WorktreeRemoveError as exc:
+                problems.append(str(exc))
+        if problems:
+            for branch in to_assess:
+                journal.forget_if_untouched(branch)
+            raise WorktreeRemoveError("\n".join(problems))
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        assessments = list(pool.map(lambda item: _assess(*item, probe_unpushed=confirm), located))
+
+    approved = assessments
+    risky = [assessment for assessment in assessments if assessment.needs_confirmation]
+    if confirm and risky:
+        get_console().print(build_removal_table(assessments))
+        if not _confirm(f"Remove {len(risky)} dirty or unpushed worktree(s) anyway?"):
+            approved = [
+                assessment for assessment in assessments if not assessment.needs_confirmation
+            ]
+
+    # Phase 2: remove approved worktrees concurrently. Worktrees already gone
+    # are forgotten and trashed ones reaped even if another removal fails.
+    discarded = list(finished)
+    trashed = False
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            futures = {
+                assessment.branch: pool.submit(
+                    _discard_worktree, assessment, config, root, confirmed=confirm, journal=journal
+                )
+                for assessment in approved
+            }
+        failed: BaseException | None = None
+        for branch, future in futures.items():
+            error = future.exception()
+            if error is None:
+                discarded.append(branch)
+                trashed = future.result() or trashed
+            elif failed is None:
+                failed = error
+        if failed is not None:
+            raise failed
+    finally:
+        forget_placements(root, discarded)
+        forget_worktrees(root, discarded)
+        if trashed:
+            start_reaper(root)
+
+    removed = set(discarded)
+    if config.purge_on_remove:
+        to_delete = [
+            branch for branch in removed if not journal.is_done(branch, PHASE_BRANCH_DELETED)
+        ]
+        _delete_branches(to_delete, root)
+        for branch in to_delete:
+            journal.checkpoint(branch, PHASE_BRANCH_DELETED)
+
+    paths = {assessment.branch: assessment.path for assessment in assessments}
+    results: list[RemovalResult] = []
+    for branch in journal.branches:
+        path = paths.get(branch) or journal.entry(branch).path
+        if path is not None:
+            results.append(RemovalResult(branch=branch, path=path, removed=branch in removed))
+    journal.discard()
     return results
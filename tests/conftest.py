@@ -0,0 +1,363 @@
+"""Shared fixtures: git repositories and a fake Docker Engine API server."""
+
+from __future__ import annotations
+
+import fnmatch
+import itertools
+import json
+import re
+import shutil
+import socketserver
+import subprocess
+import tempfile
+import threading
+
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+from urllib.parse import parse_qs
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+
+import pytest
+
+from branchspace.docker_backend import reset_backend
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+@pytest.fixture
+def init_repo() -> Callable[[Path], Path]:
+    """Return a factory creating a git repository on ``main`` with one empty commit."""
+
+    def init(path: Path) -> Path:
+        path.mkdir(parents=True)
+        for args in (
+            ["init", "-b", "main"],
+            ["config", "user.email", "test@example.com"],
+            ["config", "user.name", "Test User"],
+            ["commit", "--allow-empty", "-m", "init"],
+        ):
+            subprocess.run(["git", *args], cwd=path, capture_output=True, check=True)
+        return path
+
+    return init
+
+
+def _matches_labels(labels: dict[str, str], wanted: list[str]) -> bool:
+    for label in wanted:
+        key, has_value, value = label.partition("=")
+        if key not in labels or (has_value and labels[key] != value):
+            return False
+    return True
+
+
+class FakeEngine:
+    """In-memory containers, images and volumes behind the Engine API.
+
+    Records every request and counts connections, so tests can check that a
+    pass over many resources reuses one keep-alive connection.
+    """
+
+    def __init__(self, socket_path: Path) -> None:
+        self.socket_path = socket_path
+        self.containers: dict[str, dict[str, Any]] = {}
+        self.images: dict[str, dict[str, Any]] = {}
+        self.volumes: dict[str, dict[str, Any]] = {}
+        self.execs: dict[str, dict[str, Any]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.connections = 0
+        # Close each connection after one reply, as an engine dropping idle clients would
+        self.drop_connections = False
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server: socketserver.UnixStreamServer | None = None
+
+    def add_container(
+        self,
+        name: str,
+        image: str = "ubuntu:24.04",
+        status: str = "running",
+        labels: dict[str, str] | None = None,
+    ) -> str:
+        container_id = f"c{next(self._ids):063d}"
+        self.containers[container_id] = {
+            "Id": container_id,
+            "Name": name,
+            "Image": image,
+            "Status": status,
+            "Labels": labels or {},
+        }
+        return container_id
+
+    def add_image(self, reference: str, labels: dict[str, str] | None = None) -> str:
+        image_id = f"sha256:{next(self._ids):064d}"
+        self.images[image_id] = {"Id": image_id, "RepoTags": [reference], "Labels": labels or {}}
+        return image_id
+
+    def add_volume(self, name: str, labels: dict[str, str] | None = None) -> str:
+        self.volumes[name] = {"Name": name, "Labels": labels or {}}
+        return name
+
+    def find_container(self, key: str) -> dict[str, Any] | None:
+        for container in self.containers.values():
+            if key in (container["Id"], container["Name"]):
+                return container
+        return None
+
+    def find_image(self, key: str) -> dict[str, Any] | None:
+        for image in self.images.values():
+            if key == image["Id"] or key in image["RepoTags"]:
+                return image
+        return None
+
+    def start(self) -> None:
+        engine = self
+
+        class Handler(_EngineHandler):
+            fake = engine
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        self._server = Server(str(self.socket_path), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class _EngineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeEngine
+
+    def setup(self) -> None:
+        super().setup()
+        with self.fake._lock:
+            self.fake.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def _reply(self, status: int, body: Any = None, *, lines: list[Any] | None = None) -> None:
+        if lines is not None:
+            payload = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        elif body is None:
+            payload = b""
+        else:
+            payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _missing(self, what: str) -> None:
+        self._reply(404, {"message": f"No such {what}"})
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        filters: dict[str, list[str]] = json.loads(query.get("filters", "{}"))
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        with self.fake._lock:
+            self.fake.requests.append((method, path))
+            self._route(method, path, query, filters, body)
+            if self.fake.drop_connections:
+                self.close_connection = True
+
+    def _route(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, str],
+        filters: dict[str, list[str]],
+        body: Any,
+    ) -> None:
+        fake = self.fake
+        if (method, path) == ("GET", "/_ping"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"OK")
+            return
+        if (method, path) == ("GET", "/containers/json"):
+            found = [
+                {"Id": c["Id"], "Names": [f"/{c['Name']}"], "Labels": c["Labels"]}
+                for c in fake.containers.values()
+                if all(re.search(p, c["Name"]) for p in filters.get("name", []))
+                and _matches_labels(c["Labels"], filters.get("label", []))
+            ]
+            self._reply(200, found)
+            return
+        if (method, path) == ("GET", "/images/json"):
+            found = [
+                {"Id": i["Id"], "RepoTags": i["RepoTags"], "Labels": i["Labels"]}
+                for i in fake.images.values()
+                if all(
+                    any(
+                        fnmatch.fnmatch(tag.split(":")[0], p) or fnmatch.fnmatch(tag, p)
+                        for tag in i["RepoTags"]
+                    )
+                    for p in filters.get("reference", [])
+                )
+                and _matches_labels(i["Labels"], filters.get("label", []))
+            ]
+            self._reply(200, found)
+            return
+        if (method, path) == ("GET", "/volumes"):
+            found = [
+                v
+                for v in fake.volumes.values()
+                if all(re.search(p, v["Name"]) for p in filters.get("name", []))
+                and _matches_labels(v["Labels"], filters.get("label", []))
+            ]
+            self._reply(200, {"Volumes": found, "Warnings": None})
+            return
+        if (method, path) == ("POST", "/images/create"):
+            reference = query["fromImage"]
+            if "tag" in query:
+                reference = f"{reference}:{query['tag']}"
+            if fake.find_image(reference) is None:
+                fake.add_image(reference)
+            self._reply(
+                200,
+                lines=[
+                    {"status": f"Pulling from {reference}", "id": query.get("tag", "latest")},
+                    {"status": "Downloading", "progress": "[=>   ]", "id": "abc"},
+                    {"status": f"Status: Downloaded newer image for {reference}"},
+                ],
+            )
+            return
+
+        match = re.fullmatch(r"/containers/(.+?)(?:/(json|start|stop|exec))?", path)
+        if match:
+            container = fake.find_container(match.group(1))
+            if container is None:
+                self._missing("container")
+                return
+            action = match.group(2)
+            if method == "GET" and action == "json":
+                self._reply(
+                    200,
+                    {
+                        "Id": container["Id"],
+                        "Name": f"/{container['Name']}",
+                        "State": {"Status": container["Status"]},
+                        "Config": {"Image": container["Image"], "Labels": container["Labels"]},
+                    },
+                )
+            elif method == "POST" and action in ("start", "stop"):
+                container["Status"] = "running" if action == "start" else "exited"
+                self._reply(204)
+            elif method == "POST" and action == "exec":
+                if container["Status"] != "running":
+                    self._reply(409, {"message": "container is not running"})
+                    return
+                exec_id = f"e{next(fake._ids)}"
+                fake.execs[exec_id] = {"Cmd": body["Cmd"], "Container": container["Name"]}
+                self._reply(201, {"Id": exec_id})
+            elif method == "DELETE" and action is None:
+                del fake.containers[container["Id"]]
+                self._reply(204)
+            else:
+                self._reply(405, {"message": "not supported"})
+            return
+
+        match = re.fullmatch(r"/exec/(.+)/(start|json)", path)
+        if match and match.group(1) in fake.execs:
+            if match.group(2) == "start":
+                self._reply(200)
+            else:
+                self._reply(200, {"Running": False, "ExitCode": 0})
+            return
+
+        match = re.fullmatch(r"/images/(.+?)(/json)?", path)
+        if match:
+            image = fake.find_image(match.group(1))
+            if image is None:
+                self._missing("image")
+            elif method == "GET" and match.group(2):
+                self._reply(200, {"Id": image["Id"], "RepoTags": image["RepoTags"]})
+            elif method == "DELETE" and not match.group(2):
+                del fake.images[image["Id"]]
+                self._reply(200, [{"Deleted": image["Id"]}])
+            else:
+                self._reply(405, {"message": "not supported"})
+            return
+
+        if (method, path) == ("POST", "/commit"):
+            if fake.find_container(query["container"]) is None:
+                self._missing("container")
+                return
+            image_id = fake.add_image(
+                f"{query['repo']}:{query['tag']}", labels=(body or {}).get("Labels")
+            )
+            self._reply(201, {"Id": image_id})
+            return
+        if (method, path) == ("POST", "/volumes/create"):
+            volume = fake.volumes.get(body["Name"]) or {
+                "Name": body["Name"],
+                "Labels": body.get("Labels") or {},
+            }
+            fake.volumes[body["Name"]] = volume
+            self._reply(201, volume)
+            return
+        if (method, path) == ("GET", "/system/df"):
+            usage = [
+                {"Name": v["Name"], "UsageData": {"Size": v.get("Size", -1), "RefCount": 0}}
+                for v in fake.volumes.values()
+            ]
+            self._reply(200, {"Volumes": usage})
+            return
+
+        match = re.fullmatch(r"/volumes/(.+)", path)
+        if match and method == "DELETE":
+            if fake.volumes.pop(match.group(1), None) is None:
+                self._missing("volume")
+            else:
+                self._reply(204)
+            return
+
+        self._reply(404, {"message": f"page not found: {method} {path}"})
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_docker_backend():
+    # The backend is chosen once per process; tests must not share it
+    reset_backend()
+    yield
+    reset_backend()
+
+
+@pytest.fixture
+def fake_engine(monkeypatch):
+    # Unix socket paths are limited to about 100 bytes, so avoid deep tmp_path
+    directory = Path(tempfile.mkdtemp(prefix="bs-engine-"))
+    engine = FakeEngine(directory / "docker.sock")
+    engine.start()
+    monkeypatch.setenv("DOCKER_HOST", f"unix://{engine.socket_path}")
+    # Registry credentials in the user's CLI config would route pulls to the CLI
+    monkeypatch.setenv("DOCKER_CONFIG", str(directory))
+    monkeypatch.delenv("BRANCHSPACE_DOCKER_BACKEND", raising=False)
+    yield engine
+    reset_backend()
+    engine.stop()
+    shutil.rmtree(directory, ignore_errors=True)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import subprocess
+
 from pathlib import Path
 from unittest.mock import MagicMock
 from unittest.mock import patch
@@ -10,8 +12,9 @@ from branchspace.completion import WorktreeBranchComplete
 from branchspace.git_utils import GitWorktree
 
 
-def test_worktree_branch_complete_returns_matching_branches():
+def test_worktree_branch_complete_returns_matching_branches(tmp_path: Path, monkeypatch):
     """Test that WorktreeBranchComplete returns worktree branches."""
+    monkeypatch.chdir(tmp_path)
     mock_worktrees = [
         GitWorktree(
             path=Path("/repo/worktrees/feature-1"),
@@ -33,7 +36,7 @@ def test_worktree_branch_complete_returns_matching_branches():
         ),
     ]
 
-    with patch("branchspace.completion.list_worktrees", return_value=mock_worktrees):
+    with patch("branchspace.completion_cache.list_worktrees", return_value=mock_worktrees):
         completer = WorktreeBranchComplete()
         ctx = MagicMock()
         param = MagicMock()
@@ -44,8 +47,9 @@ def test_worktree_branch_complete_returns_matching_branches():
         assert {item.value for item in items} == {"feature-1", "feature-2", "main"}
 
 
-def test_worktree_branch_complete_filters_by_prefix():
+def test_worktree_branch_complete_filters_by_prefix(tmp_path: Path, monkeypatch):
     """Test that WorktreeBranchComplete filters branches by prefix."""
+    monkeypatch.chdir(tmp_path)
     mock_worktrees = [
         GitWorktree(
             path=Path("/repo/worktrees/feature-1"),
@@ -67,7 +71,7 @@ def test_worktree_branch_complete_filters_by_prefix():
         ),
     ]
 
-    with patch("branchspace.completion.list_worktrees", return_value=mock_worktrees):
+    with patch("branchspace.completion_cache.list_worktrees", return_value=mock_worktrees):
         completer = WorktreeBranchComplete()
         ctx = MagicMock()
         param = MagicMock()
@@ -78,8 +82,9 @@ def test_worktree_branch_complete_filters_by_prefix():
         assert {item.value for item in items} == {"feature-1", "feature-2"}
 
 
-def test_worktree_branch_complete_excludes_detached():
+def test_worktree_branch_complete_excludes_detached(tmp_path: Path, monkeypatch):
     """Test that WorktreeBranchComplete excludes detached worktrees."""
+    monkeypatch.chdir(tmp_path)
     mock_worktrees = [
         GitWorktree(
             path=Path("/repo/worktrees/feature-1"),
@@ -95,7 +100,7 @@ def test_worktree_branch_complete_excludes_detached():
         ),
     ]
 
-    with patch("branchspace.completion.list_worktrees", return_value=mock_worktrees):
+    with patch("branchspace.completion_cache.list_worktrees", return_value=mock_worktrees):
         completer = WorktreeBranchComplete()
         ctx = MagicMock()
         param = MagicMock()
@@ -106,9 +111,13 @@ def test_worktree_branch_complete_excludes_detached():
         assert items[0].value == "feature-1"
 
 
-def test_worktree_branch_complete_handles_errors_gracefully():
+def test_worktree_branch_complete_handles_errors_gracefully(tmp_path: Path, monkeypatch):
     """Test that WorktreeBranchComplete handles errors gracefully."""
-    with patch("branchspace.completion.list_worktrees", side_effect=Exception("Git error")):
+    monkeypatch.chdir(tmp_path)
+    with patch(
+        "branchspace.completion_cache.list_worktrees",
+        side_effect=subprocess.CalledProcessError(128, ["git"]),
+    ):
         completer = WorktreeBranchComplete()
         ctx = MagicMock()
         param = MagicMock()
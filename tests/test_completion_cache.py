@@ -0,0 +1,103 @@
+"""Tests for the stale-while-revalidate completion cache."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock
+
+from branchspace.completion import BranchRefComplete
+from branchspace.completion_cache import BRANCH_NAMES
+from branchspace.completion_cache import CompletionSource
+from branchspace.completion_cache import cached_candidates
+from branchspace.completion_cache import refresh_cache
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _fail(*_args, **_kwargs):
+    raise AssertionError("git should not run")
+
+
+def test_branch_ref_complete_lists_local_and_remote_names(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    for ref in (
+        "refs/heads/feature",
+        "refs/remotes/origin/remote-only",
+        "refs/remotes/origin/HEAD",
+    ):
+        subprocess.run(["git", "update-ref", ref, "HEAD"], cwd=repo, check=True)
+    monkeypatch.chdir(repo)
+
+    items = BranchRefComplete()(MagicMock(), MagicMock(), "")
+
+    assert [item.value for item in items] == ["feature", "main", "remote-only"]
+
+
+def test_cached_candidates_served_from_cache_without_git(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    refresh_cache(BRANCH_NAMES, repo)
+    monkeypatch.setattr("branchspace.git_utils._run_git_command", _fail)
+    spawned: list[tuple] = []
+    monkeypatch.setattr(
+        "branchspace.completion_cache.spawn_module", lambda *args, **_kw: spawned.append(args)
+    )
+
+    assert cached_candidates(BRANCH_NAMES, repo) == ["main"]
+    assert spawned == []
+
+
+def test_stale_cache_is_served_while_refreshing(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    refresh_cache(BRANCH_NAMES, repo)
+    subprocess.run(["git", "branch", "later"], cwd=repo, check=True)
+    spawned: list[tuple] = []
+    monkeypatch.setattr(
+        "branchspace.completion_cache.spawn_module", lambda *args, **_kw: spawned.append(args)
+    )
+
+    assert cached_candidates(BRANCH_NAMES, repo) == ["main"]
+    assert spawned == [("branchspace.completion_cache", "refs", str(repo.resolve()))]
+
+
+def test_branch_in_existing_ref_directory_invalidates_cache(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    subprocess.run(["git", "branch", "feature/one"], cwd=repo, check=True)
+    heads = repo / ".git" / "refs" / "heads"
+    for directory in (heads, heads / "feature"):
+        os.utime(directory, ns=(10**18, 10**18))
+    refresh_cache(BRANCH_NAMES, repo)
+    subprocess.run(["git", "branch", "feature/two"], cwd=repo, check=True)
+    spawned: list[tuple] = []
+    monkeypatch.setattr(
+        "branchspace.completion_cache.spawn_module", lambda *args, **_kw: spawned.append(args)
+    )
+
+    # Only refs/heads/feature changed, not refs/heads itself
+    assert heads.stat().st_mtime_ns == 10**18
+    assert cached_candidates(BRANCH_NAMES, repo) == ["feature/one", "main"]
+    assert spawned == [("branchspace.completion_cache", "refs", str(repo.resolve()))]
+
+
+def test_cold_cache_gives_up_after_budget(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    timeouts: list[float | None] = []
+
+    def slow(_root: Path, timeout: float | None) -> list[str]:
+        timeouts.append(timeout)
+        raise subprocess.TimeoutExpired(["git"], timeout or 0)
+
+    source = CompletionSource(name="slow", ttl=60.0, produce=slow, watched=())
+    spawned: list[tuple] = []
+    monkeypatch.setenv("BRANCHSPACE_COMPLETION_BUDGET_MS", "30")
+    monkeypatch.setattr(
+        "branchspace.completion_cache.spawn_module", lambda *args, **_kw: spawned.append(args)
+    )
+
+    assert cached_candidates(source, repo) == []
+    assert timeouts[0] is not None and timeouts[0] <= 0.03
+    assert spawned == [("branchspace.completion_cache", "slow", str(repo.resolve()))]
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import os
 import subprocess
 
 from pathlib import Path
@@ -17,8 +18,8 @@ from branchspace.config import ContainerBuildConfig
 from branchspace.config import ContainerImageConfig
 from branchspace.config import TemplateContext
 from branchspace.config import find_config_file
-from branchspace.config import get_git_root
 from branchspace.config import load_config
+from branchspace.git_utils import get_git_root
 
 
 class TestContainerImageConfig:
@@ -197,6 +198,23 @@ class TestBranchspaceConfigEnvOverrides:
 
         assert config.worktree_path_template == f"{tmp_path}/$BRANCH_NAME"
 
+    def test_env_base_with_several_paths_sets_roots(self, monkeypatch, tmp_path: Path):
+        first, second = tmp_path / "nvme0", tmp_path / "nvme1"
+        monkeypatch.setenv("BRANCHSPACE_BASE", f"{first}{os.pathsep}{second}")
+        config = load_config(path=None)
+
+        assert config.worktree_path_template == "$BRANCH_NAME"
+        assert [root.path for root in config.worktree_roots] == [str(first), str(second)]
+
+    def test_worktree_roots_accept_string_shorthand(self):
+        config = BranchspaceConfig.model_validate(
+            {"worktreeRoots": ["/nvme0", {"path": "/dev/shm/wt", "ephemeral": True}]}
+        )
+
+        assert config.worktree_roots[0].path == "/nvme0"
+        assert config.worktree_roots[0].ephemeral is False
+        assert config.worktree_roots[1].ephemeral is True
+
 
 class TestGetGitRoot:
     """Tests for get_git_root function."""
@@ -0,0 +1,71 @@
+"""Tests for cached configuration snapshots."""
+
+from __future__ import annotations
+
+import os
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from branchspace.config import load_config
+from branchspace.config_snapshot import load_snapshot
+from branchspace.config_snapshot import read_snapshot
+from branchspace.template import TemplateVariableError
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _write_config(path: Path, content: str) -> Path:
+    path.write_text(content)
+    # Back-date the file so it is outside the racy window
+    mtime = path.stat().st_mtime - 60
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _fail(*_args, **_kwargs):
+    raise AssertionError("config should not be validated")
+
+
+def test_load_config_reuses_snapshot_until_file_changes(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    config_path = _write_config(repo / "branchspace.json", '{"projectName": "one"}')
+    assert load_config(config_path).project_name == "one"
+    assert read_snapshot(config_path) is not None
+
+    monkeypatch.setattr("branchspace.config.BranchspaceConfig.model_validate", _fail)
+    assert load_config(config_path).project_name == "one"
+
+    monkeypatch.undo()
+    _write_config(config_path, '{"projectName": "three"}')
+    assert read_snapshot(config_path) is None
+    assert load_config(config_path).project_name == "three"
+
+
+def test_snapshot_is_keyed_on_branchspace_base(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    config_path = _write_config(repo / "branchspace.json", "{}")
+    load_config(config_path)
+
+    monkeypatch.setenv("BRANCHSPACE_BASE", str(tmp_path / "base"))
+
+    assert read_snapshot(config_path) is None
+    assert load_config(config_path).worktree_path_template == f"{tmp_path / 'base'}/$BRANCH_NAME"
+
+
+def test_snapshot_prevalidates_path_template(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    config_path = _write_config(
+        repo / "branchspace.json", '{"worktreePathTemplate": "../$PROJECT_NAME/$BRANCH_NAME"}'
+    )
+    snapshot = load_snapshot(config_path)
+    assert snapshot.template_error is None
+    assert snapshot.worktree_path("feat", repo, "main") == repo / "../repo/feat"
+
+    _write_config(config_path, '{"worktreePathTemplate": "$WORKTREE_PATH/x"}')
+    snapshot = load_snapshot(config_path)
+    with pytest.raises(TemplateVariableError):
+        snapshot.worktree_path("feat", repo, "main")
@@ -0,0 +1,119 @@
+"""Tests for the optional repository daemon."""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from branchspace.daemon import BranchspaceDaemon
+from branchspace.daemon_client import RuntimeDirError
+from branchspace.daemon_client import query
+from branchspace.daemon_client import socket_path
+from branchspace.git_utils import find_repository
+from branchspace.worktree_cd import resolve_worktree_path
+from branchspace.worktree_list import list_worktree_statuses
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _fail(*_args, **_kwargs):
+    raise AssertionError("fallback should not run")
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_daemon_serves_and_invalidates_worktrees(tmp_path: Path, monkeypatch, init_repo):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    monkeypatch.delenv("BRANCHSPACE_DAEMON", raising=False)
+    repo = init_repo(tmp_path / "repo")
+    repository = find_repository(repo)
+    assert repository is not None
+
+    daemon = BranchspaceDaemon(repository, idle_timeout=60)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        assert query("ping", repo, timeout=1.0) == "pong"
+        assert [item["branch"] for item in query("worktrees", repo, timeout=5.0)] == ["main"]
+
+        feature = tmp_path / "feature"
+        subprocess.run(
+            ["git", "worktree", "add", "-b", "feature", str(feature)],
+            cwd=repo,
+            capture_output=True,
+            check=True,
+        )
+        assert _wait_for(lambda: query("resolve", repo, timeout=5.0, branch="feature") is not None)
+
+        for target in (
+            "branchspace.worktree_cd.lookup_worktree",
+            "branchspace.worktree_cd.predict_worktree_path",
+            "branchspace.worktree_list.indexed_worktrees",
+            "branchspace.worktree_list.list_worktrees",
+        ):
+            monkeypatch.setattr(target, _fail)
+        monkeypatch.chdir(repo)
+        assert resolve_worktree_path("feature", repo).path == feature.resolve()
+        statuses = list_worktree_statuses(repo)
+        assert [status.branch for status in statuses] == ["feature", "main"]
+        assert [status.is_current for status in statuses] == [False, True]
+    finally:
+        daemon.shutdown()
+        thread.join(timeout=5)
+
+    assert not daemon.socket_path.exists()
+
+
+def test_query_without_daemon_falls_back_and_spawns(tmp_path: Path, monkeypatch, init_repo):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    monkeypatch.setenv("BRANCHSPACE_DAEMON", "1")
+    repo = init_repo(tmp_path / "repo")
+    spawned: list[tuple] = []
+    monkeypatch.setattr(
+        "branchspace.daemon_client.spawn_module", lambda *args, **_kw: spawned.append(args)
+    )
+
+    assert query("worktrees", repo) is None
+    assert spawned == [("branchspace.daemon", str(repo.resolve()))]
+
+
+def test_query_without_opt_in_does_not_spawn(tmp_path: Path, monkeypatch, init_repo):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    monkeypatch.delenv("BRANCHSPACE_DAEMON", raising=False)
+    repo = init_repo(tmp_path / "repo")
+    monkeypatch.setattr("branchspace.daemon_client.spawn_module", _fail)
+
+    assert query("worktrees", repo) is None
+
+
+def test_runtime_dir_must_be_private(tmp_path: Path, monkeypatch, init_repo):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    monkeypatch.delenv("BRANCHSPACE_DAEMON", raising=False)
+    repo = init_repo(tmp_path / "repo")
+    repository = find_repository(repo)
+    assert repository is not None
+    shared = tmp_path / "run" / "branchspace"
+    shared.mkdir(parents=True)
+    shared.chmod(0o777)
+
+    with pytest.raises(RuntimeDirError, match="0700"):
+        BranchspaceDaemon(repository, idle_timeout=60)
+
+    # A socket someone else planted there is never connected to
+    socket_path(repository.common_dir).touch()
+    monkeypatch.setattr("branchspace.daemon_client._request", _fail)
+    assert query("worktrees", repo) is None
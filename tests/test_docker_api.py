@@ -0,0 +1,150 @@
+"""Tests for the Docker Engine API client and backend selection."""
+
+from __future__ import annotations
+
+import http.client
+import io
+import json
+import select
+
+from pathlib import Path
+
+import pytest
+
+from branchspace.docker_api import DEFAULT_SOCKET
+from branchspace.docker_api import DockerAPIError
+from branchspace.docker_api import EngineClient
+from branchspace.docker_api import socket_path_from_env
+from branchspace.docker_backend import CLIBackend
+from branchspace.docker_backend import DockerBackendError
+from branchspace.docker_backend import EngineBackend
+from branchspace.docker_backend import get_backend
+
+
+def test_get_backend_prefers_engine_and_falls_back_to_cli(tmp_path, monkeypatch, fake_engine):
+    assert isinstance(get_backend(), EngineBackend)
+    assert get_backend() is get_backend()
+
+    from branchspace.docker_backend import reset_backend
+
+    reset_backend()
+    monkeypatch.setenv("DOCKER_HOST", f"unix://{tmp_path / 'missing.sock'}")
+    assert isinstance(get_backend(), CLIBackend)
+
+    reset_backend()
+    monkeypatch.setenv("BRANCHSPACE_DOCKER_BACKEND", "api")
+    with pytest.raises(DockerBackendError, match="not reachable"):
+        get_backend()
+
+    reset_backend()
+    monkeypatch.setenv("DOCKER_HOST", "tcp://build-host:2376")
+    monkeypatch.setenv("BRANCHSPACE_DOCKER_BACKEND", "")
+    assert isinstance(get_backend(), CLIBackend)
+
+
+def test_socket_path_follows_current_docker_context(tmp_path, monkeypatch):
+    monkeypatch.delenv("DOCKER_HOST", raising=False)
+    monkeypatch.delenv("DOCKER_CONTEXT", raising=False)
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+    assert socket_path_from_env() == Path(DEFAULT_SOCKET)
+
+    (tmp_path / "config.json").write_text(json.dumps({"currentContext": "colima"}))
+    assert socket_path_from_env() is None
+
+    monkeypatch.setenv("DOCKER_CONTEXT", "default")
+    assert socket_path_from_env() == Path(DEFAULT_SOCKET)
+
+
+def test_engine_backend_pull_and_inspect(fake_engine):
+    backend = get_backend()
+    output = io.StringIO()
+
+    assert not backend.image_exists("python:3.14")
+    backend.pull("python:3.14", output)
+
+    assert backend.image_exists("python:3.14")
+    assert output.getvalue().splitlines() == [
+        "3.14: Pulling from python:3.14",
+        "Status: Downloaded newer image for python:3.14",
+    ]
+    assert backend.inspect_container("branchspace-main") is None
+    fake_engine.add_container("branchspace-main", image="python:3.14", status="exited")
+    assert backend.inspect_container("branchspace-main") == ("exited", "python:3.14")
+
+
+def _wait_for_hangup(client: EngineClient) -> None:
+    sock = client._connection.sock
+    if sock is not None:
+        select.select([sock], [], [], 5.0)
+
+
+def test_client_reports_errors_and_reconnects(fake_engine):
+    client = EngineClient(fake_engine.socket_path)
+    try:
+        with pytest.raises(DockerAPIError) as excinfo:
+            client.start_container("nope")
+        assert excinfo.value.status == 404
+        assert "No such container" in str(excinfo.value)
+
+        # A connection dropped by the engine is reopened transparently
+        fake_engine.drop_connections = True
+        assert client.ping()
+        assert client.ping()
+        # Requests that are not safe to repeat also get a fresh connection,
+        # once the engine's hang-up has arrived as it has on an idle one
+        fake_engine.add_container("web", status="exited")
+        for request in (client.start_container, client.stop_container):
+            _wait_for_hangup(client)
+            request("web")
+        assert fake_engine.requests.count(("POST", "/containers/web/start")) == 1
+    finally:
+        client.close()
+
+
+def test_client_never_resends_unanswered_post(fake_engine, monkeypatch):
+    client = EngineClient(fake_engine.socket_path)
+    sent = []
+
+    def hang_up(method, url, payload, headers):
+        sent.append(method)
+        raise http.client.RemoteDisconnected("closed")
+
+    monkeypatch.setattr(client, "_request_once", hang_up)
+    try:
+        with pytest.raises(DockerAPIError, match="Cannot reach"):
+            client.start_container("web")
+        assert sent == ["POST"]
+        sent.clear()
+        with pytest.raises(DockerAPIError, match="Cannot reach"):
+            client.call("GET", "/_ping")
+        assert sent == ["GET", "GET"]
+    finally:
+        client.close()
+
+
+def test_untagged_pull_asks_for_latest(fake_engine):
+    client = EngineClient(fake_engine.socket_path)
+    try:
+        for image in ("ubuntu", "localhost:5000/app", "localhost:5000/app:1.2"):
+            list(client.pull(image))
+    finally:
+        client.close()
+
+    assert fake_engine.find_image("ubuntu:latest") is not None
+    assert fake_engine.find_image("localhost:5000/app:latest") is not None
+    assert fake_engine.find_image("localhost:5000/app:1.2") is not None
+
+
+def test_pull_goes_through_cli_when_registry_credentials_exist(tmp_path, monkeypatch, fake_engine):
+    (tmp_path / "config.json").write_text(json.dumps({"credsStore": "desktop"}))
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+    calls = []
+    monkeypatch.setattr(
+        "branchspace.docker_backend.subprocess.run",
+        lambda cmd, **_kw: calls.append(cmd),
+    )
+
+    get_backend().pull("registry.example.com/team/app:1.0")
+
+    assert calls == [["docker", "pull", "registry.example.com/team/app:1.0"]]
+    assert ("POST", "/images/create") not in fake_engine.requests
@@ -0,0 +1,77 @@
+"""Tests for shared dependency cache volumes."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pydantic import ValidationError
+
+from branchspace.config import BranchspaceConfig
+from branchspace.config import ContainerImageConfig
+from branchspace.docker_backend import parse_size
+from branchspace.docker_caches import LABEL_CACHE
+from branchspace.docker_caches import CacheVolume
+from branchspace.docker_caches import cache_volume_name
+from branchspace.docker_caches import format_size
+from branchspace.docker_caches import list_caches
+from branchspace.docker_caches import prune_caches
+from branchspace.docker_labels import LABEL_REPO
+from branchspace.docker_labels import repo_label
+from branchspace.docker_shell import run_docker_shell
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_shell_mounts_labelled_cache_volumes(tmp_path: Path, monkeypatch, fake_engine, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    runs = []
+    monkeypatch.setattr(
+        "branchspace.docker_shell.run_commands", lambda cmds, *_a, **_kw: runs.extend(cmds)
+    )
+    config = BranchspaceConfig(
+        containerConfig=ContainerImageConfig(image="python:3.14", pullPolicy="never"),
+        cacheMounts={"pip": "/root/.cache/pip", "npm": "/root/.npm"},
+    )
+
+    run_docker_shell(config, repo)
+
+    pip = cache_volume_name(repo_label(repo), "pip")
+    assert f"type=volume,src={pip},dst=/root/.cache/pip" in runs[0]
+    assert fake_engine.volumes[pip]["Labels"] == {LABEL_REPO: repo_label(repo), LABEL_CACHE: "pip"}
+    assert len(fake_engine.volumes) == 2
+
+
+def test_list_and_prune_caches(tmp_path: Path, fake_engine, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    other = init_repo(tmp_path / "other")
+    for root, name in ((repo, "pip"), (repo, "cargo"), (other, "pip")):
+        volume = cache_volume_name(repo_label(root), name)
+        fake_engine.add_volume(volume, labels={LABEL_REPO: repo_label(root), LABEL_CACHE: name})
+    fake_engine.volumes[cache_volume_name(repo_label(repo), "pip")]["Size"] = 2_500_000
+
+    caches = list_caches({"pip": "/root/.cache/pip"}, repo)
+
+    assert [(cache.name, cache.path, cache.size) for cache in caches] == [
+        ("cargo", None, None),
+        ("pip", "/root/.cache/pip", 2_500_000),
+    ]
+    assert prune_caches(caches) == []
+    assert list(fake_engine.volumes) == [cache_volume_name(repo_label(other), "pip")]
+    assert prune_caches([CacheVolume("pip", "gone", None, None)])[0].volume == "gone"
+
+
+def test_cache_mounts_validation_and_sizes():
+    with pytest.raises(ValidationError, match="must be absolute"):
+        BranchspaceConfig(cacheMounts={"pip": ".cache/pip"})
+    with pytest.raises(ValidationError, match="Invalid cache name"):
+        BranchspaceConfig(cacheMounts={"pip cache": "/root/.cache/pip"})
+
+    assert parse_size("1.5GB") == 1_500_000_000
+    assert parse_size("0B") == 0
+    assert parse_size("N/A") is None
+    assert format_size(2_500_000) == "2.5 MB"
+    assert format_size(512) == "512 B"
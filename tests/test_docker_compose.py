@@ -0,0 +1,99 @@
+"""Tests for compose-backed branch environments."""
+
+from __future__ import annotations
+
+import subprocess
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from branchspace.config import BranchspaceConfig
+from branchspace.config import ContainerComposeConfig
+from branchspace.docker_compose import ComposeProject
+from branchspace.docker_compose import compose_project_name
+from branchspace.docker_compose import list_projects
+from branchspace.docker_compose import record_project
+from branchspace.docker_purge import SCOPE_STALE
+from branchspace.docker_purge import run_docker_purge
+from branchspace.docker_shell import DockerShellError
+from branchspace.docker_shell import run_docker_shell
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class FakeCompose:
+    """Records ``docker compose`` invocations and passes everything else through."""
+
+    def __init__(self) -> None:
+        self.runs: list[list[str]] = []
+        self._run = subprocess.run
+
+    def __call__(self, cmd, *args, **kwargs):
+        if cmd[:2] != ["docker", "compose"]:
+            return self._run(cmd, *args, **kwargs)
+        self.runs.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+
+def _config() -> BranchspaceConfig:
+    return BranchspaceConfig(
+        containerConfig=ContainerComposeConfig(compose="compose.yml", service="app")
+    )
+
+
+def test_shell_starts_branch_stack_and_execs_into_service(
+    tmp_path: Path, monkeypatch, fake_engine, init_repo
+):
+    repo = init_repo(tmp_path / "repo")
+    (repo / "compose.yml").write_text("services:\n  app:\n    image: python:3.14\n")
+    compose = FakeCompose()
+    monkeypatch.setattr("branchspace.docker_compose.subprocess.run", compose)
+
+    plan = run_docker_shell(_config(), repo, command="pytest")
+
+    up, exec_command = compose.runs
+    assert plan.commands == [up, exec_command]
+    project = compose_project_name("main", repo)
+    assert project.startswith("branchspace-")
+    assert up[2:4] == ["--project-name", project]
+    assert up[-3:] == ["up", "--detach", "--wait"]
+    assert exec_command[-5:] == ["-T", "app", "bash", "-lc", "pytest"]
+    assert [project.name for project in list_projects(repo)] == [project]
+    # Branches get their own projects, so their stacks run side by side, and
+    # so does the same branch of another repository
+    assert compose_project_name("Feature/Login.v2", repo).endswith("-feature-login-v2")
+    other = init_repo(tmp_path / "other")
+    assert compose_project_name("main", other) != project
+
+    (repo / "compose.yml").unlink()
+    with pytest.raises(DockerShellError, match="not found"):
+        run_docker_shell(_config(), repo)
+
+
+def test_purge_takes_stale_projects_down(tmp_path: Path, monkeypatch, fake_engine, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    live = ComposeProject("branchspace-main", "main", str(repo.resolve()), "")
+    gone = ComposeProject("branchspace-gone", "gone", str(repo.resolve()), "")
+    for project in (live, gone):
+        record_project(repo, project)
+    compose = FakeCompose()
+    monkeypatch.setattr("branchspace.docker_compose.subprocess.run", compose)
+
+    resources = run_docker_purge(worktree_path=repo, force=True, scope=SCOPE_STALE)
+
+    assert resources.projects == [gone]
+    assert compose.runs == [
+        [
+            "docker",
+            "compose",
+            "--project-name",
+            "branchspace-gone",
+            "down",
+            "--volumes",
+            "--remove-orphans",
+        ]
+    ]
+    assert list_projects(repo) == [live]
@@ -0,0 +1,90 @@
+"""Tests for Docker build context digests."""
+
+from __future__ import annotations
+
+import subprocess
+
+from typing import TYPE_CHECKING
+
+from branchspace.docker_context import context_digest
+from branchspace.docker_context import is_excluded
+from branchspace.docker_context import iter_context_files
+from branchspace.docker_context import parse_dockerignore
+from branchspace.docker_shell import build_image_tag
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_dockerignore_patterns_follow_docker_semantics():
+    rules = parse_dockerignore(
+        "# comment\nnode_modules\n**/*.log\n!keep.log\n/build/\ndocs/[a-c]*.md\n"
+    )
+
+    assert is_excluded("node_modules", rules)
+    assert is_excluded("node_modules/pkg/index.js", rules)
+    assert is_excluded("app/debug.log", rules)
+    assert is_excluded("debug.log", rules)
+    assert not is_excluded("keep.log", rules)
+    assert is_excluded("build/out.o", rules)
+    assert is_excluded("docs/about.md", rules)
+    assert not is_excluded("docs/guide.md", rules)
+    assert not is_excluded("src/main.py", rules)
+
+
+def test_iter_context_files_skips_ignored_directories(tmp_path: Path):
+    (tmp_path / ".dockerignore").write_text("node_modules\n")
+    (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules" / "pkg" / "index.js").write_text("x")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("print()")
+
+    assert iter_context_files(tmp_path, parse_dockerignore("node_modules\n")) == [
+        ".dockerignore",
+        "src/",
+        "src/app.py",
+    ]
+
+
+def _make_context(path: Path, source: str) -> Path:
+    path.mkdir()
+    (path / "Dockerfile").write_text("FROM python:3.14\nCOPY . /app\n")
+    (path / ".dockerignore").write_text("*.log\n")
+    (path / "app.py").write_text(source)
+    return path
+
+
+def test_context_digest_depends_only_on_build_inputs(tmp_path: Path):
+    one = _make_context(tmp_path / "one", "print(1)")
+    two = _make_context(tmp_path / "two", "print(1)")
+    (two / "debug.log").write_text("ignored")
+
+    assert context_digest(one, one / "Dockerfile") == context_digest(two, two / "Dockerfile")
+
+    (two / "app.py").write_text("print(2)")
+    assert context_digest(one, one / "Dockerfile") != context_digest(two, two / "Dockerfile")
+
+
+def test_worktrees_with_identical_content_share_a_tag(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    (repo / "Dockerfile").write_text("FROM python:3.14\nCOPY . /app\n")
+    (repo / "app.py").write_text("print(1)")
+    for args in (["add", "."], ["commit", "-m", "app"]):
+        subprocess.run(["git", *args], cwd=repo, capture_output=True, check=True)
+    worktrees = [tmp_path / "one", tmp_path / "two"]
+    for worktree in worktrees:
+        subprocess.run(
+            ["git", "worktree", "add", "-b", worktree.name, str(worktree)],
+            cwd=repo,
+            capture_output=True,
+            check=True,
+        )
+
+    tags = {build_image_tag(context_digest(path, path / "Dockerfile")) for path in worktrees}
+    # Branchspace state inside the main worktree's .git must not count either
+    (repo / ".git" / "branchspace").mkdir(exist_ok=True)
+    (repo / ".git" / "branchspace" / "index.json").write_text("{}")
+
+    assert len(tags) == 1
+    assert tags == {build_image_tag(context_digest(repo, repo / "Dockerfile"))}
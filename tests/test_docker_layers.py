@@ -0,0 +1,77 @@
+"""Tests for layer reuse between branch images."""
+
+from __future__ import annotations
+
+import subprocess
+
+from typing import TYPE_CHECKING
+
+from branchspace.config import BranchspaceConfig
+from branchspace.config import ContainerBuildConfig
+from branchspace.docker_layers import LayerCacheStats
+from branchspace.docker_layers import branch_image
+from branchspace.docker_layers import count_cached_layers
+from branchspace.docker_layers import run_build
+from branchspace.docker_shell import build_docker_commands
+from branchspace.docker_shell import run_commands
+from branchspace.worktree_index import record_worktree
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_count_cached_layers_from_plain_progress():
+    output = """\
+#1 [internal] load build definition from Dockerfile
+#1 DONE 0.0s
+#4 [1/4] FROM docker.io/library/python:3.14@sha256:abc
+#4 CACHED
+#5 [2/4] RUN pip install poetry
+#5 CACHED
+#6 [builder 3/4] COPY . .
+#6 DONE 0.1s
+#7 [4/4] RUN poetry install
+#7 0.512 Installing dependencies
+#7 DONE 12.3s
+#8 exporting to image
+"""
+
+    assert count_cached_layers(output.splitlines()) == LayerCacheStats(cached=2, total=4)
+
+
+def test_build_uses_source_branch_image_as_cache(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    (repo / "Dockerfile").write_text("FROM python:3.14\nRUN pip install poetry\n")
+    present = {"branchspace-build:main"}
+    monkeypatch.setattr("branchspace.docker_shell.image_exists", present.__contains__)
+    record_worktree(repo, "main", repo)
+    record_worktree(repo, "feature", tmp_path / "feature", source_branch="main")
+    config = BranchspaceConfig(containerConfig=ContainerBuildConfig(context="."))
+
+    first = build_docker_commands(config, "feature", repo)
+    assert "--cache-from" not in first.commands[0]
+
+    # Once main has run its image, branches created from it build on its layers
+    run_commands([], repo, built_image="branchspace-build:main", branch="main")
+    second = build_docker_commands(config, "feature", repo)
+
+    build = second.commands[0]
+    assert build[build.index("--cache-from") + 1] == "branchspace-build:main"
+    assert branch_image(repo, "main") == "branchspace-build:main"
+    assert branch_image(repo, "feature") is None
+
+
+def test_build_falls_back_to_legacy_builder_without_buildx(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append((cmd, kwargs.get("env", {}).get("DOCKER_BUILDKIT")))
+        return subprocess.CompletedProcess(cmd, 1 if cmd[1] == "buildx" else 0)
+
+    monkeypatch.setattr("branchspace.docker_layers.subprocess.run", fake_run)
+
+    stats = run_build(["docker", "build", "--progress=plain", "-t", "app", "."])
+
+    assert stats == LayerCacheStats(cached=0, total=0)
+    assert calls[1:] == [(["docker", "build", "-t", "app", "."], "0")]
@@ -0,0 +1,89 @@
+"""Tests for per-path mount strategies."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pydantic import ValidationError
+
+from branchspace.config import BranchspaceConfig
+from branchspace.config import ContainerImageConfig
+from branchspace.docker_caches import cache_volume_name
+from branchspace.docker_labels import repo_label
+from branchspace.docker_labels import resource_labels
+from branchspace.docker_mounts import LABEL_MOUNT
+from branchspace.docker_mounts import mount_volume_name
+from branchspace.docker_purge import run_docker_purge
+from branchspace.docker_shell import run_docker_shell
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_shell_mounts_paths_by_strategy_and_purge_removes_overlays(
+    tmp_path: Path, monkeypatch, fake_engine, init_repo
+):
+    repo = init_repo(tmp_path / "repo")
+    (repo / "src").mkdir()
+    runs = []
+    monkeypatch.setattr(
+        "branchspace.docker_shell.run_commands", lambda cmds, *_a, **_kw: runs.extend(cmds)
+    )
+    config = BranchspaceConfig(
+        containerConfig=ContainerImageConfig(image="python:3.14", pullPolicy="never"),
+        cacheMounts={"pip": "/root/.cache/pip"},
+        containerMounts={
+            "./node_modules/": "volume",
+            "tmp": "tmpfs",
+            "src": "readonly",
+            "docs": "readonly",
+        },
+    )
+
+    run_docker_shell(config, repo)
+
+    overlay = mount_volume_name(repo_label(repo), "main", "node_modules")
+    mounts = [arg for arg in runs[0] if arg.startswith("type=")]
+    assert mounts[1:] == [
+        f"type=volume,src={overlay},dst=/workspace/node_modules",
+        "type=tmpfs,dst=/workspace/tmp",
+        f"type=bind,src={repo / 'src'},dst=/workspace/src,readonly",
+    ]
+    assert fake_engine.volumes[overlay]["Labels"] == {
+        **resource_labels("main", repo),
+        LABEL_MOUNT: "node_modules",
+    }
+
+    resources = run_docker_purge(worktree_path=repo, force=True)
+
+    # Overlays belong to the branch; shared caches outlive it
+    assert resources.volumes == [overlay]
+    assert list(fake_engine.volumes) == [cache_volume_name(repo_label(repo), "pip")]
+
+
+def test_container_mounts_validation():
+    with pytest.raises(ValidationError, match="must be relative"):
+        BranchspaceConfig(containerMounts={"/node_modules": "volume"})
+    with pytest.raises(ValidationError, match="must be relative"):
+        BranchspaceConfig(containerMounts={"../shared": "tmpfs"})
+    with pytest.raises(ValidationError):
+        BranchspaceConfig(containerMounts={"target": "nfs"})
+
+    name = mount_volume_name("/repo/.git", "feature/x", ".venv")
+    assert name.startswith("branchspace-mount-")
+    assert "-feature-x-.venv-" in name
+    # Branches and paths that sanitize alike still get their own overlay
+    names = {
+        mount_volume_name("/repo/.git", branch, path)
+        for branch, path in [
+            ("feature/x", ".venv"),
+            ("feature-x", ".venv"),
+            ("a/b", "c"),
+            ("a-b", "c"),
+            ("a", "b-c"),
+        ]
+    }
+    assert len(names) == 5
@@ -0,0 +1,133 @@
+"""Tests for persistent branch containers."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import time
+
+from typing import TYPE_CHECKING
+
+from branchspace.config import BranchspaceConfig
+from branchspace.config import ContainerImageConfig
+from branchspace.docker_persistent import ensure_container
+from branchspace.docker_persistent import exec_in_container
+from branchspace.docker_persistent import reap_idle
+from branchspace.docker_shell import build_container_name
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class FakeRun:
+    """Records the ``docker`` commands still run as processes.
+
+    ``docker run -d`` adds the container to the fake engine, as the daemon would.
+    """
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+        self.calls: list[list[str]] = []
+
+    def __call__(self, args, **_kwargs):
+        self.calls.append(list(args))
+        if args[1] == "run":
+            self.engine.add_container(args[args.index("--name") + 1], image=args[-4])
+        return subprocess.CompletedProcess(args, 0, "", "")
+
+
+def _config() -> BranchspaceConfig:
+    return BranchspaceConfig(
+        containerConfig=ContainerImageConfig(image="python:3.14", pullPolicy="never"),
+        containerMode="persistent",
+    )
+
+
+def test_exec_reuses_running_container(tmp_path: Path, monkeypatch, fake_engine, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    name = build_container_name("feature", repo)
+    fake_engine.add_container(name, image="python:3.14")
+    run = FakeRun(fake_engine)
+    spawned = []
+    monkeypatch.setattr("branchspace.docker_persistent.subprocess.run", run)
+    monkeypatch.setattr(
+        "branchspace.docker_persistent.spawn_module", lambda *args, **_kw: spawned.append(args)
+    )
+
+    plan = exec_in_container(_config(), "feature", repo, command="pytest -q")
+
+    assert [call[1] for call in run.calls] == ["exec"]
+    assert plan.commands[0][-4:] == [name, "bash", "-lc", "pytest -q"]
+    assert spawned[0][1:] == ("reap", str(repo), name, "1800.0")
+    containers = repo / ".git" / "branchspace" / "containers"
+    assert (containers / f"{name}.used").exists()
+    assert not list(containers.glob("*.session"))
+
+
+def test_exec_recreates_container_from_changed_image(
+    tmp_path: Path, monkeypatch, fake_engine, init_repo
+):
+    repo = init_repo(tmp_path / "repo")
+    name = build_container_name("feature", repo)
+    old = fake_engine.add_container(name, image="python:3.13", status="exited")
+    run = FakeRun(fake_engine)
+    monkeypatch.setattr("branchspace.docker_persistent.subprocess.run", run)
+    monkeypatch.setattr("branchspace.docker_persistent.spawn_module", lambda *_a, **_kw: None)
+
+    exec_in_container(_config(), "feature", repo)
+
+    assert [call[1] for call in run.calls] == ["run", "exec"]
+    assert run.calls[0][2:4] == ["-d", "--init"]
+    assert old not in fake_engine.containers
+    assert [e["Cmd"] for e in fake_engine.execs.values()] == [["true"]]
+
+
+def test_running_container_with_stale_image_is_recreated(
+    tmp_path: Path, monkeypatch, fake_engine, init_repo
+):
+    repo = init_repo(tmp_path / "repo")
+    name = build_container_name("feature", repo)
+    old = fake_engine.add_container(name, image="python:3.13")
+    run = FakeRun(fake_engine)
+    monkeypatch.setattr("branchspace.docker_persistent.subprocess.run", run)
+
+    assert ensure_container(_config(), "feature", repo) == name
+
+    assert [call[1] for call in run.calls] == ["run"]
+    assert old not in fake_engine.containers
+    assert fake_engine.find_container(name)["Image"] == "python:3.14"
+
+
+def test_same_branch_of_another_repository_gets_its_own_container(
+    tmp_path: Path, monkeypatch, fake_engine, init_repo
+):
+    repo = init_repo(tmp_path / "repo")
+    other = init_repo(tmp_path / "other")
+    theirs = fake_engine.add_container(build_container_name("main", other), image="python:3.14")
+    run = FakeRun(fake_engine)
+    monkeypatch.setattr("branchspace.docker_persistent.subprocess.run", run)
+
+    name = ensure_container(_config(), "main", repo)
+
+    assert name != build_container_name("main", other)
+    assert [call[1] for call in run.calls] == ["run"]
+    assert theirs in fake_engine.containers
+
+
+def test_reap_idle_stops_idle_container(tmp_path: Path, fake_engine, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    fake_engine.add_container("branchspace-feature", image="python:3.14")
+    containers = repo / ".git" / "branchspace" / "containers"
+    containers.mkdir(parents=True)
+    stamp = containers / "branchspace-feature.used"
+    stamp.touch()
+    old = time.time() - 120
+    os.utime(stamp, (old, old))
+    # A marker left by a process that no longer exists does not keep it alive
+    (containers / "branchspace-feature.999999999.session").touch()
+
+    assert reap_idle(repo, "branchspace-feature", 60.0)
+    assert fake_engine.find_container("branchspace-feature")["Status"] == "exited"
+    assert ("POST", "/containers/branchspace-feature/stop") in fake_engine.requests
+    assert not list(containers.glob("*.session"))
@@ -0,0 +1,62 @@
+"""Tests for image pull policies."""
+
+from __future__ import annotations
+
+import time
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pydantic import ValidationError
+
+from branchspace.config import ContainerImageConfig
+from branchspace.config_validation import parse_duration
+from branchspace.docker_pull import needs_pull
+from branchspace.docker_pull import record_pull
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_parse_duration():
+    assert parse_duration("90") == 90
+    assert parse_duration("30m") == 1800
+    assert parse_duration("1h30m") == 5400
+    assert parse_duration("7d") == 604800
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+
+def test_pull_policy_is_validated():
+    assert ContainerImageConfig(image="python:3.14").pull_policy == "always"
+    assert ContainerImageConfig(image="python:3.14", pullPolicy="ttl:12h").pull_policy == "ttl:12h"
+    with pytest.raises(ValidationError):
+        ContainerImageConfig(image="python:3.14", pullPolicy="sometimes")
+    with pytest.raises(ValidationError):
+        ContainerImageConfig(image="python:3.14", pullPolicy="ttl:")
+
+
+def test_needs_pull_follows_policy(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+
+    def present(_image):
+        return True
+
+    def absent(_image):
+        return False
+
+    assert needs_pull("always", "python:3.14", repo, present)
+    assert not needs_pull("never", "python:3.14", repo, absent)
+    assert needs_pull("missing", "python:3.14", repo, absent)
+    assert not needs_pull("missing", "python:3.14", repo, present)
+
+    assert needs_pull("ttl:1h", "python:3.14", repo, present)
+    record_pull(repo, "python:3.14")
+    assert not needs_pull("ttl:1h", "python:3.14", repo, present)
+    assert needs_pull("ttl:1h", "python:3.14", repo, absent)
+
+    later = time.time() + 7200
+    monkeypatch.setattr("branchspace.docker_pull.time.time", lambda: later)
+    assert needs_pull("ttl:1h", "python:3.14", repo, present)
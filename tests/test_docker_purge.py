@@ -2,16 +2,87 @@
 
 from __future__ import annotations
 
+import subprocess
+
+from typing import TYPE_CHECKING
+
+from branchspace.docker_labels import LABEL_REPO
+from branchspace.docker_labels import LABEL_WORKTREE
+from branchspace.docker_labels import repo_label
+from branchspace.docker_labels import resource_labels
+from branchspace.docker_layers import record_branch_image
+from branchspace.docker_purge import SCOPE_ALL
+from branchspace.docker_purge import SCOPE_STALE
 from branchspace.docker_purge import DockerResources
 from branchspace.docker_purge import discover_resources
+from branchspace.docker_purge import run_docker_purge
+from branchspace.git_utils import create_worktree
 
 
-def test_discover_resources_empty(monkeypatch):
-    monkeypatch.setattr(
-        "branchspace.docker_purge._list_docker_ids",
-        lambda _args: [],
-    )
+if TYPE_CHECKING:
+    from pathlib import Path
+
 
-    resources = discover_resources("branchspace-main")
+def test_discover_resources_empty(fake_engine):
+    resources = discover_resources([f"{LABEL_REPO}=/repo/.git"])
 
     assert resources == DockerResources(containers=[], images=[], volumes=[])
+
+
+def test_purge_current_branch_by_label(tmp_path: Path, fake_engine, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    other = init_repo(tmp_path / "other")
+    main = fake_engine.add_container("branchspace-main", labels=resource_labels("main", repo))
+    fake_engine.add_container("branchspace-feature", labels=resource_labels("feature", repo))
+    fake_engine.add_container("branchspace-main-2", labels=resource_labels("main", other))
+    volume = fake_engine.add_volume("cache", labels=resource_labels("main", repo))
+
+    resources = run_docker_purge(worktree_path=repo, force=True)
+
+    assert resources == DockerResources(containers=[main], images=[], volumes=[volume])
+    assert [c["Name"] for c in fake_engine.containers.values()] == [
+        "branchspace-feature",
+        "branchspace-main-2",
+    ]
+    assert not fake_engine.volumes
+    # Discovery is one query per resource kind on a single connection
+    assert [path for _method, path in fake_engine.requests[1:4]] == [
+        "/containers/json",
+        "/images/json",
+        "/volumes",
+    ]
+
+
+def test_purge_all_and_stale(tmp_path: Path, fake_engine, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    worktree = tmp_path / "wt" / "feature"
+    create_worktree(worktree, "feature", repository_path=repo)
+    subprocess.run(["git", "branch", "old"], cwd=repo, capture_output=True, check=True)
+    fake_engine.add_container("branchspace-main", labels=resource_labels("main", repo))
+    fake_engine.add_container("branchspace-feature", labels=resource_labels("feature", worktree))
+    gone_branch = fake_engine.add_container(
+        "branchspace-gone", labels=resource_labels("gone", worktree)
+    )
+    removed_worktree = {
+        **resource_labels("old", repo),
+        LABEL_WORKTREE: str(tmp_path / "wt" / "old"),
+    }
+    gone_worktree = fake_engine.add_container("branchspace-old", labels=removed_worktree)
+    # A worktree moved since its container was made still owns it
+    moved = {**resource_labels("feature", repo), LABEL_WORKTREE: str(tmp_path / "elsewhere")}
+    fake_engine.add_container("branchspace-feature-moved", labels=moved)
+    image = fake_engine.add_image("branchspace-build:abc", labels={LABEL_REPO: repo_label(repo)})
+    unused = fake_engine.add_image("branchspace-build:old", labels={LABEL_REPO: repo_label(repo)})
+    record_branch_image(repo, "feature", "branchspace-build:abc")
+    record_branch_image(repo, "old", "branchspace-build:old")
+
+    stale = run_docker_purge(worktree_path=repo, scope=SCOPE_STALE, dry_run=True)
+    everything = run_docker_purge(worktree_path=worktree, scope=SCOPE_ALL, force=True)
+
+    assert stale == DockerResources(
+        containers=[gone_branch, gone_worktree], images=[unused], volumes=[]
+    )
+    assert len(everything.containers) == 5
+    assert everything.images == [image, unused]
+    assert not fake_engine.containers
+    assert not fake_engine.images
@@ -4,9 +4,12 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pytest
+
 from branchspace.config import BranchspaceConfig
 from branchspace.config import ContainerBuildConfig
 from branchspace.config import ContainerImageConfig
+from branchspace.docker_shell import DockerShellError
 from branchspace.docker_shell import build_docker_commands
 
 
@@ -17,11 +20,55 @@ def test_build_docker_commands_image_config():
     assert plan.commands[0] == ["docker", "pull", "python:3.14"]
     assert "docker" in plan.commands[1][0]
     assert "python:3.14" in plan.commands[1]
+    assert plan.pulled_image == "python:3.14"
 
 
-def test_build_docker_commands_build_config():
-    config = BranchspaceConfig(containerConfig=ContainerBuildConfig(context="."))
+def test_build_docker_commands_skips_pull_for_present_image(monkeypatch):
+    monkeypatch.setattr("branchspace.docker_shell.image_exists", lambda _image: True)
+    config = BranchspaceConfig(
+        containerConfig=ContainerImageConfig(image="python:3.14", pullPolicy="missing")
+    )
     plan = build_docker_commands(config, "feature", Path("/repo"))
 
-    assert plan.commands[0][0:3] == ["docker", "build", "-t"]
+    assert [command[1] for command in plan.commands] == ["run"]
+    assert plan.pulled_image is None
+
+
+def test_build_docker_commands_build_config(tmp_path: Path, monkeypatch):
+    (tmp_path / "Dockerfile").write_text("FROM python:3.14\n")
+    monkeypatch.setattr("branchspace.docker_shell.image_exists", lambda _image: False)
+    config = BranchspaceConfig(containerConfig=ContainerBuildConfig(context="."))
+    plan = build_docker_commands(config, "feature", tmp_path)
+
+    build = plan.commands[0]
+    tag = build[build.index("-t") + 1]
+    assert build[0:2] == ["docker", "build"]
+    assert tag.startswith("branchspace-build:")
+    assert "BUILDKIT_INLINE_CACHE=1" in build
+    assert "--cache-from" not in build
     assert plan.commands[1][0:2] == ["docker", "run"]
+    assert tag in plan.commands[1]
+    assert plan.built_image == tag
+    assert "dev.branchspace.branch=feature" in plan.commands[1]
+    assert not any(arg.startswith("dev.branchspace.branch=") for arg in plan.commands[0])
+
+
+def test_build_docker_commands_shares_existing_image(tmp_path: Path, monkeypatch):
+    for branch in ("one", "two"):
+        (tmp_path / branch).mkdir()
+        (tmp_path / branch / "Dockerfile").write_text("FROM python:3.14\n")
+    monkeypatch.setattr("branchspace.docker_shell.image_exists", lambda _image: True)
+    config = BranchspaceConfig(containerConfig=ContainerBuildConfig(context="."))
+
+    first = build_docker_commands(config, "one", tmp_path / "one")
+    second = build_docker_commands(config, "two", tmp_path / "two")
+
+    assert [command[1] for command in first.commands] == ["run"]
+    assert first.commands[0][-2] == second.commands[0][-2]
+
+
+def test_build_docker_commands_missing_dockerfile(tmp_path: Path):
+    config = BranchspaceConfig(containerConfig=ContainerBuildConfig(context="."))
+
+    with pytest.raises(DockerShellError):
+        build_docker_commands(config, "feature", tmp_path)
@@ -0,0 +1,192 @@
+"""Tests for container setup snapshots."""
+
+from __future__ import annotations
+
+import io
+import subprocess
+import tarfile
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from branchspace.config import BranchspaceConfig
+from branchspace.config import ContainerImageConfig
+from branchspace.config import ContainerSetupConfig
+from branchspace.docker_labels import LABEL_REPO
+from branchspace.docker_labels import repo_label
+from branchspace.docker_mounts import LABEL_SEED
+from branchspace.docker_mounts import mount_volume_name
+from branchspace.docker_shell import run_docker_shell
+from branchspace.docker_snapshots import LABEL_SNAPSHOT
+from branchspace.docker_snapshots import DockerSnapshotError
+from branchspace.docker_snapshots import ensure_snapshot
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class FakeDocker:
+    """Stands in for ``docker run``, leaving the setup container in the engine."""
+
+    def __init__(self, fake_engine, returncode: int = 0) -> None:
+        self.fake_engine = fake_engine
+        self.returncode = returncode
+        self.runs: list[list[str]] = []
+        self.inputs: list[bytes | None] = []
+        self._run = subprocess.run
+
+    def __call__(self, cmd, *args, **kwargs):
+        if cmd[0] != "docker":
+            return self._run(cmd, *args, **kwargs)
+        self.runs.append(cmd)
+        self.inputs.append(kwargs.get("input"))
+        if "--name" in cmd:
+            self.fake_engine.add_container(cmd[cmd.index("--name") + 1], "", status="exited")
+        if self.returncode:
+            raise subprocess.CalledProcessError(self.returncode, cmd)
+        return subprocess.CompletedProcess(cmd, 0)
+
+
+def _config(keep: int = 3) -> BranchspaceConfig:
+    return BranchspaceConfig(
+        containerConfig=ContainerImageConfig(image="python:3.14", pullPolicy="never"),
+        containerSetup=ContainerSetupConfig(
+            commands=["pip install -r requirements.txt"],
+            lockfiles=["requirements.txt"],
+            keep=keep,
+        ),
+    )
+
+
+def test_snapshot_is_shared_per_lockfile_and_collected(
+    tmp_path: Path, monkeypatch, fake_engine, init_repo
+):
+    repo = init_repo(tmp_path / "repo")
+    feature = tmp_path / "feature"
+    subprocess.run(
+        ["git", "worktree", "add", "-b", "feature", str(feature)],
+        cwd=repo,
+        capture_output=True,
+        check=True,
+    )
+    for root in (repo, feature):
+        (root / "requirements.txt").write_text("rich==13.0\n")
+    fake_engine.add_image("python:3.14")
+    docker = FakeDocker(fake_engine)
+    monkeypatch.setattr("branchspace.docker_snapshots.subprocess.run", docker)
+    config = _config(keep=1)
+
+    first = ensure_snapshot(config, "python:3.14", repo)
+    assert ensure_snapshot(config, "python:3.14", feature) == first
+    assert len(docker.runs) == 1
+    assert docker.runs[0][-3:] == ["bash", "-lc", "tar -xf - && pip install -r requirements.txt"]
+    assert fake_engine.find_image(first)["Labels"] == {
+        LABEL_REPO: repo_label(repo),
+        LABEL_SNAPSHOT: first,
+    }
+    # The setup container is committed, then removed
+    assert fake_engine.containers == {}
+
+    (feature / "requirements.txt").write_text("rich==14.0\n")
+    second = ensure_snapshot(config, "python:3.14", feature)
+
+    assert second != first
+    assert len(docker.runs) == 2
+    assert fake_engine.find_image(first) is None
+    assert fake_engine.find_image(second) is not None
+
+
+def test_failed_setup_raises_and_cleans_up(tmp_path: Path, monkeypatch, fake_engine, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    fake_engine.add_image("python:3.14")
+    monkeypatch.setattr(
+        "branchspace.docker_snapshots.subprocess.run", FakeDocker(fake_engine, returncode=2)
+    )
+
+    with pytest.raises(DockerSnapshotError, match="exit code 2"):
+        ensure_snapshot(_config(), "python:3.14", repo)
+    with pytest.raises(DockerSnapshotError, match="not available"):
+        ensure_snapshot(_config(), "python:3.15", repo)
+
+    assert fake_engine.containers == {}
+    assert len(fake_engine.images) == 1
+
+
+def test_shell_runs_in_snapshot(tmp_path: Path, monkeypatch, fake_engine, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    fake_engine.add_image("python:3.14")
+    docker = FakeDocker(fake_engine)
+    monkeypatch.setattr("branchspace.docker_snapshots.subprocess.run", docker)
+
+    plan = run_docker_shell(_config(), repo)
+
+    setup, shell = docker.runs
+    snapshot = fake_engine.find_image(plan.commands[0][plan.commands[0].index("bash") - 1])
+    assert snapshot is not None
+    assert shell == plan.commands[0]
+    assert shell[:4] == ["docker", "run", "--rm", "-it"]
+    assert "--rm" not in setup
+
+
+def test_setup_gets_lockfiles_without_mounting_worktree(
+    tmp_path: Path, monkeypatch, fake_engine, init_repo
+):
+    repo = init_repo(tmp_path / "repo")
+    (repo / "requirements.txt").write_text("rich==13.0\n")
+    fake_engine.add_image("python:3.14")
+    docker = FakeDocker(fake_engine)
+    monkeypatch.setattr("branchspace.docker_snapshots.subprocess.run", docker)
+
+    ensure_snapshot(_config(), "python:3.14", repo)
+
+    (setup,) = docker.runs
+    assert "-v" not in setup
+    assert not any(arg.endswith(":/workspace") for arg in setup)
+    with tarfile.open(fileobj=io.BytesIO(docker.inputs[0])) as archive:
+        assert archive.getnames() == ["requirements.txt"]
+        member = archive.extractfile("requirements.txt")
+        assert member is not None
+        assert member.read() == b"rich==13.0\n"
+
+
+def test_overlay_volumes_are_refilled_from_a_new_snapshot(
+    tmp_path: Path, monkeypatch, fake_engine, init_repo
+):
+    repo = init_repo(tmp_path / "repo")
+    (repo / "requirements.txt").write_text("rich==13.0\n")
+    fake_engine.add_image("python:3.14")
+    docker = FakeDocker(fake_engine)
+    monkeypatch.setattr("branchspace.docker_snapshots.subprocess.run", docker)
+    config = _config().model_copy(update={"container_mounts": {".venv": "volume"}})
+    volume = mount_volume_name(repo_label(repo), "main", ".venv")
+
+    run_docker_shell(config, repo)
+    first = fake_engine.volumes[volume]["Labels"][LABEL_SEED]
+    run_docker_shell(config, repo)
+    assert fake_engine.volumes[volume]["Labels"][LABEL_SEED] == first
+    assert ("DELETE", f"/volumes/{volume}") not in fake_engine.requests
+
+    (repo / "requirements.txt").write_text("rich==14.0\n")
+    run_docker_shell(config, repo)
+
+    second = fake_engine.volumes[volume]["Labels"][LABEL_SEED]
+    assert second != first
+    assert fake_engine.find_image(second) is not None
+    assert ("DELETE", f"/volumes/{volume}") in fake_engine.requests
+
+
+def test_snapshots_are_not_shared_between_repositories(
+    tmp_path: Path, monkeypatch, fake_engine, init_repo
+):
+    repos = [init_repo(tmp_path / name) for name in ("one", "two")]
+    for repo in repos:
+        (repo / "requirements.txt").write_text("rich==13.0\n")
+    fake_engine.add_image("python:3.14")
+    monkeypatch.setattr("branchspace.docker_snapshots.subprocess.run", FakeDocker(fake_engine))
+
+    tags = [ensure_snapshot(_config(keep=1), "python:3.14", repo) for repo in repos]
+
+    assert tags[0] != tags[1]
+    assert all(fake_engine.find_image(tag) is not None for tag in tags)
@@ -0,0 +1,94 @@
+"""Tests for ranked fuzzy branch matching."""
+
+from __future__ import annotations
+
+import os
+import random
+import time
+
+from branchspace.fuzzy import FuzzyIndex
+from branchspace.fuzzy import resolve_match
+
+
+# Wall-clock budget for ranking 10k names, checked only when set; see
+# benchmarks/bench_fuzzy.py for the timing that always runs
+_budget = os.environ.get("BRANCHSPACE_FUZZY_BUDGET_MS")
+BUDGET_MS = float(_budget) if _budget else None
+
+BRANCHES = [
+    "feature/JIRA-1234-login-timeout",
+    "feature/JIRA-1250-logout-button",
+    "bugfix/JIRA-1299-login-crash",
+    "main",
+]
+
+
+def test_rank_orders_tiers():
+    index = FuzzyIndex(BRANCHES)
+
+    assert [match.name for match in index.rank("feature/jira-12")] == [
+        "feature/JIRA-1234-login-timeout",
+        "feature/JIRA-1250-logout-button",
+    ]
+    # Segment prefix beats a scattered subsequence
+    assert index.rank("login")[0].name == "bugfix/JIRA-1299-login-crash"
+    assert index.rank("1234")[0].name == "feature/JIRA-1234-login-timeout"
+    assert [match.name for match in index.rank("fj1250")] == ["feature/JIRA-1250-logout-button"]
+    assert index.rank("nothing-like-this") == []
+
+
+def test_recent_use_breaks_ties():
+    now = time.time()
+    index = FuzzyIndex(
+        BRANCHES,
+        {
+            "feature/JIRA-1234-login-timeout": now - 30 * 24 * 3600,
+            "bugfix/JIRA-1299-login-crash": now,
+        },
+    )
+
+    assert index.rank("jira")[0].name == "bugfix/JIRA-1299-login-crash"
+
+
+def test_resolve_match_asks_only_when_ambiguous():
+    index = FuzzyIndex(BRANCHES)
+    asked: list[tuple[str, list[str]]] = []
+
+    def choose(query: str, names: list[str]) -> str | None:
+        asked.append((query, names))
+        return names[-1]
+
+    assert resolve_match("1234", index, choose) == "feature/JIRA-1234-login-timeout"
+    assert asked == []
+
+    assert resolve_match("login", index, choose) == "feature/JIRA-1234-login-timeout"
+    assert asked[0][0] == "login"
+    assert len(asked[0][1]) == 2
+
+    assert resolve_match("1234", index, None, confirm=True) is None
+
+
+def test_rank_with_limit_over_many_names():
+    rng = random.Random(0)
+    words = ["auth", "cache", "fix", "login", "docker", "shell", "index", "config", "api", "db"]
+    names = [
+        f"{rng.choice(['feature', 'bugfix', 'chore'])}/{rng.choice(words)}-{rng.choice(words)}-{i}"
+        for i in range(10_000)
+    ]
+    now = time.time()
+    index = FuzzyIndex(names, {name: now - i * 60 for i, name in enumerate(names[:500])})
+
+    for query in ("e", "fe", "auth", "fxdb", "zzz", names[42]):
+        limited = index.rank(query, 20)
+        assert len(limited) <= 20
+        if BUDGET_MS is not None:
+            elapsed = min(_timed(index.rank, query, 20) for _ in range(5))
+            assert elapsed * 1000 < BUDGET_MS, f"{query!r} took {elapsed * 1000:.1f} ms"
+    assert index.rank(names[42], 20)[0].name == names[42]
+    assert index.rank("zzz", 20) == []
+
+
+def _timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
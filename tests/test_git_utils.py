@@ -12,6 +12,7 @@ from branchspace.git_utils import BranchInfo
 from branchspace.git_utils import GitStatus
 from branchspace.git_utils import GitWorktree
 from branchspace.git_utils import create_worktree
+from branchspace.git_utils import find_repository
 from branchspace.git_utils import get_current_branch
 from branchspace.git_utils import get_git_status
 from branchspace.git_utils import get_protected_branches
@@ -138,6 +139,30 @@ class TestListWorktrees:
         assert worktrees[0].branch == "main"
 
 
+class TestFindRepository:
+    """Tests for find_repository function."""
+
+    def test_matches_git_for_linked_worktree(self, tmp_path: Path):
+        """Test resolves the worktree root and common dir of a linked worktree."""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        _init_git_repo(repo, with_commit=True)
+        worktree_path = tmp_path / "worktree1"
+        create_worktree(worktree_path, "feature-1", repo)
+        (worktree_path / "src").mkdir()
+
+        found = find_repository(worktree_path / "src")
+
+        assert found is not None
+        assert found.worktree == worktree_path.resolve()
+        assert found.common_dir == (repo / ".git").resolve()
+        assert found.git_dir.parent == found.common_dir / "worktrees"
+
+    def test_returns_none_outside_repo(self, tmp_path: Path):
+        """Test returns None when no repository encloses the path."""
+        assert find_repository(tmp_path) is None
+
+
 class TestCreateWorktree:
     """Tests for create_worktree function."""
 
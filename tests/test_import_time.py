@@ -0,0 +1,156 @@
+"""Startup-time regression tests for hot CLI paths."""
+
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+# Cumulative import budget for branchspace.main_cli; override on slow machines
+BUDGET_MS = float(os.environ.get("BRANCHSPACE_IMPORT_BUDGET_MS", "150"))
+# Wall-clock budget for a whole `cd` or completion run, beyond bare interpreter
+# startup; checked only when set, e.g. BRANCHSPACE_CD_BUDGET_MS=50 on a laptop
+_cd_budget = os.environ.get("BRANCHSPACE_CD_BUDGET_MS")
+CD_BUDGET_MS = float(_cd_budget) if _cd_budget else None
+HEAVY_MODULES = ("pydantic", "questionary", "rich")
+
+
+def _import_profile(
+    cwd: Path, args: list[str], env: dict[str, str] | None = None
+) -> dict[str, int]:
+    """Run the CLI under ``-X importtime`` and return cumulative microseconds per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "branchspace", *args],
+        cwd=cwd,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    profile: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def _loaded_heavy(profile: dict[str, int]) -> set[str]:
+    return {name.split(".")[0] for name in profile} & set(HEAVY_MODULES)
+
+
+COMPLETION_ENV = {
+    "_BRANCHSPACE_COMPLETE": "bash_complete",
+    "COMP_WORDS": "branchspace cd ",
+    "COMP_CWORD": "2",
+}
+
+
+@pytest.mark.parametrize(
+    ("args", "env"),
+    [(["cd"], None), (["prompt"], None), ([], COMPLETION_ENV)],
+    ids=["cd", "prompt", "completion"],
+)
+def test_hot_paths_skip_heavy_dependencies(tmp_path: Path, args, env, init_repo):
+    repo = init_repo(tmp_path / "repo")
+
+    profile = _import_profile(repo, args, env)
+
+    assert "branchspace.main_cli" in profile
+    assert _loaded_heavy(profile) == set()
+    assert profile["branchspace.main_cli"] / 1000 < BUDGET_MS
+
+
+def test_ls_stays_within_budget(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+
+    profile = _import_profile(repo, ["ls"])
+
+    assert "pydantic" not in _loaded_heavy(profile)
+    assert "questionary" not in _loaded_heavy(profile)
+    assert profile["branchspace.main_cli"] / 1000 < BUDGET_MS
+
+
+def test_warm_cd_prediction_skips_pydantic(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    config_path = repo / "branchspace.json"
+    config_path.write_text('{"worktreePathTemplate": "../wt/$BRANCH_NAME"}')
+    # Back-date the config so it is old enough to snapshot
+    mtime = config_path.stat().st_mtime - 60
+    os.utime(config_path, (mtime, mtime))
+    subprocess.run(
+        ["git", "worktree", "add", "-b", "feature", str(tmp_path / "wt" / "feature")],
+        cwd=repo,
+        capture_output=True,
+        check=True,
+    )
+
+    cold = _import_profile(repo, ["cd", "feature"])
+    warm = _import_profile(repo, ["cd", "feature"])
+
+    assert "pydantic" in _loaded_heavy(cold)
+    assert _loaded_heavy(warm) == set()
+
+
+def test_config_does_not_import_docker_modules():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import branchspace.config"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert "branchspace.config_validation" in result.stderr
+    assert "branchspace.docker" not in result.stderr
+
+
+def _median_run_ms(cwd: Path, command: list[str], env: dict[str, str] | None = None) -> float:
+    samples = []
+    for _ in range(7):
+        start = time.perf_counter()
+        subprocess.run(
+            command,
+            cwd=cwd,
+            env={**os.environ, **(env or {})},
+            capture_output=True,
+            check=True,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+@pytest.mark.skipif(CD_BUDGET_MS is None, reason="BRANCHSPACE_CD_BUDGET_MS is not set")
+@pytest.mark.parametrize(
+    ("args", "env"),
+    [(["cd", "feature"], None), ([], COMPLETION_ENV)],
+    ids=["cd", "completion"],
+)
+def test_hot_paths_finish_within_cd_budget(tmp_path: Path, args, env, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    subprocess.run(
+        ["git", "worktree", "add", "-b", "feature", str(tmp_path / "wt" / "feature")],
+        cwd=repo,
+        capture_output=True,
+        check=True,
+    )
+    cli = [sys.executable, "-m", "branchspace", *args]
+    # Warm the worktree index and config snapshot, as an interactive shell would have
+    _median_run_ms(repo, cli, env)
+
+    interpreter = _median_run_ms(repo, [sys.executable, "-c", "pass"])
+    elapsed = _median_run_ms(repo, cli, env) - interpreter
+
+    assert CD_BUDGET_MS is not None
+    assert elapsed < CD_BUDGET_MS, f"{' '.join(args) or 'completion'} took {elapsed:.1f} ms"
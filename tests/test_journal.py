@@ -0,0 +1,116 @@
+"""Tests for the batch operation journal."""
+
+from __future__ import annotations
+
+import subprocess
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from branchspace.config import BranchspaceConfig
+from branchspace.journal import PHASE_COPY
+from branchspace.journal import PHASE_WORKTREE
+from branchspace.journal import OperationJournal
+from branchspace.worktree_create import CreateWorktreeError
+from branchspace.worktree_create import create_worktrees
+from branchspace.worktree_create import rollback_worktrees
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _branches(repo: Path) -> set[str]:
+    result = subprocess.run(
+        ["git", "branch", "--format=%(refname:short)"],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_journal_round_trip(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+
+    journal = OperationJournal.start(repo, "create", ["a", "b"])
+    journal.record("a", path=repo / "wt-a", source_branch="main")
+    journal.checkpoint("a", PHASE_WORKTREE)
+
+    loaded = OperationJournal.load(repo, "create")
+
+    assert loaded is not None
+    assert loaded.branches == ["a", "b"]
+    assert loaded.is_done("a", PHASE_WORKTREE)
+    assert not loaded.is_done("a", PHASE_COPY)
+    assert loaded.entry("a").path == repo / "wt-a"
+
+    loaded.discard()
+    assert OperationJournal.load(repo, "create") is None
+
+
+def test_create_resume_skips_completed_phases(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    config = BranchspaceConfig(
+        worktreePathTemplate="../wt/$BRANCH_NAME",
+        worktreeCopyPatterns=[],
+        postCreateCmd=["echo ran >> marker.txt"],
+    )
+
+    failing = config.model_copy(update={"post_create_cmd": ["false"]})
+    with pytest.raises(subprocess.CalledProcessError):
+        create_worktrees(["one", "two"], failing, repo_root=repo, open_terminal=False)
+
+    with pytest.raises(CreateWorktreeError, match="--resume"):
+        create_worktrees(["three"], config, repo_root=repo, open_terminal=False)
+
+    results = create_worktrees([], config, repo_root=repo, open_terminal=False, resume=True)
+
+    assert [item.branch for item in results] == ["one", "two"]
+    assert (tmp_path / "wt" / "one" / "marker.txt").read_text() == "ran\n"
+    assert OperationJournal.load(repo, "create") is None
+
+
+def test_rollback_undoes_incomplete_creates(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    config = BranchspaceConfig(
+        worktreePathTemplate="../wt/$BRANCH_NAME",
+        worktreeCopyPatterns=[],
+        postCreateCmd=["false"],
+    )
+
+    with pytest.raises(subprocess.CalledProcessError):
+        create_worktrees(["one", "two"], config, repo_root=repo, open_terminal=False)
+
+    rolled_back = rollback_worktrees(repo)
+
+    assert [item.branch for item in rolled_back] == ["one"]
+    assert not (tmp_path / "wt" / "one").exists()
+    assert "one" not in _branches(repo)
+    assert OperationJournal.load(repo, "create") is None
+
+
+def test_rollback_tolerates_branches_already_deleted(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    config = BranchspaceConfig(
+        worktreePathTemplate="../wt/$BRANCH_NAME",
+        worktreeCopyPatterns=[],
+        postCreateCmd=["false"],
+    )
+
+    with pytest.raises(subprocess.CalledProcessError):
+        create_worktrees(["one"], config, repo_root=repo, open_terminal=False)
+    # Someone cleaned up by hand before rolling back
+    subprocess.run(
+        ["git", "worktree", "remove", "--force", str(tmp_path / "wt" / "one")],
+        cwd=repo,
+        check=True,
+    )
+    subprocess.run(["git", "branch", "-D", "one"], cwd=repo, capture_output=True, check=True)
+
+    rolled_back = rollback_worktrees(repo)
+
+    assert [item.branch for item in rolled_back] == ["one"]
+    assert OperationJournal.load(repo, "create") is None
@@ -65,7 +65,7 @@ class TestMainCli:
         runner = CliRunner()
 
         monkeypatch.setattr(
-            "branchspace.main_cli.list_worktree_statuses",
+            "branchspace.worktree_list.list_worktree_statuses",
             lambda _path=None: [],
         )
 
@@ -92,8 +92,8 @@ class TestMainCli:
         runner = CliRunner()
 
         monkeypatch.setattr(
-            "branchspace.main_cli.resolve_worktree_path",
-            lambda branch=None: type("Resolved", (), {"path": "/repo"})(),
+            "branchspace.worktree_cd.resolve_worktree_path",
+            lambda branch=None, **_kwargs: type("Resolved", (), {"path": "/repo"})(),
         )
 
         result = runner.invoke(main, ["cd"])
@@ -105,10 +105,10 @@ class TestMainCli:
         runner = CliRunner()
 
         monkeypatch.setattr(
-            "branchspace.main_cli.load_config_view",
+            "branchspace.config_display.load_config_view",
             lambda: type("View", (), {"config": BranchspaceConfig(), "config_path": None})(),
         )
-        monkeypatch.setattr("branchspace.main_cli.render_config", lambda _view: None)
+        monkeypatch.setattr("branchspace.config_display.render_config", lambda _view: None)
 
         result = runner.invoke(main, ["config"])
 
@@ -118,10 +118,12 @@ class TestMainCli:
         runner = CliRunner()
 
         monkeypatch.setattr(
-            "branchspace.main_cli.detect_shell_rc_files",
+            "branchspace.shell_integration.detect_shell_rc_files",
             list,
         )
-        monkeypatch.setattr("branchspace.main_cli.render_manual_instructions", lambda: None)
+        monkeypatch.setattr(
+            "branchspace.shell_integration.render_manual_instructions", lambda: None
+        )
 
         result = runner.invoke(main, ["shell-integration"])
 
@@ -129,8 +131,10 @@ class TestMainCli:
 
     def test_shell_invokes_docker(self, monkeypatch):
         runner = CliRunner()
-        monkeypatch.setattr("branchspace.main_cli.load_config", lambda: BranchspaceConfig())
-        monkeypatch.setattr("branchspace.main_cli.run_docker_shell", lambda *_args, **_kwargs: None)
+        monkeypatch.setattr("branchspace.config.load_config", lambda: BranchspaceConfig())
+        monkeypatch.setattr(
+            "branchspace.docker_shell.run_docker_shell", lambda *_args, **_kwargs: None
+        )
 
         result = runner.invoke(main, ["shell", "npm test"])
 
@@ -139,7 +143,7 @@ class TestMainCli:
     def test_purge_dry_run(self, monkeypatch):
         runner = CliRunner()
         monkeypatch.setattr(
-            "branchspace.main_cli.run_docker_purge",
+            "branchspace.docker_purge.run_docker_purge",
             lambda **_kwargs: type("Resources", (), {"is_empty": lambda self: True})(),
         )
 
@@ -149,7 +153,7 @@ class TestMainCli:
 
     def test_init_creates_config(self, monkeypatch):
         runner = CliRunner()
-        monkeypatch.setattr("branchspace.main_cli.init_config", lambda: "/repo/branchspace.json")
+        monkeypatch.setattr("branchspace.init_config.init_config", lambda: "/repo/branchspace.json")
 
         result = runner.invoke(main, ["init"])
 
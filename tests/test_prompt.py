@@ -0,0 +1,62 @@
+"""Tests for the cached prompt segment."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from branchspace.prompt import PROMPT_FILENAME
+from branchspace.prompt import WorktreeState
+from branchspace.prompt import cached_segment
+from branchspace.prompt import refresh_prompt
+from branchspace.prompt import render_segment
+from branchspace.state import read_state
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _fail(*_args, **_kwargs):
+    raise AssertionError("prompt reads must not run git")
+
+
+def test_render_segment_formats_fields(monkeypatch):
+    monkeypatch.delenv("BRANCHSPACE_PROMPT_FORMAT", raising=False)
+    state = WorktreeState("feature", "wt", dirty=True, container_running=True)
+
+    assert render_segment(state) == "(feature* ⬢)"
+    assert render_segment(state, "{worktree}:{branch}") == "wt:feature"
+    assert render_segment(WorktreeState("main", "wt", None, None)) == "(main?)"
+
+
+def test_cached_segment_without_cache_renders_head_and_refreshes(
+    tmp_path: Path, monkeypatch, init_repo
+):
+    repo = init_repo(tmp_path / "repo")
+    monkeypatch.delenv("BRANCHSPACE_PROMPT_FORMAT", raising=False)
+    monkeypatch.setattr("branchspace.git_utils._run_git_command", _fail)
+    spawned: list[tuple] = []
+    monkeypatch.setattr(
+        "branchspace.prompt.spawn_module", lambda *args, **_kw: spawned.append(args)
+    )
+
+    assert cached_segment(repo) == "(main?)"
+    assert spawned == [("branchspace.prompt", str(repo.resolve()))]
+
+
+def test_refresh_prompt_caches_segment_and_status(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    monkeypatch.delenv("BRANCHSPACE_PROMPT_FORMAT", raising=False)
+    (repo / "untracked.txt").write_text("x", encoding="utf-8")
+
+    state = refresh_prompt(repo)
+
+    assert state == WorktreeState("main", "repo", dirty=True, container_running=False)
+    assert (repo / ".git" / PROMPT_FILENAME).read_text(encoding="utf-8") == "(main*)\n"
+    status = read_state(repo / ".git" / "branchspace" / "status.json")
+    assert status is not None
+    assert status[str(repo.resolve())]["dirty"] is True
+
+    monkeypatch.setattr("branchspace.prompt.spawn_module", _fail)
+    monkeypatch.setattr("branchspace.git_utils._run_git_command", _fail)
+    assert cached_segment(repo) == "(main*)"
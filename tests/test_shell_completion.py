@@ -2,9 +2,26 @@
 
 from __future__ import annotations
 
+import shutil
+import subprocess
+
+from typing import TYPE_CHECKING
+
+import pytest
+
 from click.testing import CliRunner
 
+from branchspace import __version__
+from branchspace.completion import completion_script_path
+from branchspace.completion import refresh_after_upgrade
+from branchspace.completion import refresh_completion_scripts
+from branchspace.completion import write_completion_script
 from branchspace.main_cli import main
+from branchspace.shell_integration import build_bash_integration
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 
 def test_bash_completion_source():
@@ -32,3 +49,59 @@ def test_fish_completion_source():
 
     assert result.exit_code == 0
     assert "complete --no-files --command" in result.output
+
+
+def test_write_completion_script_stamps_version(tmp_path: Path):
+    path = write_completion_script("bash", config_home=tmp_path)
+
+    assert path == tmp_path / "branchspace" / "completions" / "branchspace.bash"
+    content = path.read_text()
+    assert content.startswith(f"# branchspace {__version__}\n")
+    assert "_branchspace_completion" in content
+
+
+def test_refresh_completion_scripts_regenerates_stale_only(tmp_path: Path):
+    bash_path = completion_script_path("bash", config_home=tmp_path)
+    bash_path.parent.mkdir(parents=True)
+    bash_path.write_text("# branchspace 0.0.0\nstale\n")
+
+    refresh_completion_scripts(config_home=tmp_path)
+
+    assert bash_path.read_text().startswith(f"# branchspace {__version__}\n")
+    assert not completion_script_path("zsh", config_home=tmp_path).exists()
+
+
+def test_refresh_after_upgrade_runs_once_per_version(tmp_path: Path):
+    bash_path = completion_script_path("bash", config_home=tmp_path)
+    bash_path.parent.mkdir(parents=True)
+    (bash_path.parent / ".version-0.0.0").touch()
+    bash_path.write_text("# branchspace 0.0.0\nstale\n")
+
+    refresh_after_upgrade(config_home=tmp_path)
+
+    assert bash_path.read_text().startswith(f"# branchspace {__version__}\n")
+    assert [path.name for path in bash_path.parent.glob(".version-*")] == [
+        f".version-{__version__}"
+    ]
+
+    # Until the version changes again, scripts are not even read
+    bash_path.write_text("# branchspace 0.0.0\nstale\n")
+    refresh_after_upgrade(config_home=tmp_path)
+    assert bash_path.read_text() == "# branchspace 0.0.0\nstale\n"
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not available")
+def test_bash_integration_sources_static_script(tmp_path: Path):
+    write_completion_script("bash", config_home=tmp_path)
+    script = f"{build_bash_integration()}\ncomplete -p branchspace"
+
+    result = subprocess.run(
+        [shutil.which("bash") or "bash", "-c", script],
+        env={"PATH": "/nonexistent", "HOME": str(tmp_path), "XDG_CONFIG_HOME": str(tmp_path)},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == 0
+    assert "_branchspace_completion" in result.stdout
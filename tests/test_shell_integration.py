@@ -2,16 +2,26 @@
 
 from __future__ import annotations
 
+import shutil
+import subprocess
+import time
+
 from typing import TYPE_CHECKING
 
+import pytest
+
+from branchspace.git_utils import create_worktree
 from branchspace.shell_integration import MARKER_END
 from branchspace.shell_integration import MARKER_START
+from branchspace.shell_integration import POSIX_CD_FAST_PATH
+from branchspace.shell_integration import POSIX_PROMPT
 from branchspace.shell_integration import append_integration
 from branchspace.shell_integration import build_bash_integration
 from branchspace.shell_integration import build_fish_integration
 from branchspace.shell_integration import build_shell_function
 from branchspace.shell_integration import build_zsh_integration
 from branchspace.shell_integration import has_integration
+from branchspace.worktree_index import rebuild_index
 
 
 if TYPE_CHECKING:
@@ -99,3 +109,83 @@ def test_append_integration_is_idempotent(tmp_path: Path):
     assert appended is True
     assert appended_again is False
     assert has_integration(rc_file.read_text(encoding="utf-8"))
+
+
+def _run_fast_cd(cwd: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    script = f'{POSIX_CD_FAST_PATH}\n_branchspace_cd "$@" && pwd -P'
+    return subprocess.run(
+        [shutil.which("bash") or "bash", "-c", script, "bash", *args],
+        cwd=cwd,
+        env={"PATH": "/nonexistent"},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not available")
+def test_posix_cd_fast_path_uses_index_without_branchspace(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    feature = tmp_path / "wt" / "feature"
+    create_worktree(feature, "feature", repository_path=repo)
+    rebuild_index(repo)
+    (feature / "src").mkdir()
+
+    from_worktree = _run_fast_cd(feature / "src", "main")
+    to_root = _run_fast_cd(feature / "src")
+    missing = _run_fast_cd(repo, "missing")
+
+    assert from_worktree.stdout.strip() == str(repo.resolve())
+    assert to_root.stdout.strip() == str(feature.resolve())
+    assert missing.returncode != 0
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not available")
+def test_posix_cd_fast_path_misses_on_stale_entry(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    feature = tmp_path / "wt" / "feature"
+    create_worktree(feature, "feature", repository_path=repo)
+    rebuild_index(repo)
+    shutil.rmtree(feature)
+
+    result = _run_fast_cd(repo, "feature")
+
+    assert result.returncode != 0
+    assert result.stdout == ""
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not available")
+def test_posix_prompt_reads_segment_and_refreshes_when_stale(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    calls = tmp_path / "calls"
+    fake = bin_dir / "branchspace"
+    fake.write_text(f'#!/bin/sh\necho "$@" >> {calls}\n', encoding="utf-8")
+    fake.chmod(0o755)
+    script = "\n".join(
+        [
+            POSIX_CD_FAST_PATH,
+            POSIX_PROMPT,
+            '_branchspace_prompt_update; echo "1:$BRANCHSPACE_PROMPT"',
+            "echo '(main*)' > .git/branchspace-prompt",
+            '_branchspace_prompt_update; echo "2:$BRANCHSPACE_PROMPT"',
+        ]
+    )
+
+    result = subprocess.run(
+        [shutil.which("bash") or "bash", "-c", script],
+        cwd=repo,
+        env={"PATH": f"{bin_dir}:/usr/bin:/bin"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.splitlines() == ["1:", "2:(main*)"]
+    # The refresh is detached from the shell, so give it a moment to land
+    deadline = time.monotonic() + 5
+    while not calls.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    # Only the first, cache-less render starts a refresh
+    assert calls.read_text(encoding="utf-8").splitlines() == ["prompt --refresh"]
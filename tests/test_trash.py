@@ -0,0 +1,93 @@
+"""Tests for rename-to-trash removal."""
+
+from __future__ import annotations
+
+import subprocess
+
+from typing import TYPE_CHECKING
+
+from branchspace.config import BranchspaceConfig
+from branchspace.git_utils import create_worktree
+from branchspace.git_utils import list_worktrees
+from branchspace.state import file_lock
+from branchspace.state import get_state_dir
+from branchspace.trash import REGISTRY_LOCK
+from branchspace.trash import TRASH_DIRNAME
+from branchspace.trash import move_to_trash
+from branchspace.trash import reap_trash
+from branchspace.trash import registered_trash_dirs
+from branchspace.worktree_remove import remove_worktree_for_branch
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_move_to_trash_unregisters_worktree(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    worktree = tmp_path / "wt" / "feature"
+    create_worktree(worktree, "feature", repository_path=repo)
+    (worktree / "node_modules" / "pkg").mkdir(parents=True)
+    (worktree / "node_modules" / "pkg" / "index.js").write_text("x")
+
+    trashed = move_to_trash(worktree, repo)
+
+    assert trashed is not None
+    assert trashed.parent == tmp_path / "wt" / TRASH_DIRNAME
+    assert not worktree.exists()
+    assert [wt.branch for wt in list_worktrees(repo)] == ["main"]
+
+    state_dir = get_state_dir(repo)
+    reap_trash(state_dir)
+
+    assert not (tmp_path / "wt" / TRASH_DIRNAME).exists()
+    assert registered_trash_dirs(state_dir) == []
+
+
+def test_reaper_picks_up_trash_arriving_before_it_exits(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    for branch in ("first", "late"):
+        create_worktree(tmp_path / "wt" / branch, branch, repository_path=repo)
+    move_to_trash(tmp_path / "wt" / "first", repo)
+    state_dir = get_state_dir(repo)
+    arrivals = [tmp_path / "wt" / "late"]
+
+    def trash_late_worktree(path: Path, **kwargs):
+        # Another removal lands while this reaper still holds its own lock
+        if path.name == REGISTRY_LOCK and arrivals:
+            move_to_trash(arrivals.pop(), repo)
+        return file_lock(path, **kwargs)
+
+    monkeypatch.setattr("branchspace.trash.file_lock", trash_late_worktree)
+
+    reap_trash(state_dir)
+
+    assert arrivals == []
+    assert not (tmp_path / "wt" / TRASH_DIRNAME).exists()
+    assert registered_trash_dirs(state_dir) == []
+
+
+def test_move_to_trash_skips_locked_worktree(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    worktree = tmp_path / "wt" / "feature"
+    create_worktree(worktree, "feature", repository_path=repo)
+    subprocess.run(["git", "worktree", "lock", str(worktree)], cwd=repo, check=True)
+
+    assert move_to_trash(worktree, repo) is None
+    assert worktree.is_dir()
+
+
+def test_remove_uses_trash_and_starts_reaper(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    worktree = tmp_path / "wt" / "feature"
+    create_worktree(worktree, "feature", repository_path=repo)
+    started: list[Path] = []
+    monkeypatch.setattr("branchspace.worktree_remove.start_reaper", started.append)
+    monkeypatch.setattr("branchspace.worktree_remove.has_unpushed_commits", lambda _path: False)
+
+    result = remove_worktree_for_branch("feature", BranchspaceConfig(), repo_root=repo)
+
+    assert result.removed is True
+    assert not worktree.exists()
+    assert started == [repo]
+    assert any((tmp_path / "wt" / TRASH_DIRNAME).iterdir())
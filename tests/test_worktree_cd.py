@@ -10,7 +10,9 @@ import pytest
 if TYPE_CHECKING:
     from pathlib import Path
 
+from branchspace.git_utils import create_worktree
 from branchspace.worktree_cd import WorktreeLookupError
+from branchspace.worktree_cd import predict_worktree_path
 from branchspace.worktree_cd import resolve_worktree_path
 
 
@@ -53,3 +55,49 @@ def test_resolve_worktree_path_missing_branch(tmp_path: Path, monkeypatch):
 
     with pytest.raises(WorktreeLookupError):
         resolve_worktree_path("missing")
+
+
+def _fail(*_args, **_kwargs):
+    raise AssertionError("git should not run")
+
+
+def test_predict_worktree_path_without_git(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    (repo / "branchspace.json").write_text('{"worktreePathTemplate": "../wt/$BRANCH_NAME"}')
+    create_worktree(tmp_path / "wt" / "feature", "feature", repository_path=repo)
+    monkeypatch.chdir(repo)
+    monkeypatch.setattr("branchspace.git_utils._run_git_command", _fail)
+
+    assert predict_worktree_path("feature") == repo / "../wt/feature"
+    assert predict_worktree_path("main") == repo
+
+
+def test_predict_worktree_path_rejects_foreign_worktree(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    other = init_repo(tmp_path / "other")
+    (repo / "branchspace.json").write_text('{"worktreePathTemplate": "../wt/$BRANCH_NAME"}')
+    create_worktree(tmp_path / "wt" / "feature", "feature", repository_path=other)
+    monkeypatch.chdir(repo)
+
+    assert predict_worktree_path("feature") is None
+
+
+def test_resolve_worktree_path_fuzzy_matches_branch(tmp_path: Path, monkeypatch):
+    repo_root = tmp_path / "repo"
+    repo_root.mkdir()
+    worktrees = [
+        type("WT", (), {"branch": name, "path": tmp_path / name, "detached": False})()
+        for name in ("feature/JIRA-1234-login", "feature/JIRA-1250-logout")
+    ]
+    monkeypatch.setattr("branchspace.worktree_cd.get_git_root", lambda _path=None: repo_root)
+    monkeypatch.setattr("branchspace.worktree_cd.list_worktrees", lambda _path=None: worktrees)
+
+    result = resolve_worktree_path("1234")
+
+    assert result.branch == "feature/JIRA-1234-login"
+    assert result.path == tmp_path / "feature/JIRA-1234-login"
+
+    with pytest.raises(WorktreeLookupError, match="Did you mean"):
+        resolve_worktree_path("jira")
+    chosen = resolve_worktree_path("jira", choose=lambda _query, names: names[1])
+    assert chosen.branch == "feature/JIRA-1250-logout"
@@ -33,6 +33,10 @@ def test_create_worktree_resolves_template_path(tmp_path: Path, monkeypatch):
         "branchspace.worktree_create.copy_worktree_files",
         lambda *args, **kwargs: None,
     )
+    monkeypatch.setattr(
+        "branchspace.worktree_create.record_worktree",
+        lambda *args, **kwargs: None,
+    )
 
     created = create_worktree_for_branch(
         "feature", config, repo_root=repo_root, open_terminal=False
@@ -0,0 +1,135 @@
+"""Tests for the persistent worktree index."""
+
+from __future__ import annotations
+
+import subprocess
+
+from typing import TYPE_CHECKING
+
+from branchspace.config import BranchspaceConfig
+from branchspace.docker_shell import build_container_name
+from branchspace.git_utils import create_worktree
+from branchspace.git_utils import get_hooks_dir
+from branchspace.worktree_cd import resolve_worktree_path
+from branchspace.worktree_create import create_worktree_for_branch
+from branchspace.worktree_index import HOOK_MARKER_START
+from branchspace.worktree_index import install_post_checkout_hook
+from branchspace.worktree_index import lookup_worktree
+from branchspace.worktree_index import read_index
+from branchspace.worktree_index import rebuild_index
+from branchspace.worktree_list import list_worktree_statuses
+from branchspace.worktree_remove import remove_worktree_for_branch
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_create_and_remove_maintain_index(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    config = BranchspaceConfig(
+        worktreePathTemplate=str(tmp_path / "wt" / "$BRANCH_NAME"),
+        worktreeCopyPatterns=[],
+        fastRemove=False,
+    )
+    monkeypatch.setattr("branchspace.worktree_remove.has_unpushed_commits", lambda _path: False)
+
+    create_worktree_for_branch("feature", config, repo_root=repo, open_terminal=False)
+
+    entries = read_index(repo)
+    assert entries is not None
+    assert set(entries) == {"main", "feature"}
+    assert entries["feature"].path == tmp_path / "wt" / "feature"
+    assert entries["feature"].container == build_container_name("feature", repo)
+    assert entries["feature"].source_branch == "main"
+
+    remove_worktree_for_branch("feature", config, repo_root=repo, confirm=False)
+
+    assert set(read_index(repo) or {}) == {"main"}
+
+
+def test_cd_reads_index_without_git(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    create_worktree(tmp_path / "wt" / "feature", "feature", repository_path=repo)
+    rebuild_index(repo)
+    before = (read_index(repo) or {})["feature"].accessed
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("git should not run")
+
+    monkeypatch.setattr("branchspace.worktree_cd.get_git_root", fail)
+    monkeypatch.setattr("branchspace.worktree_cd.list_worktrees", fail)
+    monkeypatch.setattr("branchspace.git_utils._run_git_command", fail)
+    monkeypatch.chdir(repo)
+
+    resolved = resolve_worktree_path("feature")
+
+    assert resolved.path == tmp_path / "wt" / "feature"
+    assert (read_index(repo) or {})["feature"].accessed >= before
+
+
+def test_rebuild_index_picks_up_plain_git_worktrees(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    first = rebuild_index(repo)
+    create_worktree(tmp_path / "wt" / "manual", "manual", repository_path=repo)
+
+    rebuilt = rebuild_index(repo)
+
+    assert set(rebuilt) == {"main", "manual"}
+    assert rebuilt["main"].created == first["main"].created
+
+
+def test_stale_index_falls_back_to_git(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    create_worktree(tmp_path / "wt" / "gone", "gone", repository_path=repo)
+    create_worktree(tmp_path / "wt" / "moved", "moved", repository_path=repo)
+    subprocess.run(
+        ["git", "worktree", "add", "--detach", str(tmp_path / "wt" / "detached")],
+        cwd=repo,
+        capture_output=True,
+        check=True,
+    )
+    rebuild_index(repo)
+    monkeypatch.setattr("branchspace.worktree_list.query", lambda *_a, **_kw: None)
+
+    statuses = list_worktree_statuses(repo)
+    assert [(status.branch, status.path.name) for status in statuses] == [
+        ("main", "repo"),
+        ("HEAD", "detached"),
+        ("gone", "gone"),
+        ("moved", "moved"),
+    ]
+
+    subprocess.run(
+        ["git", "worktree", "remove", str(tmp_path / "wt" / "gone")],
+        cwd=repo,
+        capture_output=True,
+        check=True,
+    )
+    # A directory whose checkout is now on another branch is not the old one
+    subprocess.run(
+        ["git", "switch", "-c", "other"],
+        cwd=tmp_path / "wt" / "moved",
+        capture_output=True,
+        check=True,
+    )
+
+    statuses = list_worktree_statuses(repo)
+    assert [status.branch for status in statuses] == ["main", "HEAD", "other"]
+    assert lookup_worktree("gone", repo) is None
+    assert lookup_worktree("moved", repo) is None
+    assert lookup_worktree("main", repo) == repo
+
+
+def test_install_post_checkout_hook_appends_once(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    hook = get_hooks_dir(repo) / "post-checkout"
+    hook.parent.mkdir(parents=True, exist_ok=True)
+    hook.write_text("#!/bin/sh\necho existing\n")
+
+    assert install_post_checkout_hook(repo) == hook
+    assert install_post_checkout_hook(repo) is None
+
+    content = hook.read_text()
+    assert content.startswith("#!/bin/sh\necho existing\n")
+    assert content.count(HOOK_MARKER_START) == 1
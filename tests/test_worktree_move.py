@@ -0,0 +1,115 @@
+"""Tests for bulk worktree relocation."""
+
+from __future__ import annotations
+
+import errno
+import os
+import subprocess
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from branchspace.config import BranchspaceConfig
+from branchspace.git_utils import create_worktree
+from branchspace.git_utils import list_worktrees
+from branchspace.worktree_index import rebuild_index
+from branchspace.worktree_index import record_worktree
+from branchspace.worktree_move import WorktreeMoveError
+from branchspace.worktree_move import move_worktrees
+from branchspace.worktree_move import plan_moves
+from branchspace.worktree_placement import choose_root
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_move_worktrees_relocates_and_repairs(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    for branch in ("one", "two"):
+        create_worktree(tmp_path / "old" / branch, branch, repository_path=repo)
+    config = BranchspaceConfig(worktreePathTemplate=f"{tmp_path}/new/$BRANCH_NAME")
+
+    moved = move_worktrees([], config, repo_root=repo)
+
+    assert sorted(move.branch for move in moved) == ["one", "two"]
+    paths = {wt.branch: wt.path for wt in list_worktrees(repo)}
+    assert paths["one"] == tmp_path / "new" / "one"
+    assert not (tmp_path / "old" / "one").exists()
+    status = subprocess.run(
+        ["git", "status", "--short"], cwd=paths["two"], capture_output=True, check=False
+    )
+    assert status.returncode == 0
+    assert plan_moves([], config, repo_root=repo) == []
+
+
+def test_move_worktrees_dry_run_leaves_worktrees(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    create_worktree(tmp_path / "old" / "one", "one", repository_path=repo)
+    config = BranchspaceConfig(worktreePathTemplate=f"{tmp_path}/new/$BRANCH_NAME")
+
+    moves = move_worktrees(["one"], config, repo_root=repo, dry_run=True)
+
+    assert [move.destination for move in moves] == [tmp_path / "new" / "one"]
+    assert (tmp_path / "old" / "one").is_dir()
+
+
+def test_dry_run_leaves_round_robin_cursor_alone(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    for branch in ("one", "two"):
+        create_worktree(tmp_path / "old" / branch, branch, repository_path=repo)
+    roots = [str(tmp_path / name) for name in "abc"]
+    config = BranchspaceConfig(
+        worktreePathTemplate="$BRANCH_NAME",
+        worktreeRoots=roots,
+        placementPolicy="round-robin",
+    )
+
+    previews = [move_worktrees([], config, repo_root=repo, dry_run=True) for _ in range(2)]
+    assert previews[0] == previews[1]
+    assert [move.destination for move in previews[0]] == [
+        tmp_path / "a" / "one",
+        tmp_path / "b" / "two",
+    ]
+
+    moved = move_worktrees([], config, repo_root=repo)
+
+    assert moved == previews[0]
+    # Only the real move claimed its two slots
+    assert choose_root("three", config, repo) == tmp_path / "c"
+
+
+def test_moves_use_each_worktrees_recorded_source_branch(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    create_worktree(tmp_path / "old" / "one", "one", repository_path=repo)
+    rebuild_index(repo)
+    record_worktree(repo, "one", tmp_path / "old" / "one", source_branch="develop")
+    config = BranchspaceConfig(worktreePathTemplate=f"{tmp_path}/new/$SOURCE_BRANCH/$BRANCH_NAME")
+
+    moves = plan_moves([], config, repo_root=repo)
+
+    assert [move.destination for move in moves] == [tmp_path / "new" / "develop" / "one"]
+
+
+def test_move_worktrees_copies_across_devices(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    create_worktree(tmp_path / "old" / "one", "one", repository_path=repo)
+    config = BranchspaceConfig(worktreePathTemplate=f"{tmp_path}/new/$BRANCH_NAME")
+
+    def cross_device_rename(_src, _dst):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+    monkeypatch.setattr("branchspace.worktree_move.os.rename", cross_device_rename)
+
+    move_worktrees(["one"], config, repo_root=repo)
+
+    assert (tmp_path / "new" / "one" / ".git").is_file()
+    assert not (tmp_path / "old" / "one").exists()
+
+
+def test_move_worktrees_unknown_branch(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+
+    with pytest.raises(WorktreeMoveError, match="missing"):
+        move_worktrees(["missing"], BranchspaceConfig(), repo_root=repo)
@@ -0,0 +1,82 @@
+"""Tests for multi-root worktree placement."""
+
+from __future__ import annotations
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from branchspace.config import BranchspaceConfig
+from branchspace.worktree_create import create_worktree_for_branch
+from branchspace.worktree_placement import choose_root
+from branchspace.worktree_placement import forget_placements
+from branchspace.worktree_placement import get_placement
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_choose_root_without_roots_returns_none(tmp_path: Path):
+    assert choose_root("feature", BranchspaceConfig(), tmp_path) is None
+
+
+def test_round_robin_cycles_through_roots(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    roots = [str(tmp_path / "a"), str(tmp_path / "b")]
+    config = BranchspaceConfig(worktreeRoots=roots, placementPolicy="round-robin")
+
+    picked = [choose_root(f"b{i}", config, repo) for i in range(3)]
+
+    assert [str(path) for path in picked] == [roots[0], roots[1], roots[0]]
+
+
+def test_round_robin_hands_out_distinct_slots_concurrently(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    roots = [str(tmp_path / name) for name in "abc"]
+    config = BranchspaceConfig(worktreeRoots=roots, placementPolicy="round-robin")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        picked = list(pool.map(lambda i: choose_root(f"b{i}", config, repo), range(30)))
+
+    assert Counter(str(path) for path in picked) == dict.fromkeys(roots, 10)
+
+
+def test_most_free_space_prefers_largest(tmp_path: Path, monkeypatch):
+    config = BranchspaceConfig(worktreeRoots=[str(tmp_path / "small"), str(tmp_path / "big")])
+    monkeypatch.setattr(
+        "branchspace.worktree_placement._free_space",
+        lambda path: 100 if path.name == "big" else 1,
+    )
+
+    assert choose_root("feature", config, tmp_path) == tmp_path / "big"
+
+
+def test_tmpfs_for_ephemeral_splits_by_branch(tmp_path: Path, monkeypatch):
+    config = BranchspaceConfig(
+        worktreeRoots=[str(tmp_path / "disk"), {"path": str(tmp_path / "ram"), "ephemeral": True}],
+        placementPolicy="tmpfs-for-ephemeral",
+        ephemeralBranches=["scratch/*"],
+    )
+    monkeypatch.setattr("branchspace.worktree_placement._is_tmpfs", lambda _path: False)
+
+    assert choose_root("scratch/try", config, tmp_path) == tmp_path / "ram"
+    assert choose_root("feature", config, tmp_path) == tmp_path / "disk"
+
+
+def test_create_records_and_remove_forgets_placement(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    root = tmp_path / "nvme0"
+    config = BranchspaceConfig(
+        worktreePathTemplate="$BRANCH_NAME",
+        worktreeRoots=[str(root)],
+        worktreeCopyPatterns=[],
+    )
+
+    created = create_worktree_for_branch("feature", config, repo_root=repo, open_terminal=False)
+
+    assert created.path == root / "feature"
+    assert get_placement(repo, "feature") == root
+
+    forget_placements(repo, ["feature"])
+    assert get_placement(repo, "feature") is None
@@ -11,8 +11,14 @@ if TYPE_CHECKING:
     from pathlib import Path
 
 from branchspace.config import BranchspaceConfig
+from branchspace.git_utils import create_worktree
+from branchspace.git_utils import list_worktrees
+from branchspace.worktree_index import read_index
+from branchspace.worktree_index import rebuild_index
+from branchspace.worktree_index import record_worktree
 from branchspace.worktree_remove import WorktreeRemoveError
 from branchspace.worktree_remove import remove_worktree_for_branch
+from branchspace.worktree_remove import remove_worktrees
 
 
 def test_remove_worktree_blocks_protected_branch(tmp_path: Path, monkeypatch):
@@ -74,3 +80,109 @@ def test_remove_worktree_confirms_dirty(tmp_path: Path, monkeypatch):
     )
 
     assert result.removed is False
+
+
+def test_remove_worktrees_assesses_once_and_prompts_once(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    for branch in ("one", "two", "three"):
+        create_worktree(tmp_path / "wt" / branch, branch, repository_path=repo)
+    (tmp_path / "wt" / "two" / "scratch.txt").write_text("dirty")
+
+    snapshot_calls: list[Path] = []
+    prompts: list[str] = []
+
+    def counting_list_worktrees(path=None):
+        snapshot_calls.append(path)
+        return list_worktrees(path)
+
+    def confirm(prompt: str) -> bool:
+        prompts.append(prompt)
+        return True
+
+    monkeypatch.setattr("branchspace.worktree_remove.list_worktrees", counting_list_worktrees)
+    monkeypatch.setattr("branchspace.worktree_remove.has_unpushed_commits", lambda _path: False)
+    monkeypatch.setattr("branchspace.worktree_remove._confirm", confirm)
+    monkeypatch.setattr("branchspace.worktree_remove.start_reaper", lambda _root: None)
+
+    results = remove_worktrees(["one", "two", "three"], BranchspaceConfig(), repo_root=repo)
+
+    assert [result.removed for result in results] == [True, True, True]
+    assert len(snapshot_calls) == 1
+    assert len(prompts) == 1
+    assert [wt.branch for wt in list_worktrees(repo)] == ["main"]
+
+
+def test_declining_risky_removals_still_removes_clean_ones(tmp_path: Path, monkeypatch, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    for branch in ("one", "two"):
+        create_worktree(tmp_path / "wt" / branch, branch, repository_path=repo)
+    (tmp_path / "wt" / "two" / "scratch.txt").write_text("dirty")
+    prompts: list[str] = []
+
+    def decline(prompt: str) -> bool:
+        prompts.append(prompt)
+        return False
+
+    monkeypatch.setattr("branchspace.worktree_remove.has_unpushed_commits", lambda _path: False)
+    monkeypatch.setattr("branchspace.worktree_remove._confirm", decline)
+    monkeypatch.setattr("branchspace.worktree_remove.start_reaper", lambda _root: None)
+
+    results = remove_worktrees(["one", "two"], BranchspaceConfig(), repo_root=repo)
+
+    assert prompts == ["Remove 1 dirty or unpushed worktree(s) anyway?"]
+    assert [(result.branch, result.removed) for result in results] == [
+        ("one", True),
+        ("two", False),
+    ]
+    assert [wt.branch for wt in list_worktrees(repo)] == ["main", "two"]
+
+
+def test_failed_and_resumed_removals_forget_every_removed_worktree(
+    tmp_path: Path, monkeypatch, init_repo
+):
+    from branchspace import worktree_remove
+
+    repo = init_repo(tmp_path / "repo")
+    for branch in ("one", "two"):
+        create_worktree(tmp_path / "wt" / branch, branch, repository_path=repo)
+    rebuild_index(repo)
+    reaped: list[Path] = []
+    discard = worktree_remove._discard_worktree
+
+    def fail_two(assessment, *args, **kwargs):
+        if assessment.branch == "two":
+            raise OSError("disk went away")
+        return discard(assessment, *args, **kwargs)
+
+    monkeypatch.setattr("branchspace.worktree_remove.has_unpushed_commits", lambda _path: False)
+    monkeypatch.setattr("branchspace.worktree_remove.start_reaper", reaped.append)
+    monkeypatch.setattr("branchspace.worktree_remove._discard_worktree", fail_two)
+    config = BranchspaceConfig(fastRemove=True)
+
+    with pytest.raises(OSError, match="disk went away"):
+        remove_worktrees(["one", "two"], config, repo_root=repo, confirm=False)
+
+    # The worktree that did go to the trash is still forgotten and reaped
+    assert set(read_index(repo) or {}) == {"main", "two"}
+    assert reaped == [repo]
+
+    # An entry left by a process that died before forgetting it
+    record_worktree(repo, "one", tmp_path / "wt" / "one")
+    monkeypatch.setattr("branchspace.worktree_remove._discard_worktree", discard)
+    results = remove_worktrees([], config, repo_root=repo, confirm=False, resume=True)
+
+    assert [(result.branch, result.removed) for result in results] == [
+        ("one", True),
+        ("two", True),
+    ]
+    assert set(read_index(repo) or {}) == {"main"}
+
+
+def test_remove_worktrees_validates_before_removing(tmp_path: Path, init_repo):
+    repo = init_repo(tmp_path / "repo")
+    create_worktree(tmp_path / "wt" / "one", "one", repository_path=repo)
+
+    with pytest.raises(WorktreeRemoveError, match="missing"):
+        remove_worktrees(["one", "missing"], BranchspaceConfig(), repo_root=repo, confirm=False)
+
+    assert (tmp_path / "wt" / "one").is_dir()